@@ -17,10 +17,12 @@ from .board.cpufreq import A8_CPUFREQS, get_cpufreq, get_cpufreq_gov, set_cpufre
 from .board.eeprom import Eeprom
 from .board.gpio import GPIO_HIGH, GPIO_IN, GPIO_LOW, GPIO_OUT, Gpio, GpioError
 from .board.pru import Pru, PruError, PruState
+from .canopen.accessor import OdAccessor
 from .canopen.ecss import scet_int_from_time, scet_int_to_time, utc_int_from_time, utc_int_to_time
 from .canopen.master_node import MasterNode
 from .canopen.network import CanNetwork, CanNetworkError, CanNetworkState, NetworkError
 from .canopen.node import Node, NodeStop
+from .canopen.telemetry import TelemetryPacker
 from .common.daemon import Daemon, DaemonState
 from .common.oresat_file import OreSatFile, new_oresat_file
 from .common.oresat_file_cache import OreSatFileCache
@@ -78,6 +80,16 @@ olaf_parser.add_argument(
     default="localhost",
     help='host for socketcand bus (only used if bus_type is "socketcand")',
 )
+olaf_parser.add_argument(
+    "--can-fd", action="store_true", help="use CAN FD frames, allowing PDOs up to 64 bytes"
+)
+olaf_parser.add_argument(
+    "--dispatch-workers",
+    type=int,
+    default=0,
+    help="worker threads to handle received CAN messages on, sharded by COB-ID; defaults to 0, "
+    "handle all on the CAN notifier thread",
+)
 
 
 def olaf_setup(name: str, args: Optional[Namespace] = None) -> tuple[Namespace, dict]:
@@ -143,7 +155,13 @@ def olaf_setup(name: str, args: Optional[Namespace] = None) -> tuple[Namespace,
     if is_octavo:
         od["versions"]["olaf_version"].value = __version__
 
-    network = CanNetwork(args.bus_type, args.bus, args.socketcand_host)
+    network = CanNetwork(
+        args.bus_type,
+        args.bus,
+        args.socketcand_host,
+        fd=args.can_fd,
+        dispatch_workers=args.dispatch_workers,
+    )
     od_db = config.od_db if name == "c3" else None
 
     app.setup(network, od, od_db, is_octavo)
@@ -158,3 +176,11 @@ def olaf_run():
     rest_api.start()
     app.run()
     rest_api.stop()
+
+
+async def olaf_run_async():
+    """Start the app and REST API, with the node running on the current asyncio event loop."""
+
+    rest_api.start()
+    await app.run_async()
+    rest_api.stop()
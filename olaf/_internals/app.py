@@ -3,6 +3,7 @@
 import os
 import signal
 import subprocess
+from threading import Event, Thread
 from typing import Union
 
 import canopen
@@ -37,6 +38,8 @@ class App:
         self._node = None
         self._updater = None
         self._factory_reset_cb = None
+        self._ready = Event()
+        self._startup_thread: Union[Thread, None] = None
 
     def __del__(self):
         self.stop()
@@ -123,23 +126,48 @@ class App:
 
         self._services.append(service)
 
-    def run(self):
-        """Run the app."""
+    def _start(self) -> bool:
+        """
+        Set up the signal handlers and start all services and resources in the background.
+
+        The node comes up PRE-OPERATIONAL and sends its boot-up message and heartbeats right away,
+        so other nodes see it while the services and resources start. It goes OPERATIONAL once
+        they have all started.
+        """
 
         # setup event
         for sig in ["SIGTERM", "SIGHUP", "SIGINT"]:
             signal.signal(getattr(signal, sig), self._quit)
 
+        if self.node is None:
+            logger.critical("node was not set")
+            return False
+
         logger.info(f"{self._node.name} app is starting")
 
+        self._ready.clear()
+        self._node.set_operational(False)
+        self._startup_thread = Thread(target=self._start_all, name="olaf-startup", daemon=True)
+        self._startup_thread.start()
+        return True
+
+    def _start_all(self):
+        """Start all services and resources, then put the node in OPERATIONAL."""
+
         for service in self._services:
             service.start(self._node)
 
         for resource in self._resources:
             resource.start(self._node)
 
-        if self.node is None:
-            logger.critical("node was not set")
+        self._node.set_operational(True)
+        self._ready.set()
+        logger.info(f"{self._node.name} app is ready")
+
+    def run(self):
+        """Run the app."""
+
+        if not self._start():
             return
 
         try:
@@ -148,6 +176,31 @@ class App:
             logger.exception(f"unexpected error was raised by app node: {e}")
             reset = NodeStop.SOFT_RESET
 
+        self._end(reset)
+
+    async def run_async(self):
+        """
+        Run the app with the node on the current asyncio event loop. Services still run in their own
+        threads.
+        """
+
+        if not self._start():
+            return
+
+        try:
+            reset = await self._node.run_async()
+        except Exception as e:  # pylint: disable=W0718
+            logger.exception(f"unexpected error was raised by app node: {e}")
+            reset = NodeStop.SOFT_RESET
+
+        self._end(reset)
+
+    def _end(self, reset: NodeStop):
+        """Stop all services and resources, then handle the reset / power off condition."""
+
+        if self._startup_thread is not None:
+            self._startup_thread.join()
+
         for service in self._services:
             service.stop()
 
@@ -196,6 +249,12 @@ class App:
         if self._node:
             self._node.stop()
 
+    @property
+    def is_ready(self) -> bool:
+        """bool: Have all services and resources started."""
+
+        return self._ready.is_set()
+
     @property
     def node(self) -> Node:
         """Node: The CANopen node."""
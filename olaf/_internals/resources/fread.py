@@ -25,11 +25,19 @@ class FreadResource(Resource):
 
     def on_start(self):
         self.node.add_sdo_callbacks("fread_cache", "length", self.on_read_cache_len, None)
-        self.node.add_sdo_callbacks("fread_cache", "files_json", self.on_read_cache_json, None)
         self.node.add_sdo_callbacks(
-            "fread_cache", "file_name", self.on_read_file_name, self.on_write_file_name
+            "fread_cache",
+            "files_json",
+            self.on_read_cache_json,
+            None,
+            cache_key=lambda: self.node.fread_cache.version,
+        )
+        self.node.add_sdo_callbacks(
+            "fread_cache", "file_name", self.on_read_file_name, self.on_write_file_name, slow=True
+        )
+        self.node.add_sdo_callbacks(
+            "fread_cache", "file_data", self.on_read_file_data, None, slow=True
         )
-        self.node.add_sdo_callbacks("fread_cache", "file_data", self.on_read_file_data, None)
         self.node.add_sdo_callbacks("fread_cache", "remove", None, self.on_write_delete)
 
     def on_read_cache_len(self) -> int:
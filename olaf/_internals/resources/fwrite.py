@@ -31,7 +31,9 @@ class FwriteResource(Resource):
         self.node.add_sdo_callbacks(
             "fwrite_cache", "file_name", self.on_read_file_name, self.on_write_file_name
         )
-        self.node.add_sdo_callbacks("fwrite_cache", "file_data", None, self.on_write_file_data)
+        self.node.add_sdo_callbacks(
+            "fwrite_cache", "file_data", None, self.on_write_file_data, slow=True
+        )
         self.node.add_sdo_callbacks("fwrite_cache", "remove", None, self.on_write_delete)
 
     def on_read_cache_len(self) -> int:
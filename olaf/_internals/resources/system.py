@@ -14,8 +14,10 @@ class SystemResource(Resource):
     def on_start(self):
         self.node.od_write("system", "reset", 0)
 
-        self.node.add_sdo_callbacks("system", "ram_percent", self.on_read_ram, None)
-        self.node.add_sdo_callbacks("system", "storage_percent", self.on_read_storage, None)
+        self.node.add_sdo_callbacks("system", "ram_percent", self.on_read_ram, None, cache_ttl=1)
+        self.node.add_sdo_callbacks(
+            "system", "storage_percent", self.on_read_storage, None, cache_ttl=1
+        )
         self.node.add_sdo_callbacks("system", "uptime", self.on_read_uptime, None)
         self.node.add_sdo_callbacks("system", "unix_time", self.on_read_unix_time, None)
         self.node.add_sdo_callbacks("system", "reset", None, self.on_write_reset)
@@ -6,7 +6,7 @@ import os
 import shutil
 from pathlib import Path
 from threading import Thread
-from typing import Union
+from typing import Optional, Union
 
 import canopen
 from flask import Flask, jsonify, render_template, request, send_from_directory
@@ -151,7 +151,7 @@ def root():
         if (
             not route.startswith("/static/")
             and not route.startswith("/od/")
-            and route not in ["/", "/favicon.ico", "/od-all", "/bus"]
+            and route not in ["/", "/favicon.ico", "/od-all", "/bus", "/metrics"]
         ):
             routes.append(str(rule))
 
@@ -202,6 +202,24 @@ def can_bus():
     )
 
 
+@rest_api.app.route("/metrics", methods=["GET"])
+def node_metrics():
+    """Get the node's hot path metrics."""
+
+    return jsonify(
+        {
+            "latency": app.node.metrics.to_dict(),
+            "timers": {name: vars(stats) for name, stats in app.node.timer_stats.items()},
+            "sync_latency": app.node.sync_latency,
+            "dispatch": app.node.dispatch_stats,
+            "sdo_cache": {
+                f"0x{index:04X}_0x{subindex:02X}": stats
+                for (index, subindex), stats in app.node.sdo_cache_stats.items()
+            },
+        }
+    )
+
+
 @rest_api.app.route("/od/<index>/", methods=["GET", "PUT"])
 def od_index_old(index: str):
     """Read or write a value from OD with only a index. For backward compactability."""
@@ -221,18 +239,9 @@ def od_index(index: str):
     """Read or write a value from OD with only a index."""
 
     try:
-        if index.startswith("0x"):
-            index = int(index, 16)  # type: ignore
-        elif index[0] in "0123456789":
-            index = int(index)  # type: ignore
-    except ValueError:
-        return make_error_json(f"invalid index {index}")
-
-    try:
-        obj = app.od[index]
-    except KeyError:
-        index_name = f"0x{index:X}" if isinstance(index, int) else index
-        msg = f"no object at index {index_name}"
+        obj = app.node.od_get_obj(index)
+    except KeyError as e:
+        msg = e.args[0]
         logger.error(f"REST API error: {msg}")
         return make_error_json(msg)
 
@@ -244,7 +253,7 @@ def od_index(index: str):
             value = _json_value_to_value(obj.data_type, json_value)
             raw = obj.encode_raw(value)
 
-            app.node._on_sdo_write(index, None, obj, raw)  # pylint: disable=W0212
+            app.node._on_sdo_write(obj.index, obj.subindex, obj, raw)  # pylint: disable=W0212
         except Exception as e:  # pylint: disable=W0718
             logger.error(f"REST API error: {e}")
             return make_error_json(str(e))
@@ -257,24 +266,9 @@ def od_subindex(index: str, subindex: str):
     """Read or write a value from OD."""
 
     try:
-        if index.startswith("0x"):
-            index = int(index, 16)  # type: ignore
-        elif index[0] in "0123456789":
-            index = int(index)  # type: ignore
-
-        if subindex.startswith("0x"):
-            subindex = int(subindex, 16)  # type: ignore
-        elif subindex[0] in "0123456789":
-            subindex = int(subindex)  # type: ignore
-    except ValueError:
-        return make_error_json(f"invalid index {index} or subindex {subindex}")
-
-    try:
-        obj = app.od[index][subindex]
-    except (KeyError, TypeError):
-        index_name = f"0x{index:X}" if isinstance(index, int) else index
-        subindex_name = f"0x{subindex:X}" if isinstance(subindex, int) else subindex
-        msg = f"no object at index {index_name} subindex {subindex_name}"
+        obj = app.node.od_get_obj(index, subindex)
+    except KeyError as e:
+        msg = e.args[0]
         logger.error(f"REST API error: {msg}")
         return make_error_json(msg)
 
@@ -289,7 +283,7 @@ def od_subindex(index: str, subindex: str):
             else:
                 raw = obj.encode_raw(value)
 
-            app.node._on_sdo_write(index, subindex, obj, raw)  # pylint: disable=W0212
+            app.node._on_sdo_write(obj.index, obj.subindex, obj, raw)  # pylint: disable=W0212
         except Exception as e:  # pylint: disable=W0718
             logger.exception(f"REST API error: {e}")
             return make_error_json(str(e))
@@ -301,6 +295,7 @@ def _object_to_dict(
     index: Union[str, int],
     subindex: Union[str, int, None] = None,
     add_values: bool = True,
+    snapshot: Optional[dict] = None,
 ) -> dict:
     """
     Convert a OD object to a dictionary.
@@ -313,6 +308,9 @@ def _object_to_dict(
         Optional subindex of the object to convert.
     add_values: bool
         Add values (current and engineering value) to dict.
+    snapshot: dict, None
+        Optional snapshot from ``Node.od_snapshot()`` to take values from, instead of reading them
+        with the SDO read callbacks.
 
     Returns
     -------
@@ -320,23 +318,17 @@ def _object_to_dict(
         The object as a dictionary.
     """
 
-    if subindex is None:
-        try:
-            obj = app.node.od[index]
-        except KeyError:
-            msg = f"0x{index:04X} is not a valid index"
-            logger.debug("REST API error: " + msg)
-            raise KeyError(msg)
-    else:
-        try:
-            obj = app.node.od[index][subindex]
-        except KeyError:
-            msg = f"0x{subindex:02X} not a valid subindex for index 0x{index:04X}"
-            logger.debug("REST API error: " + msg)
-            raise KeyError(msg)
-
-    if isinstance(obj, canopen.objectdictionary.Variable):
-        value = app.node._on_sdo_read(index, subindex, obj)  # pylint: disable=W0212
+    try:
+        obj = app.node.od_get_obj(index, subindex)
+    except KeyError as e:
+        logger.debug(f"REST API error: {e.args[0]}")
+        raise
+
+    if isinstance(obj, canopen.objectdictionary.Variable) and add_values:
+        if snapshot is not None:
+            value = snapshot[obj.index, obj.subindex]
+        else:
+            value = app.node._on_sdo_read(index, subindex, obj)  # pylint: disable=W0212
         if obj.data_type in BYTES_TYPES and value is not None:
             # encode bytes data types for JSON
             try:
@@ -369,22 +361,30 @@ def _object_to_dict(
         data["high_limit"] = obj.max or ""
     elif isinstance(obj, canopen.objectdictionary.Array):
         data["object_type"] = "ARRAY"
-        data["subindexes"] = {sub: _object_to_dict(index, sub, add_values) for sub in obj}
+        data["subindexes"] = {sub: _object_to_dict(index, sub, add_values, snapshot) for sub in obj}
     else:
         data["object_type"] = "RECORD"
-        data["subindexes"] = {sub: _object_to_dict(index, sub, add_values) for sub in obj}
+        data["subindexes"] = {sub: _object_to_dict(index, sub, add_values, snapshot) for sub in obj}
 
     return data
 
 
 @rest_api.app.route("/od-all", methods=["GET"])
 def get_all_object():
-    """Get all object data as a one giant JSON."""
+    """
+    Get all object data as a one giant JSON. Add ``?values=true`` to include all values, taken from
+    one consistent snapshot of the OD.
+    """
+
+    snapshot = None
+    if request.args.get("values", "false").lower() in ["true", "1"]:
+        snapshot = app.node.od_snapshot()
+
     data = {}
     for index in app.od:
         if index < 0x3000:
             continue
-        data[index] = _object_to_dict(index, None, False)
+        data[index] = _object_to_dict(index, None, snapshot is not None, snapshot)
     return data
 
 
@@ -24,7 +24,13 @@ class UpdaterService(Service):
         self.node.od_write("updater", "make_status_file", False)
 
         self.node.add_sdo_callbacks("updater", "status", self.on_read_status, None)
-        self.node.add_sdo_callbacks("updater", "cache_files_json", self.on_read_cache_json, None)
+        self.node.add_sdo_callbacks(
+            "updater",
+            "cache_files_json",
+            self.on_read_cache_json,
+            None,
+            cache_key=lambda: self._updater.cache_version,
+        )
         self.node.add_sdo_callbacks("updater", "cache_length", self.on_read_cache_len, None)
 
         # check for update files in fwrite cache
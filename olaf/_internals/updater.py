@@ -424,6 +424,12 @@ class Updater:
 
         return self._cache.files()
 
+    @property
+    def cache_version(self) -> int:
+        """int: Changes every time an update archive is added to or removed from the cache."""
+
+        return self._cache.version
+
     @property
     def list_updates(self) -> str:
         """str: Get a JSON list of file_name in cache."""
@@ -0,0 +1,208 @@
+"""Bound OD variable accessor"""
+
+from typing import Any, Callable, Union
+
+from canopen.objectdictionary import (
+    FLOAT_TYPES,
+    INTEGER_TYPES,
+    OCTET_STRING,
+    VISIBLE_STRING,
+    ODVariable,
+)
+
+
+def _make_validator(var: ODVariable) -> Callable[[Any], None]:
+    """Make the function to validate a value before it is written to a variable."""
+
+    def make_error_value(value, data_type) -> str:
+        return f"cannot write {value!r} ({data_type}) to object {var.name} ({var.data_type})"
+
+    def check_limits(value):
+        if var.max is not None and value > var.max:
+            raise ValueError(f"value {value!r} too high (high limit {var.max})")
+        if var.min is not None and value < var.min:
+            raise ValueError(f"value {value!r} too low (low limit {var.min})")
+
+    def check_int(value):
+        if type(value) is not int:  # pylint: disable=C0123
+            raise TypeError(make_error_value(value, "int"))
+        check_limits(value)
+
+    def check_float(value):
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise TypeError(make_error_value(value, "float"))
+        check_limits(value)
+
+    def check_str(value):
+        if not isinstance(value, str):
+            raise TypeError(make_error_value(value, "str"))
+
+    def check_bytes(value):
+        if not isinstance(value, bytes):
+            raise TypeError(make_error_value(value, "bytes"))
+
+    def check_nothing(value):  # pylint: disable=W0613
+        pass
+
+    if var.data_type in INTEGER_TYPES:
+        return check_int
+    if var.data_type in FLOAT_TYPES:
+        return check_float
+    if var.data_type == VISIBLE_STRING:
+        return check_str
+    if var.data_type == OCTET_STRING:
+        return check_bytes
+    return check_nothing
+
+
+class OdAccessor:
+    """
+    Handle bound to a variable in the OD with its validation, bit field masks, and enum maps
+    precomputed. Use :py:meth:`Node.accessor` to get one.
+
+    Use these for values that are read or written often, instead of ``Node.od_*`` methods that have
+    to look up the object every call.
+    """
+
+    def __init__(self, var: ODVariable, on_write: Callable[[ODVariable, bool], None]):
+        """
+        Parameters
+        ----------
+        var: ODVariable
+            The variable to access.
+        on_write: Callable[[ODVariable, bool], None]
+            Called after every write to the variable, with whether the value changed.
+        """
+
+        self._var = var
+        self._on_write = on_write
+        self._validate = _make_validator(var)
+
+        # bit field name -> (mask, offset)
+        self._fields = {
+            name: (sum(1 << bit for bit in bits), min(bits))
+            for name, bits in var.bit_definitions.items()
+        }
+
+        # enum str -> value
+        self._enums = {desc.lower(): value for value, desc in var.value_descriptions.items()}
+
+    @property
+    def var(self) -> ODVariable:
+        """ODVariable: The variable in the OD."""
+
+        return self._var
+
+    def validate(self, value: Union[int, str, float, bytes, bool]):
+        """
+        Check a value can be written, without writing it.
+
+        Parameters
+        ----------
+        value: int | str | float | bytes | bool
+            The value to check.
+
+        Raises
+        ------
+        TypeError
+            The value is the wrong type for the variable.
+        ValueError
+            The value is outside the variable's limits.
+        """
+
+        self._validate(value)
+
+    def read(self) -> Union[int, str, float, bytes, bool]:
+        """
+        Read the value.
+
+        Returns
+        -------
+        int | str | float | bytes | bool
+            The value read.
+        """
+
+        return self._var.value
+
+    def write(self, value: Union[int, str, float, bytes, bool]):
+        """
+        Write a value.
+
+        Parameters
+        ----------
+        value: int | str | float | bytes | bool
+            The value to write.
+
+        Raises
+        ------
+        TypeError
+            The value is the wrong type for the variable.
+        ValueError
+            The value is outside the variable's limits.
+        """
+
+        self._validate(value)
+        old = self._var.value
+        self._var.value = value
+        self._on_write(self._var, old != value)
+
+    def read_bitfield(self, field: str) -> int:
+        """
+        Read a bit field.
+
+        Parameters
+        ----------
+        field: str
+            Name of field to read.
+
+        Returns
+        -------
+        int
+            The field value.
+        """
+
+        mask, offset = self._fields[field]
+        return (self._var.value & mask) >> offset
+
+    def write_bitfield(self, field: str, value: int):
+        """
+        Write a bit field. All other bits are unchanged.
+
+        Parameters
+        ----------
+        field: str
+            Name of field to write to.
+        value: int
+            The value to write.
+        """
+
+        mask, offset = self._fields[field]
+        old = self._var.value
+        self._var.value = (old & ~mask) | ((value << offset) & mask)
+        self._on_write(self._var, old != self._var.value)
+
+    def read_enum(self) -> str:
+        """
+        Read the value as its enum str.
+
+        Returns
+        -------
+        str
+            The enum str value.
+        """
+
+        return self._var.value_descriptions[self._var.value]
+
+    def write_enum(self, value: str):
+        """
+        Write an enum str.
+
+        Parameters
+        ----------
+        value: str
+            The enum str to write.
+        """
+
+        old = self._var.value
+        self._var.value = self._enums[value.lower()]
+        self._on_write(self._var, old != self._var.value)
@@ -0,0 +1,175 @@
+"""Sharded dispatch of received CAN messages to worker threads"""
+
+from queue import Empty, Full, Queue
+from threading import Thread
+from typing import Callable, Optional
+
+from loguru import logger
+
+Subscriber = Callable[[int, bytes, float], None]
+
+_STOP = None  # queued to stop a lane's worker
+
+
+class _Lane:
+    """A bounded queue of received messages and the worker thread that calls their handlers."""
+
+    def __init__(self, name: str, queue_size: int):
+        self.name = name
+        self.queue: Queue = Queue(queue_size)
+        self.dispatched = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.thread = Thread(target=self._run, name=f"olaf-rx-{name}", daemon=True)
+        self.thread.start()
+
+    def put(self, item: tuple) -> bool:
+        """Queue a message for the worker, or count it as dropped if the queue is full."""
+
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            self.dropped += 1
+            return False
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            callback, cob_id, data, timestamp = item
+            try:
+                callback(cob_id, data, timestamp)
+            except Exception as e:  # pylint: disable=W0718
+                logger.exception(f"CAN message handler for 0x{cob_id:03X} raised: {e}")
+            self.dispatched += 1
+
+
+class ShardedDispatcher:
+    """
+    Calls the handlers of received CAN messages from a small pool of worker threads instead of
+    the CAN notifier thread, so one slow handler only delays the COB-IDs that share its worker.
+
+    Messages are sharded onto the workers by COB-ID, so the messages of each COB-ID are always
+    handled in the order they were received. High-priority handlers (e.g. SYNC and RPDOs) get
+    their own worker. When a worker's queue is full, new messages for it are dropped and counted.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 256):
+        """
+        Parameters
+        ----------
+        workers: int
+            Number of workers for normal handlers, not counting the high-priority one.
+        queue_size: int
+            Max number of messages queued per worker.
+
+        Raises
+        ------
+        ValueError
+            workers or queue_size is less than 1.
+        """
+
+        if workers < 1 or queue_size < 1:
+            raise ValueError("workers and queue_size must be at least 1")
+
+        self._priority = _Lane("priority", queue_size)
+        self._shards = [_Lane(f"shard{i}", queue_size) for i in range(workers)]
+
+    def __del__(self):
+        if hasattr(self, "_shards"):  # not if __init__ raised
+            self.stop()
+
+    def stop(self, timeout: Optional[float] = 1.0):
+        """
+        Stop all workers after the messages already queued are handled.
+
+        Parameters
+        ----------
+        timeout: float | None
+            Max time to wait for each worker in seconds, or None to wait forever.
+        """
+
+        for lane in [self._priority, *self._shards]:
+            if not lane.thread.is_alive():
+                continue
+            try:
+                lane.queue.put(_STOP, timeout=timeout)
+            except Full:
+                # drop the backlog to make room for the stop
+                try:
+                    while True:
+                        lane.queue.get_nowait()
+                except Empty:
+                    pass
+                lane.queue.put_nowait(_STOP)
+            lane.thread.join(timeout)
+
+    def dispatch(
+        self, callback: Subscriber, cob_id: int, data: bytes, timestamp: float, priority: bool
+    ) -> bool:
+        """
+        Queue a received message for a handler.
+
+        Parameters
+        ----------
+        callback: Callable[[int, bytes, float], None]
+            The handler.
+        cob_id: int
+            The COB-ID of the message.
+        data: bytes
+            The message data.
+        timestamp: float
+            The receive time of the message.
+        priority: bool
+            Use the high-priority worker.
+
+        Returns
+        -------
+        bool
+            True if queued, False if dropped because the worker's queue is full.
+        """
+
+        lane = self._priority if priority else self._shards[cob_id % len(self._shards)]
+        return lane.put((callback, cob_id, bytes(data), timestamp))
+
+    def wrap(self, callback: Subscriber, priority: bool = False) -> Subscriber:
+        """
+        Wrap a handler to be dispatched to the workers.
+
+        Parameters
+        ----------
+        callback: Callable[[int, bytes, float], None]
+            The handler.
+        priority: bool
+            Use the high-priority worker.
+
+        Returns
+        -------
+        Callable[[int, bytes, float], None]
+            The handler to subscribe to the CAN network with.
+        """
+
+        def dispatch(cob_id: int, data: bytes, timestamp: float):
+            self.dispatch(callback, cob_id, data, timestamp, priority)
+
+        return dispatch
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        """
+        dict[str, dict[str, int]]: The current and max queue depth and the number of messages
+        dispatched and dropped for each worker, by worker name.
+        """
+
+        return {
+            lane.name: {
+                "depth": lane.queue.qsize(),
+                "max_depth": lane.max_depth,
+                "dispatched": lane.dispatched,
+                "dropped": lane.dropped,
+            }
+            for lane in [self._priority, *self._shards]
+        }
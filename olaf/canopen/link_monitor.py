@@ -0,0 +1,192 @@
+"""Event-driven network link monitoring with rtnetlink"""
+
+import socket
+import struct
+from threading import Event, Thread, current_thread
+from typing import Callable, NamedTuple, Optional
+
+from loguru import logger
+
+_RTMGRP_LINK = 0x1
+_NLMSG_ERROR = 0x2
+_NLMSG_DONE = 0x3
+_RTM_NEWLINK = 16
+_RTM_DELLINK = 17
+_IFF_UP = 0x1
+_NLA_TYPE_MASK = 0x3FFF  # without the nested and byte order flags
+
+_IFLA_IFNAME = 3
+_IFLA_LINKINFO = 18
+_IFLA_INFO_DATA = 2
+_IFLA_CAN_STATE = 4
+_CAN_STATE_BUS_OFF = 3
+
+_NLMSGHDR = struct.Struct("=IHHII")  # length, type, flags, sequence, port id
+_IFINFOMSG = struct.Struct("=BxHiII")  # family, device type, index, flags, change mask
+_RTATTR = struct.Struct("=HH")  # length, type
+_U32 = struct.Struct("=I")
+
+
+class LinkState(NamedTuple):
+    """The state of a network link."""
+
+    exists: bool
+    """bool: The link exists."""
+    up: bool
+    """bool: The link is administratively up."""
+    bus_off: bool = False
+    """bool: The CAN controller is bus-off; only for CAN links."""
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def _attrs(data: bytes, offset: int, end: int) -> dict[int, bytes]:
+    """Parse a run of netlink attributes into a dict of payloads by type."""
+
+    attrs = {}
+    while offset + _RTATTR.size <= end:
+        length, attr_type = _RTATTR.unpack_from(data, offset)
+        if length < _RTATTR.size:
+            break
+        attrs[attr_type & _NLA_TYPE_MASK] = data[offset + _RTATTR.size : offset + length]
+        offset += _align(length)
+    return attrs
+
+
+def parse_link_messages(data: bytes, ifname: str) -> list[LinkState]:
+    """
+    Parse the link states of an interface out of rtnetlink messages.
+
+    Parameters
+    ----------
+    data: bytes
+        The messages, as read from a rtnetlink socket.
+    ifname: str
+        The name of the interface to get the link states of; other interfaces are ignored.
+
+    Returns
+    -------
+    list[LinkState]
+        The link states of the interface, in order.
+    """
+
+    states = []
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size or msg_type in [_NLMSG_ERROR, _NLMSG_DONE]:
+            break
+        end = min(offset + length, len(data))
+
+        if msg_type in [_RTM_NEWLINK, _RTM_DELLINK]:
+            _, _, _, flags, _ = _IFINFOMSG.unpack_from(data, offset + _NLMSGHDR.size)
+            attrs = _attrs(data, offset + _NLMSGHDR.size + _IFINFOMSG.size, end)
+            name = attrs.get(_IFLA_IFNAME, b"").split(b"\x00", 1)[0].decode(errors="replace")
+            if name == ifname:
+                if msg_type == _RTM_DELLINK:
+                    states.append(LinkState(False, False))
+                else:
+                    info = attrs.get(_IFLA_LINKINFO, b"")
+                    info_data = _attrs(info, 0, len(info)).get(_IFLA_INFO_DATA, b"")
+                    can_state = _attrs(info_data, 0, len(info_data)).get(_IFLA_CAN_STATE)
+                    bus_off = (
+                        can_state is not None
+                        and len(can_state) >= _U32.size
+                        and _U32.unpack_from(can_state)[0] == _CAN_STATE_BUS_OFF
+                    )
+                    states.append(LinkState(True, bool(flags & _IFF_UP), bus_off))
+
+        offset += _align(length)
+    return states
+
+
+class LinkMonitor:
+    """
+    Listens for rtnetlink link messages and calls back with the state of one interface whenever it
+    changes (made, removed, up, down, or bus-off), as soon as the kernel reports it.
+    """
+
+    def __init__(self, ifname: str, callback: Callable[[LinkState], None]):
+        """
+        Parameters
+        ----------
+        ifname: str
+            The name of the interface to monitor, e.g. can0.
+        callback: Callable[[LinkState], None]
+            Called from the listener thread with the new link state.
+        """
+
+        self._ifname = ifname
+        self._callback = callback
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[Thread] = None
+        self._event = Event()
+
+    def start(self) -> bool:
+        """
+        Start listening.
+
+        Returns
+        -------
+        bool
+            True if listening, False if rtnetlink is not available (e.g. not on Linux).
+        """
+
+        if self._thread is not None:
+            return True
+
+        try:
+            sock = socket.socket(
+                socket.AF_NETLINK,  # pylint: disable=E1101
+                socket.SOCK_RAW,
+                socket.NETLINK_ROUTE,  # pylint: disable=E1101
+            )
+            sock.bind((0, _RTMGRP_LINK))
+        except (AttributeError, OSError) as e:
+            logger.debug(f"rtnetlink is not available: {e}")
+            return False
+
+        sock.settimeout(1)  # to check for stop
+        self._sock = sock
+        self._event.clear()
+        self._thread = Thread(target=self._run, name="olaf-link-monitor", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop listening."""
+
+        self._event.set()
+        if self._thread is not None:
+            if self._thread is not current_thread():
+                self._thread.join()
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    @property
+    def is_running(self) -> bool:
+        """bool: Is the listener running."""
+
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._event.is_set():
+            try:
+                data = self._sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                # e.g. ENOBUFS if messages were dropped, the link state is unknown now
+                if not self._event.is_set():
+                    logger.warning(f"rtnetlink receive error, stopping link monitor: {e}")
+                break
+
+            for state in parse_link_messages(data, self._ifname):
+                try:
+                    self._callback(state)
+                except Exception as e:  # pylint: disable=W0718
+                    logger.exception(f"link monitor callback raised: {e}")
@@ -2,13 +2,14 @@
 
 from collections import namedtuple
 from time import monotonic
-from typing import Any, Dict, Union
+from typing import Any, Callable, Dict, Union
 
 import canopen
 from canopen.sdo import SdoArray, SdoRecord, SdoVariable
 from loguru import logger
 
 from ..canopen.network import CanNetwork
+from .mpdo import mpdo_var_size, pack_mpdo, unpack_mpdo
 from .node import Node
 
 NodeHeartbeatInfo = namedtuple("NodeHeartbeatInfo", ["state", "timestamp", "time_since_boot"])
@@ -339,3 +340,96 @@ class MasterNode(Node):
         comm_index = 0x1400 + rpdo
         map_index = 0x1600 + rpdo
         self._send_pdo(comm_index, map_index, raise_error)
+
+    def send_mpdo(
+        self,
+        tpdo: int,
+        key: Any,
+        index: Union[int, str],
+        subindex: Union[int, str, None],
+        value: Union[int, float, bool],
+        raise_error: bool = True,
+    ):  # pylint: disable=R0917
+        """
+        Write a value to a remote node's OD with a destination address mode (DAM) MPDO, sent on one
+        of the master node's TPDO COB-IDs. One frame per value instead of a SDO round trip; the
+        remote node must have enabled DAM MPDOs on that COB-ID. Will not be sent if the node is not
+        in operational state.
+
+        Parameters
+        ----------
+        tpdo: int
+            The master node's TPDO number to use the COB-ID of.
+        key: Any
+            The dict key for the node to write to.
+        index: int | str
+            The index to write to.
+        subindex: int | str | None
+            The subindex to write to or None.
+        value: int | float | bool
+            The value to write; must be 4 bytes or less.
+        raise_error: bool
+            Set to False to not raise NetworkError.
+
+        Raises
+        ------
+        ValueError
+            The value does not fit in a MPDO.
+        NetworkError
+            Cannot send a MPDO when the network is down.
+        """
+
+        if self._node.nmt.state != "OPERATIONAL":
+            return
+
+        od = self._od_db[key]
+        var = od[index] if subindex is None else od[index][subindex]
+        size = mpdo_var_size(var)
+        data = pack_mpdo(True, od.node_id, var, var.encode_raw(value)[:size])
+        cob_id = self._od[0x1800 + tpdo - 1][1].value & 0x3F_FF_FF_FF
+        self._network.send_message(cob_id, data, raise_error)
+
+    def enable_sam_mpdo(
+        self,
+        key: Any,
+        tpdo: int,
+        callback: Union[Callable[[Any, int, int, Any], None], None] = None,
+    ):
+        """
+        Receive source address mode (SAM) MPDOs from a remote node's TPDO. Each value is decoded
+        into the remote node's OD in :py:attr:`od_db`.
+
+        Parameters
+        ----------
+        key: Any
+            The dict key for the node sending the MPDOs.
+        tpdo: int
+            The remote node's TPDO number that is sending MPDOs.
+        callback: Callable[[Any, int, int, Any], None] | None
+            Optional function called with the node key, index, subindex, and value for each MPDO.
+        """
+
+        od = self._od_db[key]
+        cob_id = od[0x1800 + tpdo - 1][1].value & 0x3F_FF_FF_FF
+
+        def on_sam_mpdo(cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
+            try:
+                mpdo = unpack_mpdo(data)
+                if mpdo.dam or mpdo.node_id != od.node_id:
+                    return
+                obj = od[mpdo.index]
+                var = (
+                    obj
+                    if isinstance(obj, canopen.objectdictionary.ODVariable)
+                    else obj[mpdo.subindex]
+                )
+                value = var.decode_raw(mpdo.data[: mpdo_var_size(var)])
+            except (KeyError, ValueError) as e:
+                logger.error(f"invalid MPDO from {key}: {e}")
+                return
+
+            var.value = value
+            if callback is not None:
+                callback(key, mpdo.index, mpdo.subindex, value)
+
+        self._network.subscribe(cob_id, on_sam_mpdo)
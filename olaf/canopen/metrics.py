@@ -0,0 +1,202 @@
+"""Lightweight counters and latency histograms for the node hot paths"""
+
+from bisect import bisect_left
+from collections import deque
+from threading import Lock
+from typing import Hashable
+
+LATENCY_BUCKETS_US = (50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000)
+"""tuple[int]: Upper bounds of the latency histogram buckets in microseconds."""
+
+
+class Histogram:
+    """
+    Call counter and fixed-bucket latency histogram.
+
+    Not locked; a rare lost update from concurrent observes is fine for metrics.
+    """
+
+    def __init__(self):
+        self.count = 0
+        """int: Number of observations."""
+        self.total_us = 0.0
+        """float: Sum of all latencies in microseconds."""
+        self.max_us = 0.0
+        """float: Max latency in microseconds."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS_US) + 1)
+        """list[int]: Count per bucket of :py:data:`LATENCY_BUCKETS_US`, the last is overflow."""
+
+    def observe(self, seconds: float):
+        """
+        Add an observation.
+
+        Parameters
+        ----------
+        seconds: float
+            The latency in seconds.
+        """
+
+        us = seconds * 1_000_000
+        self.count += 1
+        self.total_us += us
+        self.max_us = max(self.max_us, us)
+        self.buckets[bisect_left(LATENCY_BUCKETS_US, us)] += 1
+
+    def to_dict(self) -> dict:
+        """dict: The histogram as a dictionary."""
+
+        buckets = {f"le_{bound}us": count for bound, count in zip(LATENCY_BUCKETS_US, self.buckets)}
+        buckets["overflow"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean_us": self.total_us / self.count if self.count else 0.0,
+            "max_us": self.max_us,
+            "buckets": buckets,
+        }
+
+
+class RollingPercentiles:
+    """
+    Latency percentiles over a rolling window of the latest observations.
+
+    Observing is just a deque append; percentiles are only computed when read.
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Parameters
+        ----------
+        window: int
+            Number of latest observations to keep.
+        """
+
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+        """int: Number of observations, including those that have left the window."""
+
+    def observe(self, seconds: float):
+        """
+        Add an observation.
+
+        Parameters
+        ----------
+        seconds: float
+            The latency in seconds.
+        """
+
+        self._samples.append(seconds * 1_000_000)
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        """dict: The count and the p50, p99, and max latency over the window in microseconds."""
+
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count, "p50_us": 0.0, "p99_us": 0.0, "max_us": 0.0}
+        return {
+            "count": self.count,
+            "p50_us": samples[(len(samples) - 1) * 50 // 100],
+            "p99_us": samples[(len(samples) - 1) * 99 // 100],
+            "max_us": samples[-1],
+        }
+
+
+class MetricsRegistry:
+    """
+    Registry of histograms and rolling percentiles by kind (e.g. ``tpdo``) and an optional key
+    (e.g. a PDO number).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._histograms: dict[tuple[str, Hashable], Histogram] = {}
+        self._percentiles: dict[tuple[str, Hashable], RollingPercentiles] = {}
+
+    def histogram(self, kind: str, key: Hashable = None) -> Histogram:
+        """
+        Get a histogram, making it if it does not exist.
+
+        Parameters
+        ----------
+        kind: str
+            The kind of thing being measured.
+        key: Hashable
+            Optional key for a specific thing of that kind. An int or a tuple of ints.
+
+        Returns
+        -------
+        Histogram
+            The histogram.
+        """
+
+        histogram = self._histograms.get((kind, key))
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault((kind, key), Histogram())
+        return histogram
+
+    def observe(self, kind: str, key: Hashable, seconds: float):
+        """Add an observation to a histogram. See :py:meth:`histogram` for parameters."""
+
+        self.histogram(kind, key).observe(seconds)
+
+    def percentiles(self, kind: str, key: Hashable = None) -> RollingPercentiles:
+        """
+        Get rolling percentiles, making them if they do not exist.
+
+        Parameters
+        ----------
+        kind: str
+            The kind of thing being measured.
+        key: Hashable
+            Optional key for a specific thing of that kind. An int or a tuple of ints.
+
+        Returns
+        -------
+        RollingPercentiles
+            The rolling percentiles.
+        """
+
+        percentiles = self._percentiles.get((kind, key))
+        if percentiles is None:
+            with self._lock:
+                percentiles = self._percentiles.setdefault((kind, key), RollingPercentiles())
+        return percentiles
+
+    def observe_percentiles(self, kind: str, key: Hashable, seconds: float):
+        """Add an observation to rolling percentiles. See :py:meth:`percentiles` for parameters."""
+
+        self.percentiles(kind, key).observe(seconds)
+
+    def clear(self):
+        """Remove all histograms and rolling percentiles."""
+
+        with self._lock:
+            self._histograms = {}
+            self._percentiles = {}
+
+    def to_dict(self) -> dict[str, dict]:
+        """dict[str, dict]: All histograms by name, e.g. ``tpdo_1`` or ``sdo_read_0x3003_0x02``."""
+
+        with self._lock:
+            items = list(self._histograms.items())
+        return dict(sorted((_name(kind, key), hist.to_dict()) for (kind, key), hist in items))
+
+    def percentiles_to_dict(self) -> dict[str, dict]:
+        """dict[str, dict]: All rolling percentiles by name, named like the histograms."""
+
+        with self._lock:
+            items = list(self._percentiles.items())
+        return dict(sorted((_name(kind, key), pct.to_dict()) for (kind, key), pct in items))
+
+
+def _name(kind: str, key: Hashable) -> str:
+    """Make a histogram name from its kind and key."""
+
+    if key is None:
+        return kind
+    if isinstance(key, tuple):
+        return kind + "".join(f"_0x{i:02X}" for i in key)
+    if kind == "rx":
+        return f"{kind}_0x{key:03X}"  # cob ids
+    return f"{kind}_{key}"
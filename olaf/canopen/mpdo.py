@@ -0,0 +1,106 @@
+"""Multiplexed PDO (MPDO) frames from CiA 301"""
+
+import struct
+from dataclasses import dataclass
+
+from canopen.objectdictionary import ODVariable
+
+MPDO_DATA_LEN = 4
+"""int: Max length of the data of a MPDO in bytes."""
+
+_DAM = 0x80  # address mode flag, set for destination address mode
+_HEADER = struct.Struct("<BHB")
+
+
+@dataclass(frozen=True)
+class Mpdo:
+    """A decoded MPDO frame."""
+
+    dam: bool
+    """bool: True if in destination address mode, False if in source address mode."""
+    node_id: int
+    """int: Node id of the consumer in DAM (0 for all nodes) or of the producer in SAM."""
+    index: int
+    """int: Index of the object; in the consumer's OD in DAM or the producer's OD in SAM."""
+    subindex: int
+    """int: Subindex of the object."""
+    data: bytes
+    """bytes: The raw value, always 4 bytes, zero padded."""
+
+
+def mpdo_var_size(var: ODVariable) -> int:
+    """
+    Get the size of a variable's value in a MPDO.
+
+    Parameters
+    ----------
+    var: ODVariable
+        The variable.
+
+    Raises
+    ------
+    ValueError
+        The variable can not fit in a MPDO.
+
+    Returns
+    -------
+    int
+        The size in bytes.
+    """
+
+    data_type = ODVariable.STRUCT_TYPES.get(var.data_type)
+    if data_type is None or data_type.size > MPDO_DATA_LEN:
+        raise ValueError(f"{var.name} does not fit in a MPDO, only values up to 4 bytes do")
+    return data_type.size
+
+
+def pack_mpdo(dam: bool, node_id: int, var: ODVariable, raw: bytes) -> bytes:
+    """
+    Pack a MPDO frame.
+
+    Parameters
+    ----------
+    dam: bool
+        True for destination address mode, False for source address mode.
+    node_id: int
+        Node id of the consumer in DAM (0 for all nodes) or of the producer in SAM.
+    var: ODVariable
+        The variable the value is for.
+    raw: bytes
+        The encoded value, up to 4 bytes.
+
+    Returns
+    -------
+    bytes
+        The 8 byte MPDO frame.
+    """
+
+    header = _HEADER.pack((_DAM if dam else 0) | (node_id & 0x7F), var.index, var.subindex)
+    return header + raw.ljust(MPDO_DATA_LEN, b"\x00")
+
+
+def unpack_mpdo(data: bytes) -> Mpdo:
+    """
+    Unpack a MPDO frame.
+
+    Parameters
+    ----------
+    data: bytes
+        The frame data.
+
+    Raises
+    ------
+    ValueError
+        The frame is not 8 bytes long.
+
+    Returns
+    -------
+    Mpdo
+        The decoded frame.
+    """
+
+    if len(data) != _HEADER.size + MPDO_DATA_LEN:
+        raise ValueError(f"MPDOs are 8 bytes, got {len(data)} bytes")
+
+    addr, index, subindex = _HEADER.unpack_from(data)
+    return Mpdo(bool(addr & _DAM), addr & 0x7F, index, subindex, bytes(data[_HEADER.size :]))
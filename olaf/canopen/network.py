@@ -1,15 +1,20 @@
 """CAN network"""
 
+import asyncio
 import os
 import subprocess
+import weakref
 from enum import IntEnum, auto
-from typing import Callable, Union
+from typing import Callable, Optional, Union
 
 import can
 import canopen
 import psutil
 from loguru import logger
 
+from .dispatcher import ShardedDispatcher
+from .link_monitor import LinkMonitor, LinkState
+
 
 class CanNetworkError(Exception):
     """Error with the CANopen network / bus"""
@@ -36,21 +41,63 @@ class CanNetwork:
         channel: str,
         socketcand_host: str = "localhost",
         socketcand_port: int = 29536,
+        *,
+        fd: bool = False,
+        brs: bool = True,
+        dispatch_workers: int = 0,
     ):
+        """
+        Parameters
+        ----------
+        bus_type: str
+            The python-can interface, e.g. socketcan, socketcand, or virtual.
+        channel: str
+            The CAN channel, e.g. can0 or vcan0.
+        socketcand_host: str
+            Host for the socketcand bus; only used if bus_type is socketcand.
+        socketcand_port: int
+            Port for the socketcand bus; only used if bus_type is socketcand.
+        fd: bool
+            Use CAN FD. All frames sent are CAN FD frames and PDOs can be up to 64 bytes.
+        brs: bool
+            Use bit rate switching for the data phase of CAN FD frames; only used if fd is set.
+        dispatch_workers: int
+            Number of worker threads to call the handlers of received messages from, sharded by
+            COB-ID, plus one for high-priority handlers. 0 to call all handlers from the CAN
+            notifier thread.
+        """
+
         self._bus_type = bus_type
         self._channel = channel
         self._socketcand_host = socketcand_host
         self._socketcand_port = socketcand_port
+        self._fd = fd
+        self._brs = fd and brs
 
         self._reset_cbs: list[Callable[[], None]] = []
+        self._link_cbs: list[Callable[[], None]] = []
         self._nodes: list[canopen.Node] = []
         self._subscriptions: list[tuple[int, Callable[[int, bytes, float], None]]] = []
         self._bus: Union[can.BusABC, None] = None
         self._network: Union[canopen.Network, None] = None
         self._notifier = None
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._dispatcher = ShardedDispatcher(dispatch_workers) if dispatch_workers > 0 else None
 
         self._state = CanNetworkState.NETWORK_INIT
 
+        # the link state is pushed by a rtnetlink listener as it changes, polled if there is none
+        ref = weakref.WeakMethod(self._on_link)
+
+        def on_link(link: LinkState):
+            method = ref()
+            if method is not None:
+                method(link)
+
+        self._link_monitor = LinkMonitor(channel, on_link)
+        self._link_monitor_started = False
+        self._link: Optional[LinkState] = None
+
         if os.geteuid() != 0:  # running as root
             logger.warning("not running as root, cannot restart CAN bus if it goes down")
 
@@ -58,23 +105,28 @@ class CanNetwork:
         self._first_bus_down = True  # flag to only log error message on _first error
 
     def __del__(self):
+        self._link_monitor.stop()
         self._del()
+        if self._dispatcher is not None:
+            self._dispatcher.stop()
 
     def _init(self):
         logger.info("(re)starting CAN network")
+        kwargs = {"fd": True} if self._fd else {}
         try:
             self._bus = can.interface.Bus(
                 interface=self._bus_type,
                 host=self._socketcand_host,
                 port=self._socketcand_port,
                 channel=self._channel,
+                **kwargs,
             )
         except Exception as e:  # pylint: disable=W0718
             logger.info(str(e))
             return
 
         self._network = canopen.Network(self._bus)
-        self._notifier = can.Notifier(self._network.bus, self._network.listeners, 1)
+        self._notifier = can.Notifier(self._network.bus, self._network.listeners, 1, self._loop)
         self._network.notifier = self._notifier
         try:
             for sub in self._subscriptions:
@@ -111,17 +163,49 @@ class CanNetwork:
             self._bus = None
 
         if os.geteuid() == 0:  # running as root
+            fd = " dbitrate 5000000 fd on" if self._fd else ""
             cmd = (
                 f"ip link set {self._channel} down;"
-                f"ip link set {self._channel} type can bitrate 1000000;"
+                f"ip link set {self._channel} type can bitrate 1000000{fd};"
                 f"ip link set {self._channel} up"
             )
             out = subprocess.run(cmd, shell=True, check=False)
             if out.returncode != 0:
                 logger.error(out)
 
+    def _poll_link(self) -> LinkState:
+        """Get the link state of the CAN channel by polling all interfaces."""
+
+        bus = psutil.net_if_stats().get(self._channel)
+        if bus is None:
+            return LinkState(False, False)
+        return LinkState(True, bus.isup)
+
+    def _on_link(self, link: LinkState):
+        """
+        Store the link state the link monitor saw and call the link callbacks, so the caller of
+        :py:meth:`monitor` can move the state machine right away. Called from the link monitor
+        thread, so the state machine is never moved here.
+        """
+
+        self._link = link
+        if self._state == CanNetworkState.NETWORK_INIT:
+            return  # not started yet
+        bus_up = link.up and not link.bus_off
+        if self._state == CanNetworkState.NETWORK_DOWN and link.exists and not bus_up:
+            return  # restarting the bus makes down messages too, leave restarts to the period
+        for link_cb in self._link_cbs:
+            try:
+                link_cb()
+            except Exception as e:  # pylint: disable=W0718
+                logger.exception(f"link callback raised: {e}")
+
     def monitor(self):
-        """Monitor the CAN bus/network"""
+        """
+        Monitor the CAN bus/network. Link changes are pushed by a rtnetlink listener, if
+        available, which calls the link callbacks so this can be called right away; otherwise the
+        link state is polled on every call.
+        """
 
         if self._bus_type == "socketcand":
             if self._state != CanNetworkState.NETWORK_UP:
@@ -129,8 +213,19 @@ class CanNetwork:
                 self._state = CanNetworkState.NETWORK_UP
             return
 
-        bus = psutil.net_if_stats().get(self._channel)
-        bus_exist = bus is not None
+        if not self._link_monitor_started:
+            self._link_monitor_started = True
+            if self._link_monitor.start():
+                self._link = self._poll_link()  # the state before the first message
+
+        link = self._link if self._link_monitor.is_running else None
+        self._update(link if link is not None else self._poll_link())
+
+    def _update(self, link: LinkState):
+        """Move the state machine for the link state."""
+
+        bus_exist = link.exists
+        bus_up = link.up and not link.bus_off  # bus-off needs a restart, like a downed bus
 
         if self._state == CanNetworkState.NETWORK_INIT:
             self._init()
@@ -143,13 +238,13 @@ class CanNetwork:
                 self._state = CanNetworkState.NETWORK_DOWN
         elif self._state == CanNetworkState.NETWORK_DOWN:
             if self._first_bus_down:
-                logger.error(f"{self._channel} is down")
+                logger.error(f"{self._channel} is {'bus-off' if link.bus_off else 'down'}")
                 self._first_bus_down = False
             if not bus_exist:
                 self._first_no_bus = True  # reset flag
                 self._del()
                 self._state = CanNetworkState.NETWORK_NO_BUS
-            elif not bus.isup:
+            elif not bus_up:
                 self._del()
                 self._restart_bus()
             else:
@@ -160,36 +255,95 @@ class CanNetwork:
                 self._first_no_bus = True  # reset flag
                 self._del()
                 self._state = CanNetworkState.NETWORK_NO_BUS
-            elif not bus.isup:
+            elif not bus_up:
                 self._first_bus_down = True  # reset flag
                 self._del()
                 self._state = CanNetworkState.NETWORK_DOWN
 
+    def set_event_loop(self, loop: Union[asyncio.AbstractEventLoop, None]):
+        """
+        Dispatch received CAN messages from an asyncio event loop instead of the notifier thread.
+        If the CAN bus has a file descriptor (e.g. socketcan), no reader thread is used at all.
+
+        Parameters
+        ----------
+        loop: asyncio.AbstractEventLoop | None
+            The event loop to use or None to go back to the notifier thread.
+        """
+
+        self._loop = loop
+        if self._notifier is not None:
+            # don't block the event loop waiting on the old reader thread's recv timeout, it will
+            # exit on its own and at most dispatch one more message
+            self._notifier.stop(0)
+            self._notifier = can.Notifier(self._network.bus, self._network.listeners, 1, loop)
+            self._network.notifier = self._notifier
+
     def add_reset_callback(self, reset_cb: Callable[[], None]):
         """Add CAN bus/network reset callback."""
         if self._network is not None:
             reset_cb()
         self._reset_cbs.append(reset_cb)
 
+    def add_link_callback(self, link_cb: Callable[[], None]):
+        """
+        Add a callback for when the link monitor sees the link state change. It is called from the
+        link monitor thread and should only wake up the caller of :py:meth:`monitor`.
+        """
+        self._link_cbs.append(link_cb)
+
     @property
     def status(self) -> CanNetworkState:
         """CanState: CAN bus state."""
         return self._state
 
-    def send_message(self, cob_id: int, data: bytes, raise_error: bool = True):
-        """Send a CAN message."""
+    def send_message(self, cob_id: int, data: bytes, raise_error: bool = True) -> bool:
+        """Send a CAN message. Returns True if it was sent."""
 
         try:
             if self._bus is not None:
-                self._bus.send(can.Message(arbitration_id=cob_id, data=data, is_extended_id=False))
-            elif raise_error:
+                if self._fd:
+                    # CAN FD frames over 8 bytes only come in some lengths, pad to the next one
+                    length = can.util.dlc2len(can.util.len2dlc(len(data)))
+                    if length != len(data):
+                        data = bytes(data) + bytes(length - len(data))
+                    msg = can.Message(
+                        arbitration_id=cob_id,
+                        data=data,
+                        is_extended_id=False,
+                        is_fd=True,
+                        bitrate_switch=self._brs,
+                    )
+                else:
+                    msg = can.Message(arbitration_id=cob_id, data=data, is_extended_id=False)
+                self._bus.send(msg)
+                return True
+            if raise_error:
                 raise CanNetworkError("can network is down")
         except Exception as e:  # pylint: disable=W0718
             if raise_error:
                 raise CanNetworkError(str(e)) from e
+        return False
 
-    def subscribe(self, cob_id: int, callback: Callable[[int, bytes, float], None]):
-        """Subscribe to CAN messages by the cob_id."""
+    def subscribe(
+        self, cob_id: int, callback: Callable[[int, bytes, float], None], priority: bool = False
+    ):
+        """
+        Subscribe to CAN messages by the cob_id.
+
+        Parameters
+        ----------
+        cob_id: int
+            The COB-ID to subscribe to.
+        callback: Callable[[int, bytes, float], None]
+            The handler, called with the COB-ID, data, and receive timestamp of each message.
+        priority: bool
+            Handle on the high-priority worker, if there are dispatch workers. Use for handlers
+            that must not wait behind others, like SYNC and RPDOs.
+        """
+
+        if self._dispatcher is not None:
+            callback = self._dispatcher.wrap(callback, priority)
         if self._network is not None:
             self._network.subscribe(cob_id, callback)
         self._subscriptions.append((cob_id, callback))
@@ -199,6 +353,19 @@ class CanNetwork:
         if self._network is not None:
             self._network.add_node(node)
 
+    @property
+    def dispatch_stats(self) -> dict[str, dict[str, int]]:
+        """
+        dict[str, dict[str, int]]: The queue depths and the dispatched and dropped message counts
+        of each dispatch worker, empty if there are no dispatch workers.
+        """
+        return {} if self._dispatcher is None else self._dispatcher.stats
+
+    @property
+    def fd(self) -> bool:
+        """bool: Is CAN FD enabled."""
+        return self._fd
+
     @property
     def channel(self) -> str:
         """str: The CAN channel."""
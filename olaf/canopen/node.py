@@ -1,30 +1,48 @@
 """OreSat CANopen Node"""
 
+import asyncio
+import inspect
 import os
 import struct
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum
 from pathlib import Path
-from threading import Event
-from time import monotonic
+from threading import Event, Lock
+from time import monotonic, perf_counter, time
 from typing import Any, Callable, Dict, Union
 
 from canopen import LocalNode, ObjectDictionary
-from canopen.objectdictionary import (
-    DOMAIN,
-    FLOAT_TYPES,
-    INTEGER_TYPES,
-    OCTET_STRING,
-    VISIBLE_STRING,
-    ODArray,
-    ODRecord,
-    ODVariable,
-)
+from canopen.nmt import NMT_STATES
+from canopen.objectdictionary import ODVariable
 from loguru import logger
 
 from ..canopen.network import CanNetwork, CanNetworkState
 from ..common.daemon import Daemon
 from ..common.oresat_file_cache import OreSatFileCache
 from . import EmcyCode
+from .accessor import OdAccessor
+from .metrics import MetricsRegistry
+from .node_changes import ChangeSubscription, ChangeSubscriptionMixin
+from .node_emcy import EmcyMixin
+from .node_mpdo import MpdoMixin
+from .node_od import OdAccessMixin
+from .node_sdo import SdoCallbacksMixin
+from .od_index import OdIndex
+from .param_store import ParamStore
+from .pdo import PDO_MAX_LEN, PDO_MAX_LEN_FD, PdoMap
+from .scheduler import DeadlineScheduler, JitterStats
+from .seqlock import SeqLock
+from .snapshot import SnapshotCodec
+
+_HEARTBEAT = 0  # scheduler key for the heartbeat, all other keys are TPDO numbers
+_MONITOR_PERIOD = 0.1  # seconds between CAN network monitor calls
+_STORE_SIGNATURE = 0x65766173  # "save" in ASCII
+_RESTORE_SIGNATURE = 0x64616F6C  # "load" in ASCII
+_NMT_STATE_CODES = {state: code for code, state in NMT_STATES.items()}
+# (mask, command) of the initiate download / upload / block upload / block download requests,
+# the only SDO requests with a multiplexor
+_SDO_INITIATE = ((0xF0, 0x20), (0xFF, 0x40), (0xFB, 0xA0), (0xF9, 0xC0))
+_SDO_QUEUE_MAX = 32  # max SDO frames and slow write callbacks waiting on the worker
 
 
 class NodeStop(IntEnum):
@@ -42,7 +60,7 @@ class NodeStop(IntEnum):
     """Just power off the system."""
 
 
-class Node:
+class Node(SdoCallbacksMixin, OdAccessMixin, ChangeSubscriptionMixin, MpdoMixin, EmcyMixin):
     """
     OreSat CANopen Node class
 
@@ -72,7 +90,15 @@ class Node:
         """
 
         self._event = Event()
+        self._wake = Event()  # interrupts the run loop sleep to reschedule timers
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None  # set while run_async is running
+        self._async_wake: Union[asyncio.Event, None] = None
+        self._next_monitor = 0.0
+        self._link_changed = False  # set by the link monitor thread to monitor the network now
+        self._scheduler = DeadlineScheduler()
+        self._metrics = MetricsRegistry()
         self._od = od
+        self._od_index = OdIndex(od)  # every form of index and subindex, for O(1) lookups
         self._node: LocalNode = None
         self._network: CanNetwork = network
         self._read_cbs = {}  # type: ignore
@@ -80,6 +106,32 @@ class Node:
         self._syncs = 0
         self._reset = NodeStop.SOFT_RESET
         self._daemons = {}  # type: ignore
+        self._accessors: dict[tuple, OdAccessor] = {}  # bound handles by (index, subindex)
+        self._od_seqlock = SeqLock()  # writers of groups of values hold it, readers retry
+        self._od_vars: Union[list[ODVariable], None] = None  # all variables, in index order
+        self._snapshot_codec: SnapshotCodec = None
+        self._pdo_maps: dict[int, PdoMap] = {}  # compiled pdo mappings by mapping index
+        self._rpdo_maps: dict[int, PdoMap] = {}  # compiled rpdo mappings by cob id
+        self._cos_lock = Lock()
+        self._cos_tpdos: set[int] = set()  # TPDOs to send when a mapped value changes
+        self._cos_vars: dict[tuple[int, int], tuple[int, ...]] = {}  # mapped object -> TPDOs
+        self._cos_due: dict[int, float] = {}  # dirty TPDO -> earliest time it can be sent
+        self._tpdo_sent: dict[int, float] = {}  # TPDO -> last time it was sent
+        self._mpdo_scans: dict[int, list[ODVariable]] = {}  # SAM MPDO scan lists by TPDO
+        self._mpdo_next: dict[int, int] = {}  # next position in the scan list by TPDO
+        self._slow_sdo: set[tuple[int, int]] = set()  # objects with slow SDO callbacks
+        self._sdo_executor: Union[ThreadPoolExecutor, None] = None  # made on first slow callback
+        self._sdo_lock = Lock()
+        self._sdo_queued = 0  # SDO frames and slow write callbacks waiting on or in the worker
+        self._sdo_deferring = False  # current SDO transfer is for an object with slow callbacks
+        self._operational = True  # NMT state to go into after a network reset
+        self._emcy_lock = Lock()
+        self._emcy_queue: dict[int, list] = {}  # EMCYs waiting on the inhibit time, by code
+        self._emcy_sent = 0.0  # last time an EMCY was sent
+        self._subs_lock = Lock()
+        self._subs: dict[int, ChangeSubscription] = {}  # change subscriptions by handle
+        self._sub_vars: dict[tuple[int, int], list[ChangeSubscription]] = {}  # object -> subs
+        self._next_sub = 1
 
         if os.geteuid() == 0:  # running as root
             self.work_base_dir = "/var/lib/oresat"
@@ -97,57 +149,102 @@ class Node:
         logger.debug(f"fread cache path {self._fread_cache.dir}")
         logger.debug(f"fwrite cache path {self._fwrite_cache.dir}")
 
+        self._param_store = ParamStore(
+            self.work_base_dir + "/od_params.bin", self._od, self._od_seqlock
+        )
+        if self._param_store.load():
+            logger.info(f"loaded stored OD parameters from {self._param_store.file_path}")
+        self._setup_emcy_history()
+
         self._start_time = monotonic()
         self._network.monitor()
         self._first_network_reset = True
         self._network.add_reset_callback(self._setup_node)
-        self._network.subscribe(0x80, self._on_sync)
+        self._network.add_link_callback(self._on_link_change)
+        self._network.subscribe(0x80, self._on_sync, priority=True)
+
+        # TPDO numbers to send for each value of the SYNC counter
+        self._tpdos = [i + 1 for i in range(512) if 0x1800 + i in self._od]
+        self._sync_table: list[tuple[int, ...]] = [()] * 241
+        for tpdo in self._tpdos:
+            self._update_sync_table(tpdo)
 
         self._rpdo_cobid_to_num: dict[int, int] = {}
         for i in range(self._od.device_information.nr_of_RXPDO):
             cob_id = self._od[0x1400 + i][1].value
             self._rpdo_cobid_to_num[cob_id] = i
-            self._network.subscribe(cob_id, self._on_pdo)
+            self._network.subscribe(cob_id, self._on_pdo, priority=True)
 
     def __del__(self):
         # stop the monitor thread if it is running
         if not self._event.is_set():
             self.stop()
 
+    def _update_sync_table(self, tpdo: int):
+        """Update the SYNC counter values a TPDO is sent on from its transmission type."""
+
+        transmission_type = self._od[0x1800 + tpdo - 1][2].value
+        for syncs in range(1, len(self._sync_table)):
+            tpdos = [i for i in self._sync_table[syncs] if i != tpdo]
+            if 1 <= transmission_type <= 240 and syncs % transmission_type == 0:
+                tpdos.append(tpdo)
+                tpdos.sort()
+            self._sync_table[syncs] = tuple(tpdos)
+
     def _on_sync(self, cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
-        """On SYNC message send TPDOs configured to be SYNC-based"""
+        """
+        On SYNC message send TPDOs configured to be SYNC-based and record how long after the SYNC
+        was received each one was sent.
+        """
+
+        start = perf_counter()
 
         self._syncs += 1
         if self._syncs == 241:
             self._syncs = 1
 
-        for i in range(self.od.device_information.nr_of_TXPDO):
-            transmission_type = self.od[0x1800 + i][2].value
-            if self._syncs % transmission_type == 0:
-                self.send_tpdo(i)
+        for tpdo in self._sync_table[self._syncs]:
+            if self.send_tpdo(tpdo, False) and timestamp > 0:
+                # the CAN receive time is in the same epoch as time.time()
+                self._metrics.observe_percentiles("tpdo", tpdo, time() - timestamp)
+
+        self._metrics.observe("sync", None, perf_counter() - start)
 
     def _on_pdo(self, cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
-        rpdo = self._rpdo_cobid_to_num[cob_id]
-        maps = self.od[0x1600 + rpdo][0].value
+        # PDOs are only processed in the OPERATIONAL state
+        if not self.is_operational:
+            return
 
-        offset = 0
-        for i in range(maps):
-            pdo_map = self.od[0x1600 + rpdo][i + 1].value
+        start = perf_counter()
 
-            if pdo_map == 0:
-                break  # nothing todo
+        pdo_map = self._rpdo_maps.get(cob_id)
+        if pdo_map is None:
+            rpdo = self._rpdo_cobid_to_num[cob_id]
+            pdo_map = PdoMap(
+                self._od, 0x1400 + rpdo, 0x1600 + rpdo, self._get_read_cb, self._get_write_cb
+            )
+            self._rpdo_maps[cob_id] = pdo_map
 
-            pdo_map_bytes = pdo_map.to_bytes(4, "big")
-            index, subindex, size = struct.unpack(">HBB", pdo_map_bytes)
-            size //= 8
+        if len(data) < pdo_map.size:
+            self.send_emcy(EmcyCode.PROTOCOL_PDO_NOT_PROCESSED, b"", False)
+            return
 
-            # call sdo callback(s) and convert data to bytes
-            if isinstance(self.od[index], ODVariable):
-                self._node.sdo[index].raw = data[offset : offset + size]
-            else:  # record or array
-                self._node.sdo[index][subindex].raw = data[offset : offset + size]
+        values = pdo_map.unpack(data)
+        changed = []
+        with self._od_seqlock.write():
+            for var, value, _ in values:
+                changed.append(var.value != value)
+                var.value = value
+        for (var, value, write_cb), var_changed in zip(values, changed):
+            self._on_od_write(var, var_changed)
+            if write_cb is None:
+                continue
+            if (var.index, var.subindex) in self._slow_sdo:
+                self._defer_sdo(self._call_write_cb, write_cb, value)
+            else:
+                self._call_write_cb(write_cb, value)
 
-            offset += size
+        self._metrics.observe("rx", cob_id, perf_counter() - start)
 
     def _setup_node(self):
         """Create the CANopen node."""
@@ -156,8 +253,15 @@ class Node:
             self._od.node_id = 0x7C
 
         self._node = LocalNode(self._od.node_id, self._od)
+        # shadow the SDO server's request handler before the network subscribes it, so requests
+        # for objects with slow callbacks can be deferred to the SDO worker
+        self._node.sdo.on_request = self._make_sdo_request_handler(self._node.sdo.on_request)
         self._network.add_node(self._node)
-        self._node.nmt.state = "OPERATIONAL"
+        self._node.nmt.state = "OPERATIONAL" if self._operational else "PRE-OPERATIONAL"
+        # the run loop sends the heartbeat, so stop the one canopen starts on the transition to
+        # PRE-OPERATIONAL and on writes to 0x1017, or every heartbeat is sent twice
+        self._node.nmt.stop_heartbeat()
+        self._node._write_callbacks.remove(self._node.nmt.on_write)  # pylint: disable=W0212
 
         self._node.add_read_callback(self._on_sdo_read)
         self._node.add_write_callback(self._on_sdo_write)
@@ -167,11 +271,188 @@ class Node:
         else:
             self._first_network_reset = False
 
+    def _make_sdo_request_handler(
+        self, on_request: Callable[[int, bytes, float], None]
+    ) -> Callable[[int, bytes, float], None]:
+        """
+        Wrap the SDO server's request handler. Transfers for objects with slow callbacks, and any
+        frames that arrive while one is queued or running, are handled by the SDO worker, so the
+        CAN receive thread never waits on them. Frames stay in order, so the transfer completes
+        normally once the callback is done.
+        """
+
+        def on_sdo_request(can_id: int, data: bytes, timestamp: float):
+            if len(data) >= 4 and any(data[0] & mask == cmd for mask, cmd in _SDO_INITIATE):
+                self._sdo_deferring = struct.unpack_from("<HB", data, 1) in self._slow_sdo
+
+            if self._sdo_deferring or self._sdo_queued > 0:
+                self._defer_sdo(on_request, can_id, data, timestamp)
+            else:
+                on_request(can_id, data, timestamp)
+
+        return on_sdo_request
+
+    def _defer_sdo(self, func: Callable, *args):
+        """Run a SDO frame handler or slow write callback on the SDO worker."""
+
+        with self._sdo_lock:
+            if self._sdo_queued >= _SDO_QUEUE_MAX:
+                logger.error("SDO worker queue is full, dropping request")
+                return
+            self._sdo_queued += 1
+            if self._sdo_executor is None:
+                self._sdo_executor = ThreadPoolExecutor(1, thread_name_prefix="olaf-sdo")
+
+        def run():
+            try:
+                func(*args)
+            except Exception as e:  # pylint: disable=W0718
+                logger.exception(f"deferred SDO callback raised: {e}")
+            finally:
+                with self._sdo_lock:
+                    self._sdo_queued -= 1
+
+        self._sdo_executor.submit(run)
+
     def _destroy_node(self):
         """Destroy the CANopen node."""
 
+        if self._node is not None:
+            self._node.nmt.stop_heartbeat()
         self._node = None
 
+    def _update_heartbeat_timer(self, first: Union[float, None] = None):
+        """Reschedule the heartbeat from the producer heartbeat time."""
+
+        self._scheduler.set_period(_HEARTBEAT, self._od[0x1017].value / 1000, first)
+        self._wakeup()
+
+    def _update_tpdo_timer(self, tpdo: int, first: Union[float, None] = None):
+        """Reschedule a TPDO from its transmission type and event timer."""
+
+        transmission_type = self._od[0x1800 + tpdo - 1][2].value
+        event_time = self._od[0x1800 + tpdo - 1][5].value
+        period = event_time / 1000 if transmission_type in [0xFE, 0xFF] else 0
+        self._scheduler.set_period(tpdo, period, first)
+        self._wakeup()
+
+    def _start_timers(self):
+        """Schedule the heartbeat and all timer-based TPDOs to be sent now."""
+
+        now = monotonic()
+        self._next_monitor = now
+        self._update_heartbeat_timer(now)
+        for tpdo in self._tpdos:
+            self._update_tpdo_timer(tpdo, now)
+
+    def _run_once(self) -> float:
+        """
+        One pass of the run loop. Monitor the network if it is time to, and send the heartbeat and
+        all TPDOs that are due.
+
+        Returns
+        -------
+        float
+            The monotonic time the run loop should wake up at next.
+        """
+
+        now = monotonic()
+        link_changed, self._link_changed = self._link_changed, False
+        if now >= self._next_monitor:
+            self._network.monitor()
+            self._next_monitor = max(self._next_monitor + _MONITOR_PERIOD, now)
+        elif link_changed:
+            self._network.monitor()
+
+        # send heartbeat and timer-based TPDOs that are due
+        network_up = self._network.status == CanNetworkState.NETWORK_UP
+        for key in self._scheduler.pop_due(now):
+            if not network_up:
+                continue
+            if key == _HEARTBEAT:
+                self._network.send_message(0x700 + self.od.node_id, self._heartbeat_state(), False)
+            else:
+                self.send_tpdo(key, False)
+
+        # send change-of-state TPDOs that are past their inhibit time
+        with self._cos_lock:
+            cos_tpdos = [tpdo for tpdo, due in self._cos_due.items() if due <= now]
+            for tpdo in cos_tpdos:
+                del self._cos_due[tpdo]
+        for tpdo in cos_tpdos:
+            if network_up:
+                self.send_tpdo(tpdo, False)
+
+        self._dispatch_changes(now)
+
+        emcy_due = self._send_queued_emcy(now) if network_up else None
+
+        deadline = self._scheduler.next_deadline()
+        if deadline is None or deadline > self._next_monitor:
+            deadline = self._next_monitor
+        with self._cos_lock:
+            if self._cos_due:
+                deadline = min(deadline, *self._cos_due.values())
+        with self._subs_lock:
+            for sub in self._subs.values():
+                if sub.pending:
+                    deadline = min(deadline, sub.due)
+        if emcy_due is not None:
+            deadline = min(deadline, emcy_due)
+        return deadline
+
+    def _on_link_change(self):
+        """Monitor the network on the run loop as soon as the link monitor sees a change."""
+
+        self._link_changed = True
+        self._wakeup()
+
+    def _wakeup(self):
+        """Wake up the run loop, so it can reschedule."""
+
+        self._wake.set()
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._async_wake.set)
+            except RuntimeError:
+                pass  # loop was closed
+
+    def _heartbeat_state(self) -> bytes:
+        """Get the heartbeat data, the NMT state of the node."""
+
+        state = "PRE-OPERATIONAL" if self._node is None else self._node.nmt.state
+        return bytes([_NMT_STATE_CODES.get(state, 0x7F)])
+
+    def _send_bootup(self):
+        """Send the NMT boot-up message, so other nodes know this node is up."""
+
+        if self._network.status == CanNetworkState.NETWORK_UP:
+            self._network.send_message(0x700 + self.od.node_id, b"\x00", False)
+
+    def set_operational(self, operational: bool = True):
+        """
+        Switch the node between the OPERATIONAL and PRE-OPERATIONAL NMT states. The heartbeat
+        always reports the state, but PDOs are only sent while OPERATIONAL. The app keeps the node
+        PRE-OPERATIONAL while its resources and services are starting.
+
+        Parameters
+        ----------
+        operational: bool
+            True for OPERATIONAL, False for PRE-OPERATIONAL.
+        """
+
+        self._operational = operational
+        if self._node is not None:
+            self._node.nmt.state = "OPERATIONAL" if operational else "PRE-OPERATIONAL"
+        self._wakeup()
+
+    @property
+    def is_operational(self) -> bool:
+        """bool: Is the node in the OPERATIONAL NMT state."""
+
+        return self._node is not None and self._node.nmt.state == "OPERATIONAL"
+
     def run(self) -> NodeStop:
         """
         Go into operational mode, start all the resources, start all the threads, and monitor
@@ -185,35 +466,50 @@ class Node:
 
         logger.info(f"{self.name} node is starting")
 
-        loops = -1
-        delay_ms = 100
-        delay = delay_ms / 1000
-        start_time = monotonic()
+        self._send_bootup()
+        self._start_timers()
         while not self._event.is_set():
-            loops += 1
-            self._event.wait(delay - ((monotonic() - start_time) % delay))
-            self._network.monitor()
+            self._wake.clear()
+            deadline = self._run_once()
+            self._wake.wait(max(deadline - monotonic(), 0))
 
-            if self._network.status != CanNetworkState.NETWORK_UP:
-                continue
+        self._destroy_node()
+
+        logger.info(f"{self.name} node has ended")
+        return self._reset
 
-            # send heartbeat
-            event_time = self.od[0x1017].value
-            if loops % (event_time // delay_ms) == 0:
-                self._network.send_message(0x700 + self.od.node_id, b"\x05", False)
-
-            # send all timer-based TPDOs
-            for i in range(self._od.device_information.nr_of_TXPDO):
-                if i + 0x1800 not in self.od:
-                    continue
-                transmission_type = self.od[0x1800 + i][2].value
-                event_time = self.od[0x1800 + i][5].value
-                if (
-                    transmission_type in [0xFE, 0xFF]
-                    and event_time != 0
-                    and loops % (event_time // delay_ms) == 0
-                ):
-                    self.send_tpdo(i + 1)
+    async def run_async(self) -> NodeStop:
+        """
+        Same as :py:meth:`run`, but runs on the current asyncio event loop instead of blocking a
+        thread. Received CAN messages are also dispatched from the event loop (without a reader
+        thread, if the CAN bus supports it). Async SDO write callbacks are run as tasks on the
+        event loop.
+
+        Returns
+        -------
+        NodeStop
+            Reset / power off condition.
+        """
+
+        logger.info(f"{self.name} node is starting (asyncio)")
+
+        self._async_wake = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._network.set_event_loop(self._loop)
+
+        self._send_bootup()
+        self._start_timers()
+        try:
+            while not self._event.is_set():
+                self._async_wake.clear()
+                deadline = self._run_once()
+                try:
+                    await asyncio.wait_for(self._async_wake.wait(), max(deadline - monotonic(), 0))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._loop = None
+            self._network.set_event_loop(None)
 
         self._destroy_node()
 
@@ -226,226 +522,212 @@ class Node:
         if reset is not None:
             self._reset = reset
         self._event.set()
+        self._wakeup()
 
     def add_daemon(self, name: str):
         """Add a daemon for the node to monitor and/or control"""
 
         self._daemons[name] = Daemon(name)
 
-    def add_sdo_callbacks(
-        self,
-        index: str,
-        subindex: str,
-        read_cb: Callable[[None], Any],
-        write_cb: Callable[[Any], None],
-    ):
+    @property
+    def dispatch_stats(self) -> Dict[str, Dict[str, int]]:
         """
-        Add an SDO read callback for a variable at index and optional subindex.
-
-        Parameters
-        ----------
-        index: int or str
-            The index to call the callback on.
-        subindex: int or str
-            The subindex to call the callback on.
-        read_cb: Callable[[None], Any]
-            The SDO read callback. Allows overriding the data being sent on a SDO read. If
-            overriding read data return the value or return :py:data:`None` to use the the value
-            from the od. Set to :py:data:`None` for no read_cb.
-        write_cb: Callable[[Any], None]
-            The SDO writecallback. Gives access to the data being received on a SDO write.
-            Set to :py:data:`None` for no write_cb.
-            **Note:** data is still written to object dictionary before call.
+        dict: The queue depths and the dispatched and dropped message counts of each of the CAN
+        network's dispatch workers, by worker name. Empty if it has none.
         """
 
-        try:
-            self.od[index]
-        except KeyError:
-            logger.warning(f"index {index} does not exist, ignoring request for new sdo callback")
-            return
+        return self._network.dispatch_stats
 
-        if subindex:
-            try:
-                self.od[index][subindex]
-            except KeyError:
-                logger.warning(
-                    f"subindex {subindex} for index {index} does not exist, ignoring request for "
-                    "new sdo callback"
-                )
-                return
+    def _call_write_cb(self, write_cb: Callable[[Any], Any], value: Any):
+        """
+        Call a SDO write callback. Async callbacks are run as a task on the event loop if
+        :py:meth:`run_async` is running, otherwise they are run to completion.
+        """
 
-        if read_cb is not None:
-            self._read_cbs[index, subindex] = read_cb
-        if write_cb is not None:
-            self._write_cbs[index, subindex] = write_cb
+        ret = write_cb(value)
+        if inspect.iscoroutine(ret):  # run_coroutine_threadsafe and run only take coroutines
+            loop = self._loop
+            if loop is not None:
+                asyncio.run_coroutine_threadsafe(ret, loop)
+            else:
+                asyncio.run(ret)
 
-    def _send_pdo(self, comm_index: int, map_index: int, raise_error: bool = True):
-        """Send a PDO. Will not be sent if not node is not in operational state."""
+    def _get_pdo_map(self, comm_index: int, map_index: int) -> PdoMap:
+        """Get the compiled PDO mapping, compiling it if it is not cached."""
 
-        # PDOs should not be sent if CANopen node not in 'OPERATIONAL' state
-        if self._node.nmt.state != "OPERATIONAL":
-            return
+        pdo_map = self._pdo_maps.get(map_index)
+        if pdo_map is None:
+            pdo_map = PdoMap(self._od, comm_index, map_index, self._get_read_cb)
+            self._pdo_maps[map_index] = pdo_map
+        return pdo_map
 
-        cob_id = self.od[comm_index][1].value & 0x3F_FF_FF_FF
-        maps = self.od[map_index][0].value
+    def _on_od_write(self, var: ODVariable, changed: bool = True):
+        """
+        Update the compiled PDO mappings, SYNC table, and timers after an OD write and, if the
+        value changed, queue any change-of-state TPDOs and change subscriptions for the variable.
+        """
 
-        data = b""
-        for i in range(maps):
-            pdo_map = self.od[map_index][i + 1].value
+        index = var.index
+        if 0x1400 <= index < 0x1C00:
+            # communication and mapping parameters of a PDO are 0x200 apart
+            self._pdo_maps.pop(index, None)
+            self._pdo_maps.pop(index + 0x200, None)
+        if 0x1400 <= index < 0x1800:
+            self._rpdo_maps.clear()
+        elif 0x1800 <= index < 0x1A00:
+            self._update_sync_table(index - 0x1800 + 1)
+            self._update_tpdo_timer(index - 0x1800 + 1)
+            self._update_cos_vars()
+        elif 0x1A00 <= index < 0x1C00:
+            self._update_cos_vars()
+        elif index == 0x1017:
+            self._update_heartbeat_timer()
+        elif index == 0x1010 and var.value == _STORE_SIGNATURE:
+            self.store_parameters()
+        elif index == 0x1011 and var.value == _RESTORE_SIGNATURE:
+            self.restore_default_parameters()
+        elif index == 0x1003 and var.subindex == 0:
+            self._on_emcy_count_write(var)
+
+        if not changed:
+            return
 
-            if pdo_map == 0:
-                break  # nothing todo
+        tpdos = self._cos_vars.get((index, var.subindex))
+        if tpdos:
+            now = monotonic()
+            with self._cos_lock:
+                for tpdo in tpdos:
+                    if tpdo not in self._cos_due:
+                        # inhibit time is in multiples of 100 us
+                        inhibit_time = self._od[0x1800 + tpdo - 1][3].value / 10_000
+                        self._cos_due[tpdo] = max(now, self._tpdo_sent.get(tpdo, 0) + inhibit_time)
+            self._wakeup()
+
+        subs = self._sub_vars.get((index, var.subindex))
+        if subs:
+            now = monotonic()
+            with self._subs_lock:
+                for sub in subs:
+                    if not sub.pending:
+                        sub.due = now + sub.coalesce
+                    sub.pending[index, var.subindex] = var
+            self._wakeup()
+
+    def store_parameters(self):
+        """
+        Store the values of all writable, fixed-size OD variables, so they are loaded instead of
+        the defaults on the next start. Also done by writing "save" to 0x1010, if it is in the OD.
+        """
 
-            pdo_map_bytes = pdo_map.to_bytes(4, "big")
-            index, subindex, _ = struct.unpack(">HBB", pdo_map_bytes)
+        self._param_store.store()
+        logger.info(f"stored OD parameters to {self._param_store.file_path}")
 
-            # call sdo callback(s) and convert data to bytes
-            if isinstance(self.od[index], ODVariable):
-                value = self._node.sdo[index].phys
-                value_bytes = self.od[index].encode_raw(value)
-            else:  # record or array
-                value = self._node.sdo[index][subindex].phys
-                value_bytes = self.od[index][subindex].encode_raw(value)
+    def restore_default_parameters(self):
+        """
+        Remove the stored OD parameters, so the defaults are used on the next start. Also done by
+        writing "load" to 0x1011, if it is in the OD.
+        """
 
-            # pack pdo with bytes
-            data += value_bytes
+        self._param_store.clear()
+        logger.info("removed stored OD parameters, defaults will be used on the next start")
 
-        if len(data) > 8:
-            self.send_emcy(EmcyCode.PROTOCOL_PDO_LEN_EXCEEDED, b"", False)
-            return
+    def _update_cos_vars(self):
+        """Rebuild the lookup of mapped objects to the change-of-state TPDOs they are in."""
 
-        self._network.send_message(cob_id, data, raise_error)
+        cos_vars: dict[tuple[int, int], tuple[int, ...]] = {}
+        for tpdo in self._cos_tpdos:
+            if self._od[0x1800 + tpdo - 1][2].value not in [0xFE, 0xFF]:
+                continue  # only event-driven TPDOs can be sent on change
+            pdo_map = self._get_pdo_map(0x1800 + tpdo - 1, 0x1A00 + tpdo - 1)
+            for var in pdo_map.variables:
+                key = (var.index, var.subindex)
+                if tpdo not in cos_vars.get(key, ()):
+                    cos_vars[key] = cos_vars.get(key, ()) + (tpdo,)
+        self._cos_vars = cos_vars
 
-    def send_tpdo(self, tpdo: int, raise_error: bool = True):
+    def enable_tpdo_on_change(self, tpdo: int, enable: bool = True):
         """
-        Send a TPDO. Will not be sent if not node is not in operational state.
+        Send an event-driven TPDO (transmission type 0xFE or 0xFF) whenever a value mapped into it
+        is written to, rate-limited by the TPDO's inhibit time. Multiple writes within the inhibit
+        time are collapsed into one TPDO. This is in addition to the TPDO's event timer, if set.
 
         Parameters
         ----------
         tpdo: int
-            TPDO number to send, should be between 1 and 16.
-        raise_error: bool
-            Set to False to not raise NetworkError.
-
-        Raises
-        ------
-        NetworkError
-            Cannot send a TPDO message when the network is down.
+            TPDO number, should be between 1 and 512.
+        enable: bool
+            Set to False to stop sending the TPDO on change.
         """
-        if tpdo < 1:
-            raise ValueError("TPDO number must be greater than 1")
 
-        tpdo -= 1  # number to offset
-        comm_index = 0x1800 + tpdo
-        map_index = 0x1A00 + tpdo
-        self._send_pdo(comm_index, map_index, raise_error)
+        if tpdo not in self._tpdos:
+            raise ValueError(f"TPDO {tpdo} does not exist")
 
-    def send_emcy(self, code: Union[EmcyCode, int], data: bytes = b"", raise_error: bool = True):
-        """
-        Send a EMCY message.
-
-        Parameters
-        ----------
-        code: Emcy, int
-            The EMCY code.
-        data: bytes
-            Optional data to add to the message (up to 5 bytes).
-        raise_error: bool
-            Set to False to not raise NetworkError.
+        if enable:
+            self._cos_tpdos.add(tpdo)
+        else:
+            self._cos_tpdos.discard(tpdo)
+            with self._cos_lock:
+                self._cos_due.pop(tpdo, None)
+        self._update_cos_vars()
 
-        Raises
-        ------
-        NetworkError
-            Cannot send a EMCY message when the network is down.
+    def _send_pdo(self, comm_index: int, map_index: int, raise_error: bool = True) -> bool:
         """
-
-        if isinstance(code, EmcyCode):
-            code = code.value
-
-        if len(data) > 5:
-            raise ValueError("data must be 5 or less bytes")
-
-        frame = code.to_bytes(2, "little") + self.od[0x1001].value.to_bytes(1, "little") + data
-        frame += b"\x00" * (5 - len(data))
-        self._network.send_message(self.od.node_id + 0x80, frame, raise_error)
-        logger.error(f"sent emcy 0x{code:04X} {data.hex()}")
-
-    def _on_sdo_read(self, index: int, subindex: int, od: ODVariable):
+        Send a PDO. Will not be sent if not node is not in operational state. Returns True if it
+        was sent.
         """
-        SDO read callback function. Allows overriding the data being sent on a SDO read. Return
-        valid datatype for object, if overriding read data, or :py:data:`None` to use the the value
-        on object dictionary.
 
-        Parameters
-        ----------
-        index: int
-            The index the SDO is reading to.
-        subindex: int
-            The subindex the SDO is reading to.
-        od: canopen.objectdictionary.ODVariable
-            The variable object being read to. Badly named. And not appart of the actual OD.
+        # PDOs should not be sent if CANopen node not in 'OPERATIONAL' state
+        if self._node.nmt.state != "OPERATIONAL":
+            return False
 
-        Returns
-        -------
-        Any
-            The value to return for that index / subindex.
-        """
+        start = perf_counter()
 
-        ret = None
+        pdo_map = self._get_pdo_map(comm_index, map_index)
 
-        # convert any ints to strs
-        if isinstance(self.od[index], ODVariable) and od == self.od[index]:
-            index = od.name
-            subindex = None  # type: ignore
-        else:
-            index = self.od[index].name
-            subindex = od.name
-
-        if (index, subindex) in self._read_cbs:
-            ret = self._read_cbs[index, subindex]()
+        if pdo_map.size > (PDO_MAX_LEN_FD if self._network.fd else PDO_MAX_LEN):
+            self.send_emcy(EmcyCode.PROTOCOL_PDO_LEN_EXCEEDED, b"", False)
+            return False
 
-        # get value from OD
-        if ret is None:
-            ret = od.value
+        data = pdo_map.pack(self._od_seqlock)
+        sent = self._network.send_message(pdo_map.cob_id, data, raise_error)
 
-        return ret
+        if comm_index >= 0x1800:
+            self._metrics.observe("tpdo", comm_index - 0x1800 + 1, perf_counter() - start)
+        else:  # the master node sending a RPDO
+            self._metrics.observe("rpdo", comm_index - 0x1400 + 1, perf_counter() - start)
+        return sent
 
-    def _on_sdo_write(self, index: int, subindex: int, od: ODVariable, data: bytes):
+    def send_tpdo(self, tpdo: int, raise_error: bool = True) -> bool:
         """
-        SDO write callback function. Gives access to the data being received on a SDO write.
-
-        *Note:* data is still written to object dictionary before call.
+        Send a TPDO. Will not be sent if not node is not in operational state.
 
         Parameters
         ----------
-        index: int
-            The index the SDO being written to.
-        subindex: int
-            The subindex the SDO being written to.
-        od: canopen.objectdictionary.ODVariable
-            The variable object being written to. Badly named.
-        data: bytes
-            The raw data being written.
-        """
+        tpdo: int
+            TPDO number to send, should be between 1 and 16.
+        raise_error: bool
+            Set to False to not raise NetworkError.
 
-        binary_types = [DOMAIN, OCTET_STRING]
+        Raises
+        ------
+        NetworkError
+            Cannot send a TPDO message when the network is down.
 
-        # set value in OD before callback
-        if od.data_type in binary_types:
-            od.value = data
-        else:
-            od.value = od.decode_raw(data)
+        Returns
+        -------
+        bool
+            True if the TPDO was sent.
+        """
+        if tpdo < 1:
+            raise ValueError("TPDO number must be greater than 1")
 
-        # convert any ints to strs
-        if isinstance(self.od[index], ODVariable) and od == self.od[index]:
-            index = od.name
-            subindex = None  # type: ignore
+        if tpdo in self._mpdo_scans:
+            sent = self._send_sam_mpdo(tpdo, raise_error)
         else:
-            index = self.od[index].name
-            subindex = od.name
-
-        if (index, subindex) in self._write_cbs:
-            self._write_cbs[index, subindex](od.value)
+            sent = self._send_pdo(0x1800 + tpdo - 1, 0x1A00 + tpdo - 1, raise_error)
+        if sent:
+            self._tpdo_sent[tpdo] = monotonic()  # for the inhibit time
+        return sent
 
     @property
     def bus(self) -> str:
@@ -490,202 +772,31 @@ class Node:
         return not self._event.is_set()
 
     @property
-    def daemons(self) -> Dict[str, Daemon]:
-        """dict: The dictionary of external daemons that are monitored and/or controllable"""
-
-        return self._daemons
-
-    def od_get_obj(
-        self, index: Union[int, str], subindex: Union[int, str, None] = None
-    ) -> Union[ODVariable, ODArray, ODRecord]:
-        """
-        Quick helper function to get an object from the od.
+    def metrics(self) -> MetricsRegistry:
+        """MetricsRegistry: Call counts and latency histograms of the node's hot paths."""
 
-        Returns
-        -------
-        ODVariable | ODArray | ODRecord
-            The object from the OD.
-        """
-
-        if subindex is None:
-            return self._od[index]
-        return self._od[index][subindex]
-
-    def od_read(
-        self, index: Union[int, str], subindex: Union[int, str, None]
-    ) -> Union[int, str, float, bytes, bool]:
-        """
-        Read a value from the OD.
+        return self._metrics
 
-        Parameters
-        ----------
-        index: int or str
-            The index to read from.
-        subindex: int, str, or None
-            The subindex to read from or None.
-
-        Returns
-        -------
-        int | str | float | bytes | bool
-            The value read.
-        """
-
-        obj = self.od_get_obj(index, subindex)
-        return obj.value
-
-    def od_read_bitfield(
-        self, index: Union[int, str], subindex: Union[int, str, None], field: str
-    ) -> int:
-        """
-        Read a field from a object from the OD.
-
-        Parameters
-        ----------
-        index: int or str
-            The index to read from.
-        subindex: int, str, or None
-            The subindex to read from or None.
-
-        Returns
-        -------
-        int:
-            The field value.
-        """
-
-        obj = self.od_get_obj(index, subindex)
-        bits = obj.bit_definitions[field]
-
-        value = 0
-        for i in bits:
-            tmp = obj.value & (1 << bits[i])
-            value |= tmp >> bits[i]
-        return value
-
-    def od_read_enum(self, index: Union[int, str], subindex: Union[int, str, None]) -> str:
-        """
-        Read a enum str from the OD.
-
-        Parameters
-        ----------
-        index: int or str
-            The index to read from.
-        subindex: int, str, or None
-            The subindex to read from or None.
-
-        Returns
-        -------
-        str
-            The enum str value.
-        """
-
-        obj = self.od_get_obj(index, subindex)
-        return obj.value_descriptions[obj.value]
-
-    def _var_write(self, obj: ODVariable, value: Union[int, str, float, bytes, bool]):
-
-        value_type = type(value)
-
-        def make_error_value(data_type) -> str:
-            return f"cannot write {value!r} ({data_type}) to object {obj.name} ({obj.data_type})"
-
-        if obj.data_type in INTEGER_TYPES:
-            if value_type != int:
-                raise TypeError(make_error_value("int"))
-            if obj.max is not None and value > obj.max:
-                raise ValueError(f"value {value!r} too high (high limit {obj.max})")
-            if obj.min is not None and value < obj.min:
-                raise ValueError(f"value {value!r} too low (low limit {obj.min})")
-        elif obj.data_type in FLOAT_TYPES:
-            if not isinstance(value, int):
-                raise TypeError(make_error_value("float"))
-            if obj.max is not None and value > obj.max:
-                raise ValueError(f"value {value!r} too high (high limit {obj.max})")
-            if obj.min is not None and value < obj.min:
-                raise ValueError(f"value {value!r} too low (low limit {obj.min})")
-        elif obj.data_type == VISIBLE_STRING and not isinstance(value, str):
-            raise TypeError(make_error_value("str"))
-        elif obj.data_type == OCTET_STRING and not isinstance(value, bytes):
-            raise TypeError(make_error_value("bytes"))
-
-        obj.value = value
-
-    def od_write(
-        self,
-        index: Union[int, str],
-        subindex: Union[int, str, None],
-        value: Union[int, str, float, bytes, bool],
-    ):
-        """
-        Write an value to the OD.
-
-        Parameters
-        ----------
-        index: int | str
-            The index to read from.
-        subindex: int | str | None
-            The subindex to read from or None.
-        value: int | str | float | bytes | bool
-            The value to write.
-
-        Raises
-        ------
-        ValueError
-            An invalid value.
-        """
-
-        obj = self.od_get_obj(index, subindex)
-        self._var_write(obj, value)
-
-    def od_write_bitfield(
-        self, index: Union[int, str], subindex: Union[int, str, None], field: str, value: int
-    ):
+    @property
+    def sync_latency(self) -> Dict[str, dict]:
         """
-        Write a bit field value to a object to the OD.
-
-        Parameters
-        ----------
-        index: int | str
-            The index to read from.
-        subindex: int | str | None
-            The subindex to read from or None.
-        field: str
-            Name of field to write to.
-        value: int
-            The value to write.
-
-        Raises
-        ------
-        ValueError
-            An invalid value.
+        dict[str, dict]: Time from receiving a SYNC to sending each SYNC-based TPDO, as the p50,
+        p99, and max over the last 1000 SYNCs, by name (e.g. ``tpdo_1``).
         """
 
-        obj = self.od_get_obj(index, subindex)
-        bits = obj.bit_definitions[field]
-        offset = min(bits)
-
-        mask = 0
-        for i in bits:
-            mask |= 1 << bits[i]
+        return self._metrics.percentiles_to_dict()
 
-        new_value = obj.value
-        new_value ^= mask
-        new_value |= value << offset
-        obj.value = new_value
+    @property
+    def timer_stats(self) -> Dict[str, JitterStats]:
+        """dict: How late the heartbeat and each timer-based TPDO have been sent."""
 
-    def od_write_enum(self, index: Union[int, str], subindex: Union[int, str, None], value: str):
-        """
-        Write a enum str to the OD.
+        return {
+            "heartbeat" if key == _HEARTBEAT else f"tpdo_{key}": stats
+            for key, stats in self._scheduler.stats.items()
+        }
 
-        Parameters
-        ----------
-        index: int | str
-            The index to read from.
-        subindex: int | str | None
-            The subindex to read from or None.
-        value: str
-            The enum string to write.
-        """
+    @property
+    def daemons(self) -> Dict[str, Daemon]:
+        """dict: The dictionary of external daemons that are monitored and/or controllable"""
 
-        obj = self.od_get_obj(index, subindex)
-        tmp = {d: v for v, d in obj.value_descriptions}
-        obj.value = tmp[value.lower()]
+        return self._daemons
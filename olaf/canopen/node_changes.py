@@ -0,0 +1,121 @@
+"""Change subscriptions of a Node"""
+
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Union
+
+from canopen.objectdictionary import ODArray, ODRecord, ODVariable
+from loguru import logger
+
+from .od_index import OdKey
+from .seqlock import SeqLock
+
+
+class ChangeSubscription:
+    """A callback for changes to a set of OD variables, coalesced over a time window."""
+
+    def __init__(self, callback: Callable[[dict], Any], coalesce: float):
+        self.callback = callback
+        self.coalesce = coalesce
+        self.pending: dict[tuple[int, int], ODVariable] = {}  # changed variables not yet sent
+        self.due = 0.0  # time to call the callback, only valid if pending
+
+
+class ChangeSubscriptionMixin:
+    """Callbacks for changes to OD values of a :py:class:`Node`."""
+
+    # attributes and methods of the Node this is mixed into
+    _od_seqlock: SeqLock
+    _subs_lock: Lock
+    _subs: dict[int, ChangeSubscription]  # change subscriptions by handle
+    _sub_vars: dict[tuple[int, int], list[ChangeSubscription]]  # object -> subs
+    _next_sub: int  # handle of the next change subscription
+    _call_write_cb: Callable[[Callable[[Any], Any], Any], None]
+    od_get_obj: Callable[..., Union[ODVariable, ODArray, ODRecord]]
+
+    def _dispatch_changes(self, now: float):
+        """Call all change subscription callbacks that are past their coalesce window."""
+
+        due = []
+        with self._subs_lock:
+            for sub in self._subs.values():
+                if sub.pending and sub.due <= now:
+                    due.append((sub.callback, sub.pending))
+                    sub.pending = {}
+
+        for callback, changed in due:
+            changes = self._od_seqlock.read(
+                lambda changed=changed: {key: var.value for key, var in changed.items()}
+            )
+            try:
+                self._call_write_cb(callback, changes)
+            except Exception as e:  # pylint: disable=W0718
+                logger.exception(f"change subscription callback raised: {e}")
+
+    def subscribe_changes(
+        self,
+        objects: Iterable[OdKey],
+        callback: Callable[[Dict[tuple[int, int], Any]], Any],
+        coalesce_ms: int = 0,
+    ) -> int:
+        """
+        Get called back when values in the OD are written to by any means: SDO, RPDO, the
+        ``od_write*`` methods, or the REST API.
+
+        Callbacks are called from the node's run loop, not the thread that did the write, so they
+        can not stall the CAN bus. All writes within the coalesce window of the first write are
+        collapsed into one call with the latest values. Async callbacks are supported.
+
+        Parameters
+        ----------
+        objects: Iterable[tuple | int | str]
+            The objects to watch, each as a ``(index, subindex)`` tuple or just an index. A record
+            or array index watches all of its subindexes.
+        callback: Callable[[dict[tuple[int, int], Any]], Any]
+            Called with the new values of the objects that changed by ``(index, subindex)``.
+            Variables not in a record or array have a subindex of 0.
+        coalesce_ms: int
+            The coalesce window in milliseconds.
+
+        Returns
+        -------
+        int
+            The handle to pass to :py:meth:`unsubscribe_changes`.
+        """
+
+        keys = []
+        for key in objects:
+            obj = self.od_get_obj(*key) if isinstance(key, tuple) else self.od_get_obj(key)
+            for var in obj.values() if isinstance(obj, (ODRecord, ODArray)) else [obj]:
+                keys.append((var.index, var.subindex))
+
+        sub = ChangeSubscription(callback, coalesce_ms / 1000)
+        with self._subs_lock:
+            handle = self._next_sub
+            self._next_sub = handle + 1
+            self._subs[handle] = sub
+            sub_vars = dict(self._sub_vars)  # copy-on-write, writes read it without the lock
+            for key in keys:
+                sub_vars[key] = sub_vars.get(key, []) + [sub]
+            self._sub_vars = sub_vars
+        return handle
+
+    def unsubscribe_changes(self, handle: int):
+        """
+        Stop a change subscription.
+
+        Parameters
+        ----------
+        handle: int
+            The handle from :py:meth:`subscribe_changes`.
+        """
+
+        with self._subs_lock:
+            sub = self._subs.pop(handle, None)
+            if sub is None:
+                return
+            sub_vars = {}
+            for key, subs in self._sub_vars.items():
+                subs = [i for i in subs if i is not sub]
+                if subs:
+                    sub_vars[key] = subs
+            self._sub_vars = sub_vars
@@ -0,0 +1,210 @@
+"""EMCY messages and error history of a Node"""
+
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Callable, Union
+
+from canopen import ObjectDictionary
+from canopen.objectdictionary import ODVariable
+from loguru import logger
+
+from . import EmcyCode
+from .metrics import MetricsRegistry
+from .network import CanNetwork
+from .seqlock import SeqLock
+
+
+class EmcyMixin:
+    """EMCY messages and the error history (0x1003) of a :py:class:`Node`."""
+
+    # attributes and methods of the Node this is mixed into
+    _od: ObjectDictionary
+    _od_seqlock: SeqLock
+    _network: CanNetwork
+    _metrics: MetricsRegistry
+    _emcy_lock: Lock
+    _emcy_queue: dict[int, list]  # EMCYs waiting on the inhibit time, by code
+    _emcy_sent: float  # last time an EMCY was sent
+    _wakeup: Callable[[], None]
+
+    def send_emcy(
+        self,
+        code: Union[EmcyCode, int],
+        data: bytes = b"",
+        raise_error: bool = True,
+        queue: bool = False,
+    ):
+        """
+        Send a EMCY message and add it to the error history (0x1003).
+
+        EMCYs are rate-limited by the EMCY inhibit time (0x1015). An EMCY raised within the inhibit
+        time is queued and sent by the run loop once the inhibit time has passed. Repeats of a code
+        that is already queued are collapsed into it; the number of repeats is kept in the error
+        history and the repeats are only logged at debug level.
+
+        Parameters
+        ----------
+        code: Emcy, int
+            The EMCY code.
+        data: bytes
+            Optional data to add to the message (up to 5 bytes).
+        raise_error: bool
+            Set to False to not raise NetworkError.
+        queue: bool
+            Always queue the EMCY for the run loop to send, never send it from the caller's thread.
+
+        Raises
+        ------
+        NetworkError
+            Cannot send a EMCY message when the network is down.
+        """
+
+        if isinstance(code, EmcyCode):
+            code = code.value
+
+        if len(data) > 5:
+            raise ValueError("data must be 5 or less bytes")
+
+        self._add_emcy_history(code)
+
+        with self._emcy_lock:
+            queued = self._emcy_queue.get(code)
+            if queued is not None:
+                queued[0] = data
+                queued[1] += 1
+                logger.debug(f"repeated emcy 0x{code:04X} {data.hex()}")
+                return
+
+            now = monotonic()
+            if queue or self._emcy_queue or now < self._emcy_sent + self._emcy_inhibit_time():
+                self._emcy_queue[code] = [data, 1]
+                logger.error(f"queued emcy 0x{code:04X} {data.hex()}")
+                send = False
+            else:
+                self._emcy_sent = now
+                send = True
+
+        if send:
+            self._send_emcy(code, data, raise_error)
+            logger.error(f"sent emcy 0x{code:04X} {data.hex()}")
+        else:
+            self._wakeup()
+
+    def _emcy_inhibit_time(self) -> float:
+        """Get the EMCY inhibit time in seconds, it is in multiples of 100 us in the OD."""
+
+        return self._od[0x1015].value / 10_000 if 0x1015 in self._od else 0.0
+
+    def _send_emcy(self, code: int, data: bytes, raise_error: bool = True):
+        """Send a EMCY frame."""
+
+        start = perf_counter()
+        frame = code.to_bytes(2, "little") + self._od[0x1001].value.to_bytes(1, "little") + data
+        frame += b"\x00" * (5 - len(data))
+        self._network.send_message(self._od.node_id + 0x80, frame, raise_error)
+        self._metrics.observe("emcy", None, perf_counter() - start)
+
+    def _send_queued_emcy(self, now: float) -> Union[float, None]:
+        """
+        Send the oldest queued EMCY if the inhibit time has passed.
+
+        Returns
+        -------
+        float | None
+            The monotonic time the next queued EMCY can be sent at or None if the queue is empty.
+        """
+
+        with self._emcy_lock:
+            if not self._emcy_queue:
+                return None
+            inhibit_time = self._emcy_inhibit_time()
+            if now < self._emcy_sent + inhibit_time:
+                return self._emcy_sent + inhibit_time
+            code = next(iter(self._emcy_queue))
+            data, count = self._emcy_queue.pop(code)
+            self._emcy_sent = now
+            next_due = now + inhibit_time if self._emcy_queue else None
+
+        self._send_emcy(code, data, False)
+        logger.debug(f"sent queued emcy 0x{code:04X} {data.hex()} raised {count} time(s)")
+        return next_due
+
+    def _setup_emcy_history(self):
+        """
+        Make the number of errors in the predefined error field (0x1003 subindex 0) writable and
+        set it to the number of errors stored. CiA 301 has a master write 0 to it to clear the
+        history, but the OD defines it as const.
+        """
+
+        if 0x1003 not in self._od:
+            return
+
+        count = self._od[0x1003][0]
+        count.access_type = "rw"
+        with self._od_seqlock.write():
+            count.value = len(self.emcy_history)
+
+    def _on_emcy_count_write(self, count: ODVariable):
+        """
+        Handle a write to the number of errors (0x1003 subindex 0): 0 clears the error history,
+        any other value is not allowed by CiA 301 and is reverted.
+        """
+
+        if count.value == 0:
+            self._clear_emcy_errors()
+        else:
+            logger.error("only 0 can be written to the number of errors (0x1003 subindex 0)")
+            with self._od_seqlock.write():
+                count.value = len(self.emcy_history)
+
+    def _add_emcy_history(self, code: int):
+        """
+        Add an EMCY to the predefined error field (0x1003). The newest error is at subindex 1; each
+        entry has the EMCY code in the low 16 bits and the number of times in a row it was raised in
+        the high 16 bits. Subindex 0 has the number of errors stored. Error resets are not
+        recorded.
+        """
+
+        if code == EmcyCode.ERROR_RESET or 0x1003 not in self._od:
+            return
+
+        errors = [var for subindex, var in self._od[0x1003].subindices.items() if subindex > 0]
+        if not errors:
+            return
+
+        with self._od_seqlock.write():
+            newest = errors[0].value
+            if newest & 0xFFFF == code and newest != 0:
+                count = min((newest >> 16) + 1, 0xFFFF)
+                errors[0].value = (count << 16) | code
+            else:
+                for i in range(len(errors) - 1, 0, -1):
+                    errors[i].value = errors[i - 1].value
+                errors[0].value = (1 << 16) | code
+                self._od[0x1003][0].value = len(self.emcy_history)
+
+    @property
+    def emcy_history(self) -> list[tuple[int, int]]:
+        """list[tuple[int, int]]: The error history (0x1003) as codes and counts, newest first."""
+
+        if 0x1003 not in self._od:
+            return []
+        values = [
+            var.value for subindex, var in self._od[0x1003].subindices.items() if subindex > 0
+        ]
+        return [(value & 0xFFFF, value >> 16) for value in values if value != 0]
+
+    def clear_emcy_history(self):
+        """Clear the error history (0x1003) and drop any queued EMCYs."""
+
+        with self._emcy_lock:
+            self._emcy_queue.clear()
+        self._clear_emcy_errors()
+
+    def _clear_emcy_errors(self):
+        """Clear the errors and the number of errors in the error history (0x1003)."""
+
+        if 0x1003 in self._od:
+            with self._od_seqlock.write():
+                for var in self._od[0x1003].subindices.values():
+                    var.value = 0
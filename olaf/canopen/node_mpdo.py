@@ -0,0 +1,139 @@
+"""Multiplexed PDOs (MPDOs) of a Node"""
+
+from time import perf_counter
+from typing import Any, Callable, Iterable, Union
+
+from canopen import LocalNode, ObjectDictionary
+from canopen.objectdictionary import ODVariable
+from loguru import logger
+
+from .accessor import OdAccessor
+from .metrics import MetricsRegistry
+from .mpdo import mpdo_var_size, pack_mpdo, unpack_mpdo
+from .network import CanNetwork
+from .od_index import OdIndex, OdKey
+
+
+class MpdoMixin:
+    """SAM MPDO scan lists and DAM MPDO reception of a :py:class:`Node`."""
+
+    # attributes and methods of the Node this is mixed into
+    _od: ObjectDictionary
+    _od_index: OdIndex
+    _node: LocalNode
+    _network: CanNetwork
+    _metrics: MetricsRegistry
+    _tpdos: list[int]
+    _slow_sdo: set[tuple[int, int]]
+    is_operational: bool
+    _mpdo_scans: dict[int, list[ODVariable]]  # SAM MPDO scan lists by TPDO
+    _mpdo_next: dict[int, int]  # next position in the scan list by TPDO
+    _accessor_by_key: Callable[[OdKey], OdAccessor]
+    _get_read_cb: Callable[[ODVariable], Union[Callable[[], Any], None]]
+    _defer_sdo: Callable[..., None]
+    _on_sdo_write: Callable[[int, int, ODVariable, bytes], None]
+
+    def _send_sam_mpdo(self, tpdo: int, raise_error: bool = True) -> bool:
+        """Send the next object in a TPDO's scan list as a source address mode MPDO."""
+
+        if self._node.nmt.state != "OPERATIONAL":
+            return False
+
+        start = perf_counter()
+
+        scan_list = self._mpdo_scans[tpdo]
+        pos = self._mpdo_next[tpdo] % len(scan_list)
+        self._mpdo_next[tpdo] = pos + 1
+        var = scan_list[pos]
+
+        read_cb = self._get_read_cb(var)
+        value = None if read_cb is None else read_cb()
+        if value is None:
+            value = var.value
+
+        cob_id = self._od[0x1800 + tpdo - 1][1].value & 0x3F_FF_FF_FF
+        data = pack_mpdo(False, self._od.node_id, var, var.encode_raw(value))
+        sent = self._network.send_message(cob_id, data, raise_error)
+
+        self._metrics.observe("tpdo", tpdo, perf_counter() - start)
+        return sent
+
+    def set_mpdo_scan_list(self, tpdo: int, objects: Iterable[OdKey]):
+        """
+        Turn a TPDO into a source address mode (SAM) MPDO. Every time the TPDO is sent (by its
+        timer, SYNC, or :py:meth:`send_tpdo`) the next object in the scan list is sent with its
+        index and subindex inline, one value per frame, so any number of objects can share one
+        COB-ID.
+
+        Parameters
+        ----------
+        tpdo: int
+            TPDO number, should be between 1 and 512.
+        objects: Iterable[tuple | int | str]
+            The scan list; each as a ``(index, subindex)`` tuple or just an index. Values must be
+            4 bytes or less. Set to an empty list to go back to sending the TPDO's mapping.
+
+        Raises
+        ------
+        ValueError
+            The TPDO does not exist or an object does not fit in a MPDO.
+        """
+
+        if tpdo not in self._tpdos:
+            raise ValueError(f"TPDO {tpdo} does not exist")
+
+        scan_list = [self._accessor_by_key(key).var for key in objects]
+        for var in scan_list:
+            mpdo_var_size(var)
+
+        if scan_list:
+            self._mpdo_next[tpdo] = 0
+            self._mpdo_scans[tpdo] = scan_list
+        else:
+            self._mpdo_scans.pop(tpdo, None)
+
+    def enable_dam_mpdo(self, cob_id: int):
+        """
+        Receive destination address mode (DAM) MPDOs on a COB-ID. MPDOs addressed to this node or
+        to all nodes are written into the OD like a SDO write.
+
+        Parameters
+        ----------
+        cob_id: int
+            The COB-ID the MPDOs are sent on, e.g. a TPDO COB-ID of the master node.
+        """
+
+        self._network.subscribe(cob_id, self._on_dam_mpdo)
+
+    def _on_dam_mpdo(self, cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
+        """Write the value of a DAM MPDO into the OD."""
+
+        # PDOs are only processed in the OPERATIONAL state
+        if not self.is_operational:
+            return
+
+        try:
+            mpdo = unpack_mpdo(data)
+        except ValueError:
+            return
+        if not mpdo.dam or mpdo.node_id not in [0, self._od.node_id]:
+            return
+
+        start = perf_counter()
+        try:
+            var = self._od_index.get(mpdo.index)
+            if not isinstance(var, ODVariable):
+                var = self._od_index.get(mpdo.index, mpdo.subindex)
+            size = mpdo_var_size(var)
+        except (KeyError, ValueError) as e:
+            logger.error(f"invalid MPDO: {e}")
+            return
+        if not var.writable:
+            logger.error(f"invalid MPDO: {var.name} is read-only")
+            return
+
+        if (var.index, var.subindex) in self._slow_sdo:
+            self._defer_sdo(self._on_sdo_write, var.index, var.subindex, var, mpdo.data[:size])
+        else:
+            self._on_sdo_write(var.index, var.subindex, var, mpdo.data[:size])
+        self._metrics.observe("rx", cob_id, perf_counter() - start)
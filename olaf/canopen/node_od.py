@@ -0,0 +1,409 @@
+"""OD access of a Node"""
+
+import os
+from typing import Any, Callable, Dict, Iterable, Mapping, Union
+
+from canopen import ObjectDictionary
+from canopen.objectdictionary import ODArray, ODRecord, ODVariable
+
+from ..common.oresat_file import new_oresat_file
+from ..common.oresat_file_cache import OreSatFileCache
+from .accessor import OdAccessor
+from .od_index import OdIndex, OdKey
+from .seqlock import SeqLock
+from .snapshot import SnapshotCodec
+from .telemetry import TelemetryPacker
+
+
+class OdAccessMixin:
+    """Reads, writes, and snapshots of the OD of a :py:class:`Node`."""
+
+    # attributes and methods of the Node this is mixed into
+    _od: ObjectDictionary
+    _od_index: OdIndex
+    _od_seqlock: SeqLock
+    _accessors: dict[tuple, OdAccessor]  # bound handles by (index, subindex)
+    _od_vars: Union[list[ODVariable], None]  # all variables, in index order
+    _snapshot_codec: Union[SnapshotCodec, None]
+    _fread_cache: OreSatFileCache
+    _on_od_write: Callable[..., None]
+    _get_read_cb: Callable[[ODVariable], Union[Callable[[], Any], None]]
+
+    def od_get_obj(
+        self, index: Union[int, str], subindex: Union[int, str, None] = None
+    ) -> Union[ODVariable, ODArray, ODRecord]:
+        """
+        Quick helper function to get an object from the od.
+
+        Parameters
+        ----------
+        index: int or str
+            The index as an int, a name, a ``"0x3001"`` string, or a dotted path like
+            ``"system.ram_percent"`` or ``"0x3001.0x02"``.
+        subindex: int, str, or None
+            The subindex as an int, a name, or a ``"0x02"`` string, or None.
+
+        Raises
+        ------
+        KeyError
+            No object at the index and subindex.
+
+        Returns
+        -------
+        ODVariable | ODArray | ODRecord
+            The object from the OD.
+        """
+
+        return self._od_index.get(index, subindex)
+
+    def accessor(
+        self, index: Union[int, str], subindex: Union[int, str, None] = None
+    ) -> OdAccessor:
+        """
+        Get a handle bound to a variable in the OD, with its validation, bit field masks, and enum
+        maps precomputed. Handles are cached, so this is cheap to call again.
+
+        Parameters
+        ----------
+        index: int or str
+            The index of the variable.
+        subindex: int, str, or None
+            The subindex of the variable or None.
+
+        Raises
+        ------
+        TypeError
+            The object is a record or array, not a variable.
+
+        Returns
+        -------
+        OdAccessor
+            The handle to the variable.
+        """
+
+        accessor = self._accessors.get((index, subindex))
+        if accessor is None:
+            obj = self.od_get_obj(index, subindex)
+            if not isinstance(obj, ODVariable):
+                raise TypeError(f"object {obj.name} is not a variable")
+            # one handle per variable, whatever form of index and subindex it was looked up by
+            accessor = self._accessors.get((obj.index, obj.subindex))
+            if accessor is None:
+                accessor = OdAccessor(obj, self._on_od_write)
+                self._accessors[obj.index, obj.subindex] = accessor
+            self._accessors[index, subindex] = accessor
+        return accessor
+
+    def od_read(
+        self, index: Union[int, str], subindex: Union[int, str, None]
+    ) -> Union[int, str, float, bytes, bool]:
+        """
+        Read a value from the OD.
+
+        Parameters
+        ----------
+        index: int or str
+            The index to read from.
+        subindex: int, str, or None
+            The subindex to read from or None.
+
+        Returns
+        -------
+        int | str | float | bytes | bool
+            The value read.
+        """
+
+        return self.accessor(index, subindex).read()
+
+    def od_read_bitfield(
+        self, index: Union[int, str], subindex: Union[int, str, None], field: str
+    ) -> int:
+        """
+        Read a field from a object from the OD.
+
+        Parameters
+        ----------
+        index: int or str
+            The index to read from.
+        subindex: int, str, or None
+            The subindex to read from or None.
+
+        Returns
+        -------
+        int:
+            The field value.
+        """
+
+        return self.accessor(index, subindex).read_bitfield(field)
+
+    def od_read_enum(self, index: Union[int, str], subindex: Union[int, str, None]) -> str:
+        """
+        Read a enum str from the OD.
+
+        Parameters
+        ----------
+        index: int or str
+            The index to read from.
+        subindex: int, str, or None
+            The subindex to read from or None.
+
+        Returns
+        -------
+        str
+            The enum str value.
+        """
+
+        return self.accessor(index, subindex).read_enum()
+
+    def od_write(
+        self,
+        index: Union[int, str],
+        subindex: Union[int, str, None],
+        value: Union[int, str, float, bytes, bool],
+    ):
+        """
+        Write an value to the OD.
+
+        Parameters
+        ----------
+        index: int | str
+            The index to read from.
+        subindex: int | str | None
+            The subindex to read from or None.
+        value: int | str | float | bytes | bool
+            The value to write.
+
+        Raises
+        ------
+        ValueError
+            An invalid value.
+        """
+
+        self.accessor(index, subindex).write(value)
+
+    def od_write_bitfield(
+        self, index: Union[int, str], subindex: Union[int, str, None], field: str, value: int
+    ):
+        """
+        Write a bit field value to a object to the OD.
+
+        Parameters
+        ----------
+        index: int | str
+            The index to read from.
+        subindex: int | str | None
+            The subindex to read from or None.
+        field: str
+            Name of field to write to.
+        value: int
+            The value to write.
+
+        Raises
+        ------
+        ValueError
+            An invalid value.
+        """
+
+        self.accessor(index, subindex).write_bitfield(field, value)
+
+    def od_write_enum(self, index: Union[int, str], subindex: Union[int, str, None], value: str):
+        """
+        Write a enum str to the OD.
+
+        Parameters
+        ----------
+        index: int | str
+            The index to read from.
+        subindex: int | str | None
+            The subindex to read from or None.
+        value: str
+            The enum string to write.
+        """
+
+        self.accessor(index, subindex).write_enum(value)
+
+    def _accessor_by_key(self, key: OdKey) -> OdAccessor:
+        """Get an accessor by a ``(index, subindex)`` tuple or just an index."""
+
+        if isinstance(key, tuple):
+            return self.accessor(*key)
+        return self.accessor(key)
+
+    def od_read_many(self, objects: Iterable[OdKey]) -> Dict[OdKey, Any]:
+        """
+        Read a group of values from the OD atomically; no group write, TPDO, or RPDO will happen
+        part way through.
+
+        Parameters
+        ----------
+        objects: Iterable[tuple | int | str]
+            The objects to read, each as a ``(index, subindex)`` tuple or just an index.
+
+        Returns
+        -------
+        dict
+            The values read by the objects given.
+        """
+
+        accessors = [(key, self._accessor_by_key(key)) for key in objects]
+        return self._od_seqlock.read(lambda: {key: acc.read() for key, acc in accessors})
+
+    def od_write_many(self, values: Mapping[OdKey, Any]):
+        """
+        Write a group of values to the OD atomically. All values are validated before any are
+        written, so either all values are written or none are, and no group read, TPDO, or RPDO will
+        see a partly written group.
+
+        Parameters
+        ----------
+        values: Mapping[tuple | int | str, Any]
+            The values to write by object, each as a ``(index, subindex)`` tuple or just an index.
+
+        Raises
+        ------
+        TypeError
+            A value is the wrong type for its object.
+        ValueError
+            A value is outside its object's limits.
+        """
+
+        accessors = [(self._accessor_by_key(key), value) for key, value in values.items()]
+        for accessor, value in accessors:
+            accessor.validate(value)
+
+        changed = []
+        with self._od_seqlock.write():
+            for accessor, value in accessors:
+                changed.append(accessor.var.value != value)
+                accessor.var.value = value
+
+        for (accessor, _), var_changed in zip(accessors, changed):
+            self._on_od_write(accessor.var, var_changed)
+
+    def _get_od_vars(self) -> list[ODVariable]:
+        """Get all variables in the OD in index order."""
+
+        if self._od_vars is None:
+            self._od_vars = [
+                var
+                for obj in self._od.values()
+                for var in (obj.values() if isinstance(obj, (ODRecord, ODArray)) else [obj])
+            ]
+        return self._od_vars
+
+    def od_snapshot(self) -> Dict[tuple[int, int], Any]:
+        """
+        Get a consistent copy of every value stored in the OD without blocking any writers. SDO
+        read callbacks are not called.
+
+        Returns
+        -------
+        dict[tuple[int, int], Any]
+            All values by ``(index, subindex)``. Variables not in a record or array have a subindex
+            of 0.
+        """
+
+        od_vars = self._get_od_vars()
+        return self._od_seqlock.read(
+            lambda: {(var.index, var.subindex): var.value for var in od_vars}
+        )
+
+    def telemetry_packer(
+        self,
+        objects: Iterable[Union[OdKey, ODVariable, tuple[ODVariable, int]]],
+        crc: bool = False,
+    ) -> TelemetryPacker:
+        """
+        Compile an ordered list of OD variables into a packer for fixed-layout telemetry records.
+        Records are packed consistently, with the SDO read callbacks of the variables.
+
+        Parameters
+        ----------
+        objects: Iterable[tuple | int | str | ODVariable | tuple[ODVariable, int]]
+            The variables in the order they are packed, each as a ``(index, subindex)`` tuple, just
+            an index, or an ODVariable. Strings and domains must be given as a
+            ``(variable, size in bytes)`` tuple.
+        crc: bool
+            Append a little-endian CRC32 of the record.
+
+        Returns
+        -------
+        TelemetryPacker
+            The packer.
+        """
+
+        variables = []
+        for item in objects:
+            if isinstance(item, ODVariable) or (
+                isinstance(item, tuple) and isinstance(item[0], ODVariable)
+            ):
+                variables.append(item)
+            else:
+                variables.append(self._accessor_by_key(item).var)
+        return TelemetryPacker(variables, crc, self._get_read_cb, self._od_seqlock)
+
+    def _get_snapshot_codec(self) -> SnapshotCodec:
+        """Get the snapshot codec for the OD, making it if needed."""
+
+        if self._snapshot_codec is None:
+            self._snapshot_codec = SnapshotCodec(self._get_od_vars(), self._od_seqlock)
+        return self._snapshot_codec
+
+    def snapshot(self) -> bytes:
+        """
+        Serialize all OD values into a compact binary snapshot. The snapshot starts with a hash of
+        the OD layout, so it can only be restored to a node with the same OD.
+
+        Returns
+        -------
+        bytes
+            The snapshot.
+        """
+
+        return self._get_snapshot_codec().pack()
+
+    def restore(self, data: bytes):
+        """
+        Restore all OD values from a snapshot made by :py:meth:`snapshot`. Values that change are
+        handled like any other OD write (PDO mappings, timers, change subscriptions, etc).
+
+        Parameters
+        ----------
+        data: bytes
+            The snapshot.
+
+        Raises
+        ------
+        ValueError
+            The snapshot is invalid, corrupt, or for a different OD layout.
+        """
+
+        codec = self._get_snapshot_codec()
+        values = codec.unpack(data)
+
+        changed = []
+        with self._od_seqlock.write():
+            for var, value in zip(codec.variables, values):
+                if var.value != value:
+                    var.value = value
+                    changed.append(var)
+
+        for var in changed:
+            self._on_od_write(var)
+
+    def save_snapshot(self) -> str:
+        """
+        Make a snapshot and add it to the fread cache as an OreSat file, so it can be read over
+        CAN.
+
+        Returns
+        -------
+        str
+            The file name in the fread cache.
+        """
+
+        file_path = "/tmp/" + new_oresat_file("snapshot", ext=".bin")
+        with open(file_path, "wb") as f:
+            f.write(self.snapshot())
+        self._fread_cache.add(file_path, consume=True)
+        return os.path.basename(file_path)
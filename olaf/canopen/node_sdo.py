@@ -0,0 +1,260 @@
+"""SDO callbacks of a Node"""
+
+import inspect
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Union
+
+from canopen import ObjectDictionary
+from canopen.objectdictionary import DOMAIN, OCTET_STRING, ODArray, ODRecord, ODVariable
+from loguru import logger
+
+from .metrics import MetricsRegistry
+from .pdo import PdoMap
+
+_BINARY_TYPES = (DOMAIN, OCTET_STRING)
+
+
+class _CachedReadCallback:
+    """
+    Wraps an SDO read callback to reuse its last result until it expires or its cache key changes.
+    """
+
+    def __init__(
+        self,
+        read_cb: Callable[[], Any],
+        ttl: float = 0.0,
+        key: Union[Callable[[], Any], None] = None,
+    ):
+        self._read_cb = read_cb
+        self._ttl = ttl
+        self._key = key
+        self._value = None
+        self._value_key = None
+        self._expires = 0.0
+        self._valid = False
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self) -> Any:
+        now = monotonic() if self._ttl > 0 else 0.0
+        key = self._key() if self._key is not None else None
+        if self._valid and now <= self._expires and key == self._value_key:
+            self.hits += 1
+            return self._value
+
+        self.misses += 1
+        self._value = self._read_cb()
+        self._value_key = key
+        self._expires = now + self._ttl
+        self._valid = True
+        return self._value
+
+    def invalidate(self):
+        """Drop the cached result."""
+
+        self._valid = False
+
+
+class SdoCallbacksMixin:
+    """The SDO read and write callbacks of a :py:class:`Node`."""
+
+    # attributes and methods of the Node this is mixed into
+    _od: ObjectDictionary
+    _metrics: MetricsRegistry
+    _pdo_maps: dict[int, PdoMap]
+    _rpdo_maps: dict[int, PdoMap]
+    _read_cbs: dict[tuple[int, int], Callable[[], Any]]
+    _write_cbs: dict[tuple[int, int], Callable[[Any], Any]]
+    _slow_sdo: set[tuple[int, int]]
+    _on_od_write: Callable[..., None]
+    _call_write_cb: Callable[[Callable[[Any], Any], Any], None]
+    od_get_obj: Callable[..., Union[ODVariable, ODArray, ODRecord]]
+
+    def _get_read_cb(self, var: ODVariable) -> Union[Callable[[], Any], None]:
+        """Get the SDO read callback for a variable, if there is one."""
+
+        return self._read_cbs.get((var.index, var.subindex))
+
+    def _get_write_cb(self, var: ODVariable) -> Union[Callable[[Any], None], None]:
+        """Get the SDO write callback for a variable, if there is one."""
+
+        return self._write_cbs.get((var.index, var.subindex))
+
+    def _on_sdo_read(self, index: int, subindex: int, od: ODVariable):  # pylint: disable=W0613
+        """
+        SDO read callback function. Allows overriding the data being sent on a SDO read. Return
+        valid datatype for object, if overriding read data, or :py:data:`None` to use the the value
+        on object dictionary.
+
+        Parameters
+        ----------
+        index: int
+            The index the SDO is reading to.
+        subindex: int
+            The subindex the SDO is reading to.
+        od: canopen.objectdictionary.ODVariable
+            The variable object being read to. Badly named. And not appart of the actual OD.
+
+        Returns
+        -------
+        Any
+            The value to return for that index / subindex.
+        """
+
+        ret = None
+
+        key = (od.index, od.subindex)
+        read_cb = self._read_cbs.get(key)
+        if read_cb is not None:
+            start = perf_counter()
+            ret = read_cb()
+            self._metrics.observe("sdo_read", key, perf_counter() - start)
+
+        # get value from OD
+        if ret is None:
+            ret = od.value
+
+        return ret
+
+    def _on_sdo_write(
+        self, index: int, subindex: int, od: ODVariable, data: bytes
+    ):  # pylint: disable=W0613
+        """
+        SDO write callback function. Gives access to the data being received on a SDO write.
+
+        *Note:* data is still written to object dictionary before call.
+
+        Parameters
+        ----------
+        index: int
+            The index the SDO being written to.
+        subindex: int
+            The subindex the SDO being written to.
+        od: canopen.objectdictionary.ODVariable
+            The variable object being written to. Badly named.
+        data: bytes
+            The raw data being written.
+        """
+
+        # set value in OD before callback
+        old = od.value
+        if od.data_type in _BINARY_TYPES:
+            od.value = data
+        else:
+            od.value = od.decode_raw(data)
+        self._on_od_write(od, od.value != old)
+
+        key = (od.index, od.subindex)
+        write_cb = self._write_cbs.get(key)
+        if write_cb is not None:
+            start = perf_counter()
+            self._call_write_cb(write_cb, od.value)
+            self._metrics.observe("sdo_write", key, perf_counter() - start)
+
+    def add_sdo_callbacks(
+        self,
+        index: str,
+        subindex: str,
+        read_cb: Union[Callable[[], Any], None],
+        write_cb: Union[Callable[[Any], None], None],
+        cache_ttl: float = 0.0,
+        cache_key: Union[Callable[[], Any], None] = None,
+        slow: Union[bool, None] = None,
+    ):  # pylint: disable=R0917
+        """
+        Add an SDO read callback for a variable at index and optional subindex.
+
+        Parameters
+        ----------
+        index: int or str
+            The index to call the callback on.
+        subindex: int or str
+            The subindex to call the callback on.
+        read_cb: Callable[[], Any] | None
+            The SDO read callback. Allows overriding the data being sent on a SDO read. If
+            overriding read data return the value or return :py:data:`None` to use the the value
+            from the od. Set to :py:data:`None` for no read_cb.
+        write_cb: Callable[[Any], None] | None
+            The SDO writecallback. Gives access to the data being received on a SDO write.
+            Set to :py:data:`None` for no write_cb. Can be an async function.
+            **Note:** data is still written to object dictionary before call.
+        cache_ttl: float
+            Optional time in seconds to reuse the last result of read_cb for, instead of calling it
+            on every read. Useful for expensive read callbacks that are polled often.
+        cache_key: Callable[[], Any]
+            Optional cheap function whose result changes whenever the result of read_cb would. The
+            last result of read_cb is reused until the key changes (or cache_ttl expires, if set).
+        slow: bool | None
+            Flag callbacks that can block (e.g. file I/O). SDO transfers for the variable are
+            handled on a worker thread and the response is sent once the callback returns, so CAN
+            reception (SYNC, RPDOs, etc) never waits on them. Write callbacks from RPDOs are run on
+            the worker too. They must still finish within the SDO client's timeout. The flag is
+            per variable; :py:data:`None` keeps the flag set by an earlier call.
+
+        Raises
+        ------
+        TypeError
+            read_cb is an async function.
+        """
+
+        try:
+            obj = self._od[index]
+        except KeyError:
+            logger.warning(f"index {index} does not exist, ignoring request for new sdo callback")
+            return
+
+        if not isinstance(obj, ODVariable):
+            try:
+                obj = obj[subindex]
+            except KeyError:
+                logger.warning(
+                    f"subindex {subindex} for index {index} does not exist, ignoring request for "
+                    "new sdo callback"
+                )
+                return
+
+        if inspect.iscoroutinefunction(read_cb):
+            raise TypeError("SDO read callbacks must be synchronous to return the value in time")
+
+        # callbacks are keyed by the ints the SDO server uses, so dispatch is a single lookup
+        key = (obj.index, obj.subindex)
+        if read_cb is not None:
+            if cache_ttl > 0 or cache_key is not None:
+                read_cb = _CachedReadCallback(read_cb, cache_ttl, cache_key)
+            self._read_cbs[key] = read_cb
+            self._pdo_maps.clear()  # compiled PDO mappings hold references to read callbacks
+        if write_cb is not None:
+            self._write_cbs[key] = write_cb
+            self._rpdo_maps.clear()  # compiled RPDO mappings hold references to write callbacks
+        if slow:
+            self._slow_sdo.add(key)
+        elif slow is not None:
+            self._slow_sdo.discard(key)
+
+    def clear_sdo_cache(self, index: Union[int, str], subindex: Union[int, str, None] = None):
+        """
+        Drop the cached result of a SDO read callback added with a cache_ttl or cache_key, so the
+        next read calls it again.
+
+        Parameters
+        ----------
+        index: int or str
+            The index of the object.
+        subindex: int or str
+            The subindex of the object.
+        """
+
+        obj = self.od_get_obj(index, subindex)
+        read_cb = self._read_cbs.get((obj.index, obj.subindex))
+        if isinstance(read_cb, _CachedReadCallback):
+            read_cb.invalidate()
+
+    @property
+    def sdo_cache_stats(self) -> Dict[tuple[int, int], Dict[str, int]]:
+        """dict: The cache hits and misses of all cached SDO read callbacks by index, subindex."""
+
+        return {
+            key: {"hits": read_cb.hits, "misses": read_cb.misses}
+            for key, read_cb in self._read_cbs.items()
+            if isinstance(read_cb, _CachedReadCallback)
+        }
@@ -0,0 +1,124 @@
+"""Flat lookup index for all objects in an OD"""
+
+from typing import Hashable, Union
+
+from canopen import ObjectDictionary
+from canopen.objectdictionary import ODArray, ODRecord, ODVariable
+
+OdObject = Union[ODVariable, ODArray, ODRecord]
+OdKey = Union[int, str, tuple[Union[int, str], Union[int, str, None]]]
+
+
+def _parse_key(key: Union[int, str]) -> Union[int, str]:
+    """Convert a "0x..." or decimal string index or subindex to an int, keep names as is."""
+
+    if isinstance(key, str) and key[:1].isdigit():
+        return int(key, 0) if key[:2].lower() == "0x" else int(key)
+    return key
+
+
+class OdIndex:
+    """
+    A flat index of every object in an OD, built once, so any form of an index and subindex is a
+    single dict lookup.
+
+    Objects at an index can be looked up by the index as an int, its name, or a ``"0x3001"``
+    string. Variables in records and arrays can also be looked up by a ``(index, subindex)``
+    tuple in any mix of ints and names, or a dotted path like ``"system.ram_percent"`` or
+    ``"0x3001.0x02"``.
+    """
+
+    def __init__(self, od: ObjectDictionary):
+        """
+        Parameters
+        ----------
+        od: canopen.ObjectDictionary
+            The OD to index.
+        """
+
+        self._objs: dict[Hashable, OdObject] = {}
+
+        for index in od:
+            obj = od[index]
+            for index_key in (index, obj.name):
+                self._objs[index_key] = obj
+                self._objs[index_key, None] = obj
+            self._objs[f"0x{index:04X}"] = obj
+
+            if isinstance(obj, ODVariable):
+                continue
+            for subindex, var in obj.subindices.items():
+                for index_key in (index, obj.name):
+                    for subindex_key in (subindex, var.name):
+                        self._objs[index_key, subindex_key] = var
+                self._objs[f"{obj.name}.{var.name}"] = var
+                self._objs[f"0x{index:04X}.0x{subindex:02X}"] = var
+
+    def __len__(self) -> int:
+        return len(self._objs)
+
+    def __contains__(self, key: OdKey) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key: OdKey) -> OdObject:
+        """
+        Look up an object by any key form, see :py:meth:`get`.
+
+        Raises
+        ------
+        KeyError
+            No object for the key.
+        """
+
+        if isinstance(key, tuple):
+            return self.get(*key)
+        return self.get(key)
+
+    def get(self, index: Union[int, str], subindex: Union[int, str, None] = None) -> OdObject:
+        """
+        Look up an object.
+
+        Parameters
+        ----------
+        index: int or str
+            The index as an int, a name, a ``"0x3001"`` or decimal string, or a dotted path.
+        subindex: int, str, or None
+            The subindex as an int, a name, or a ``"0x02"`` or decimal string, or None.
+
+        Raises
+        ------
+        KeyError
+            No object for the index and subindex.
+
+        Returns
+        -------
+        ODVariable | ODArray | ODRecord
+            The object.
+        """
+
+        obj = self._objs.get(index if subindex is None else (index, subindex))
+        if obj is not None:
+            return obj
+
+        # slow path for other spellings of the keys, e.g. "0x3001.2" or "12289"
+        try:
+            if subindex is None and isinstance(index, str) and "." in index:
+                index, subindex = index.split(".", 1)
+            index = _parse_key(index)
+            subindex = None if subindex is None else _parse_key(subindex)
+        except ValueError:
+            pass
+        else:
+            obj = self._objs.get(index if subindex is None else (index, subindex))
+            if obj is not None:
+                return obj
+
+        index_name = f"0x{index:04X}" if isinstance(index, int) else index
+        if subindex is None:
+            raise KeyError(f"no object at index {index_name}")
+        subindex_name = f"0x{subindex:02X}" if isinstance(subindex, int) else subindex
+        raise KeyError(f"no object at index {index_name} subindex {subindex_name}")
@@ -0,0 +1,163 @@
+"""Persistent store for OD parameters"""
+
+import mmap
+import os
+import struct
+from typing import Optional
+from zlib import crc32
+
+from canopen import ObjectDictionary
+from canopen.objectdictionary import ODArray, ODRecord, ODVariable
+from loguru import logger
+
+from .seqlock import SeqLock
+from .snapshot import od_layout_hash
+from .telemetry import TelemetryPacker
+
+_MAGIC = b"OLPS"
+_HEADER = struct.Struct("<4sIII")  # magic, layout hash, payload length, payload crc32
+
+# the error history and the store and restore parameters, not stored themselves
+_STORE_INDEXES = (0x1003, 0x1010, 0x1011)
+
+
+class ParamStore:
+    """
+    Stores the values of all writable, fixed-size OD variables in a memory-mapped file.
+
+    The file is a small header (with a hash of the OD layout and a CRC32 of the values) followed
+    by all values packed back to back. Storing only writes and flushes the pages that changed, and
+    loading is a single unpack.
+    """
+
+    def __init__(self, file_path: str, od: ObjectDictionary, seqlock: Optional[SeqLock] = None):
+        """
+        Parameters
+        ----------
+        file_path: str
+            Path to the store file. Made on the first store.
+        od: canopen.ObjectDictionary
+            The OD to store and load the values of.
+        seqlock: SeqLock | None
+            Optional lock to read and write all values consistently.
+        """
+
+        self._file_path = file_path
+        self._seqlock = seqlock
+        self._mmap: Optional[mmap.mmap] = None
+
+        variables = []
+        for index, obj in od.items():
+            if index in _STORE_INDEXES:
+                continue
+            for var in obj.values() if isinstance(obj, (ODRecord, ODArray)) else [obj]:
+                if var.access_type in ["rw", "wo"] and var.data_type in ODVariable.STRUCT_TYPES:
+                    variables.append(var)
+        self._packer = TelemetryPacker(variables, seqlock=seqlock)
+
+        self._layout_hash = od_layout_hash(variables)
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def file_path(self) -> str:
+        """str: Path to the store file."""
+
+        return self._file_path
+
+    @property
+    def variables(self) -> list[ODVariable]:
+        """list[ODVariable]: The variables that are stored."""
+
+        return self._packer.variables
+
+    def close(self):
+        """Unmap the store file."""
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _open(self, size: int) -> mmap.mmap:
+        """Map the store file, making it or resizing it if needed."""
+
+        if self._mmap is not None and len(self._mmap) == size:
+            return self._mmap
+
+        self.close()
+        os.makedirs(os.path.dirname(os.path.abspath(self._file_path)), exist_ok=True)
+        fd = os.open(self._file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        return self._mmap
+
+    def store(self):
+        """Store the current values. Only the pages that changed are written back to disk."""
+
+        payload = self._packer.pack()
+        header = _HEADER.pack(_MAGIC, self._layout_hash, len(payload), crc32(payload))
+        data = header + payload
+        mem = self._open(len(data))
+
+        # write the values first and the header last, so a torn store fails the crc check
+        for page in range(0, len(data), mmap.PAGESIZE):
+            start = max(page, _HEADER.size)
+            end = min(page + mmap.PAGESIZE, len(data))
+            if mem[start:end] != data[start:end]:
+                mem[start:end] = data[start:end]
+                mem.flush(page, end - page)
+
+        if mem[: _HEADER.size] != header:
+            mem[: _HEADER.size] = header
+            mem.flush(0, min(mmap.PAGESIZE, len(data)))
+
+    def load(self) -> bool:
+        """
+        Load the stored values into the OD.
+
+        Returns
+        -------
+        bool
+            True if the values were loaded, False if there is no store file or it is invalid or
+            for a different OD layout.
+        """
+
+        if not os.path.isfile(self._file_path) or os.path.getsize(self._file_path) == 0:
+            return False
+
+        mem = self._open(os.path.getsize(self._file_path))
+        if len(mem) < _HEADER.size:
+            return False
+
+        magic, layout_hash, length, crc = _HEADER.unpack_from(mem)
+        payload = mem[_HEADER.size : _HEADER.size + length]
+        if magic != _MAGIC or layout_hash != self._layout_hash:
+            logger.warning(f"{self._file_path} is for a different OD layout, not loading it")
+            return False
+        if length != self._packer.size or crc32(payload) != crc:
+            logger.error(f"{self._file_path} is corrupt, not loading it")
+            return False
+
+        values = self._packer.unpack(payload)
+        if self._seqlock is None:
+            self._set_values(values)
+        else:
+            with self._seqlock.write():
+                self._set_values(values)
+        return True
+
+    def _set_values(self, values: list):
+        for var, value in zip(self._packer.variables, values):
+            var.value = value
+
+    def clear(self):
+        """Remove the store file, so the OD defaults are used on the next start."""
+
+        self.close()
+        if os.path.isfile(self._file_path):
+            os.remove(self._file_path)
@@ -0,0 +1,191 @@
+"""Compiled PDO mappings"""
+
+import struct
+from typing import Any, Callable, Optional, Union
+
+from canopen import ObjectDictionary
+from canopen.objectdictionary import BOOLEAN, VISIBLE_STRING, ODVariable
+
+from .seqlock import SeqLock
+
+PDO_MAX_LEN = 8
+"""int: Max length of a classic CAN PDO in bytes."""
+
+PDO_MAX_LEN_FD = 64
+"""int: Max length of a CAN FD PDO in bytes."""
+
+# OD data types that can be packed directly with a struct format char
+_STRUCT_CHARS = {
+    data_type: fmt.format[-1]
+    for data_type, fmt in ODVariable.STRUCT_TYPES.items()
+    if isinstance(fmt, struct.Struct)
+}
+
+
+def _var_struct_fmt(var: ODVariable, size: int) -> tuple[str, Optional[Callable[[Any], Any]]]:
+    """
+    Get the struct format for a variable and an optional function to convert the OD value into
+    something struct can pack.
+
+    Parameters
+    ----------
+    var: ODVariable
+        The variable to get the format for.
+    size: int
+        The size of the variable in the packed data in bytes.
+
+    Returns
+    -------
+    str
+        The struct format string.
+    Callable[[Any], Any] | None
+        The value encoder or None if the value can be packed as is.
+    """
+
+    fmt = _STRUCT_CHARS.get(var.data_type)
+    if fmt is not None and struct.calcsize(fmt) == size:
+        if var.data_type == BOOLEAN:
+            return fmt, bool
+        return fmt, None
+
+    # strings, domains, odd sized ints, or mapping size that does not match the data type
+    return f"{size}s", var.encode_raw
+
+
+def _var_struct_decoder(var: ODVariable, fmt: str) -> Optional[Callable[[Any], Any]]:
+    """Get the function to convert an unpacked value back into an OD value, if one is needed."""
+
+    if not fmt.endswith("s"):
+        return None
+    if var.data_type == VISIBLE_STRING or var.data_type in ODVariable.STRUCT_TYPES:
+        return var.decode_raw
+    return bytes
+
+
+class PdoMap:
+    """
+    A PDO mapping compiled into a single struct layout with direct references to the mapped OD
+    variables.
+    """
+
+    def __init__(
+        self,
+        od: ObjectDictionary,
+        comm_index: int,
+        map_index: int,
+        get_read_cb: Callable[[ODVariable], Optional[Callable[[], Any]]],
+        get_write_cb: Optional[Callable[[ODVariable], Optional[Callable[[Any], None]]]] = None,
+    ):
+        """
+        Parameters
+        ----------
+        od: canopen.ObjectDictionary
+            The object dictionary the PDO is in.
+        comm_index: int
+            The PDO communication parameter index.
+        map_index: int
+            The PDO mapping parameter index.
+        get_read_cb: Callable[[ODVariable], Callable[[], Any] | None]
+            Function to look up the SDO read callback for a mapped variable, if there is one.
+        get_write_cb: Callable[[ODVariable], Callable[[Any], None] | None] | None
+            Function to look up the SDO write callback for a mapped variable, if there is one.
+            Only needed for PDOs that will be unpacked.
+        """
+
+        self.comm_index = comm_index
+        self.map_index = map_index
+        self.cob_id = od[comm_index][1].value & 0x3F_FF_FF_FF
+
+        fmt = "<"
+        self.variables: list[ODVariable] = []
+        encoders = []
+        read_cbs = []
+        decoders = []
+        write_cbs = []
+        for i in range(od[map_index][0].value):
+            pdo_map = od[map_index][i + 1].value
+
+            if pdo_map == 0:
+                break  # nothing todo
+
+            index, subindex, bits = struct.unpack(">HBB", pdo_map.to_bytes(4, "big"))
+            var = od[index] if isinstance(od[index], ODVariable) else od[index][subindex]
+
+            var_fmt, encoder = _var_struct_fmt(var, bits // 8)
+            fmt += var_fmt
+            self.variables.append(var)
+            encoders.append(encoder)
+            read_cbs.append(get_read_cb(var))
+            decoders.append(_var_struct_decoder(var, var_fmt))
+            write_cbs.append(None if get_write_cb is None else get_write_cb(var))
+
+        self._struct = struct.Struct(fmt)
+        self._entries = tuple(zip(self.variables, read_cbs, encoders))
+        self._decoders = tuple(zip(self.variables, decoders, write_cbs))
+
+    @property
+    def size(self) -> int:
+        """int: The size of the packed PDO in bytes."""
+
+        return self._struct.size
+
+    def pack(self, seqlock: Optional[SeqLock] = None) -> bytes:
+        """
+        Pack the current values of all mapped variables into a PDO. The SDO read callbacks, if any,
+        are used in place of the OD value, like for an SDO read.
+
+        Parameters
+        ----------
+        seqlock: SeqLock | None
+            Optional lock to read the OD values consistently. The SDO read callbacks are called
+            before, not while reading under it.
+
+        Returns
+        -------
+        bytes
+            The PDO data.
+        """
+
+        cb_values = [None if read_cb is None else read_cb() for _, read_cb, _ in self._entries]
+
+        def read() -> list:
+            return [
+                var.value if value is None else value
+                for (var, _, _), value in zip(self._entries, cb_values)
+            ]
+
+        values = read() if seqlock is None else seqlock.read(read)
+        return self._struct.pack(
+            *(
+                value if encoder is None else encoder(value)
+                for (_, _, encoder), value in zip(self._entries, values)
+            )
+        )
+
+    def unpack(
+        self, data: Union[bytes, bytearray, memoryview]
+    ) -> list[tuple[ODVariable, Any, Optional[Callable[[Any], None]]]]:
+        """
+        Unpack a PDO in one pass.
+
+        Parameters
+        ----------
+        data: bytes | bytearray | memoryview
+            The PDO data, must be at least :py:attr:`size` bytes.
+
+        Raises
+        ------
+        struct.error
+            The data is too short for the mapping.
+
+        Returns
+        -------
+        list[tuple[ODVariable, Any, Callable[[Any], None] | None]]
+            The mapped variables, their new values, and their SDO write callbacks, if any.
+        """
+
+        values = self._struct.unpack_from(data)
+        return [
+            (var, value if decoder is None else decoder(value), write_cb)
+            for (var, decoder, write_cb), value in zip(self._decoders, values)
+        ]
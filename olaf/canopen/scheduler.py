@@ -0,0 +1,138 @@
+"""Deadline scheduler for periodic CAN messages"""
+
+import heapq
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Hashable, Optional
+
+
+@dataclass
+class JitterStats:
+    """How late the jobs of a periodic timer were run."""
+
+    count: int = 0
+    """int: Number of times the job has been run."""
+    last: float = 0.0
+    """float: Lateness of the last run in seconds."""
+    max: float = 0.0
+    """float: Max lateness in seconds."""
+    total: float = 0.0
+    """float: Sum of all lateness in seconds."""
+
+    @property
+    def mean(self) -> float:
+        """float: Mean lateness in seconds."""
+
+        return self.total / self.count if self.count else 0.0
+
+
+class DeadlineScheduler:
+    """
+    Schedules periodic jobs by their next deadline using a heap, so the caller can sleep exactly
+    until the next job is due.
+
+    Thread-safe; periods can be changed from any thread.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._periods: dict[Hashable, float] = {}
+        self._generations: dict[Hashable, int] = {}
+        self._stats: dict[Hashable, JitterStats] = {}
+
+    def set_period(self, key: Hashable, period: float, first: Optional[float] = None):
+        """
+        Add, change, or remove a periodic job.
+
+        Parameters
+        ----------
+        key: Hashable
+            Unique key for the job.
+        period: float
+            The period in seconds. Set to 0 to remove the job.
+        first: float | None
+            The monotonic time the job is first due at. Defaults to one period from now.
+        """
+
+        with self._lock:
+            if self._periods.get(key, 0) == period and first is None:
+                return  # nothing changed
+
+            # any old entries for the key in the heap are ignored once the generation changes
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+
+            if period <= 0:
+                self._periods.pop(key, None)
+                return
+
+            self._periods[key] = period
+            self._stats.setdefault(key, JitterStats())
+            deadline = monotonic() + period if first is None else first
+            heapq.heappush(self._heap, (deadline, generation, key))
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Get the monotonic time the next job is due at.
+
+        Returns
+        -------
+        float | None
+            The next deadline or None if there are no jobs.
+        """
+
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[Hashable]:
+        """
+        Get all jobs that are due and schedule their next deadlines. Missed deadlines are skipped,
+        so a job is never returned more than once per call.
+
+        Parameters
+        ----------
+        now: float
+            The current monotonic time.
+
+        Returns
+        -------
+        list[Hashable]
+            The keys of all jobs that are due.
+        """
+
+        due = []
+        with self._lock:
+            self._drop_stale()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, generation, key = heapq.heappop(self._heap)
+                period = self._periods[key]
+
+                stats = self._stats[key]
+                stats.count += 1
+                stats.last = now - deadline
+                stats.max = max(stats.max, stats.last)
+                stats.total += stats.last
+
+                deadline += period
+                if deadline <= now:
+                    deadline = now + period  # fell behind, skip the missed deadlines
+                heapq.heappush(self._heap, (deadline, generation, key))
+                due.append(key)
+                self._drop_stale()
+        return due
+
+    def _drop_stale(self):
+        """Drop entries from the top of the heap for jobs that have changed or been removed."""
+
+        while self._heap and self._heap[0][1] != self._generations.get(self._heap[0][2]):
+            heapq.heappop(self._heap)
+
+    @property
+    def stats(self) -> dict[Hashable, JitterStats]:
+        """dict[Hashable, JitterStats]: Copy of the jitter stats of all jobs ever scheduled."""
+
+        with self._lock:
+            return {key: JitterStats(**vars(stats)) for key, stats in self._stats.items()}
@@ -0,0 +1,97 @@
+"""Sequence lock for consistent reads of groups of OD values"""
+
+from contextlib import contextmanager
+from threading import RLock, get_ident
+from time import sleep
+from typing import Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class SeqLock:
+    """
+    Sequence lock. Writers take a lock between themselves and bump a sequence number before and
+    after writing, so the sequence number is odd while a write is in progress. Readers never take
+    the lock; they read, then retry if the sequence number changed.
+
+    Writers never wait on readers, so a slow reader (e.g. the REST API) can not stall the CAN
+    thread. Read functions should only read values (e.g. call SDO read callbacks before), so they
+    are quick and rarely overlap a write.
+    """
+
+    _MAX_BACKOFF = 0.001  # seconds
+
+    def __init__(self, retries: int = 100):
+        """
+        Parameters
+        ----------
+        retries: int
+            Number of back-to-back attempts a reader makes before it starts backing off between
+            attempts, to let a burst of writes finish.
+        """
+
+        self._lock = RLock()
+        self._seq = 0
+        self._writer = 0  # thread id of the writer, 0 if none
+        self._depth = 0
+        self._retries = retries
+
+    @property
+    def sequence(self) -> int:
+        """int: The sequence number; odd while a write is in progress."""
+
+        return self._seq
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        """Context manager for writing. Can be nested by the same thread."""
+
+        with self._lock:
+            if self._depth == 0:
+                self._writer = get_ident()
+                self._seq += 1
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._seq += 1
+                    self._writer = 0
+
+    def read(self, func: Callable[[], T]) -> T:
+        """
+        Call a function that reads a group of values and retry it until no write happened during
+        it.
+
+        Parameters
+        ----------
+        func: Callable[[], T]
+            Function that reads the values. May be called more than once.
+
+        Returns
+        -------
+        T
+            The return value of the function.
+        """
+
+        if self._writer == get_ident():
+            return func()  # reading inside our own write
+
+        # never take the writer lock, so writers never wait on a reader
+        attempts = 0
+        backoff = 0.0
+        while True:
+            seq = self._seq
+            while seq & 1:  # write in progress, let the writer run
+                sleep(0)
+                seq = self._seq
+            value = func()
+            if self._seq == seq:
+                return value
+
+            attempts += 1
+            if attempts >= self._retries:
+                # writers keep winning, give them room
+                backoff = min(max(backoff * 2, 0.00001), self._MAX_BACKOFF)
+                sleep(backoff)
@@ -0,0 +1,158 @@
+"""Compact binary snapshots of all OD values"""
+
+import struct
+from typing import Any, Iterable, Optional, Union
+from zlib import crc32
+
+from canopen.objectdictionary import VISIBLE_STRING, ODVariable
+
+from .pdo import _var_struct_decoder, _var_struct_fmt
+from .seqlock import SeqLock
+
+_MAGIC = b"OLSN"
+_HEADER = struct.Struct("<4sII")  # magic, layout hash, payload crc32
+_LENGTH = struct.Struct("<H")
+_NONE_LENGTH = 0xFFFF  # length of a variable-size value that is None
+
+
+def od_layout_hash(variables: Iterable[ODVariable]) -> int:
+    """
+    Get a hash of the layout of OD variables: their indexes, subindexes, and data types.
+
+    Parameters
+    ----------
+    variables: Iterable[ODVariable]
+        The variables.
+
+    Returns
+    -------
+    int
+        The CRC32 of the layout.
+    """
+
+    return crc32(
+        b"".join(struct.pack("<HBB", var.index, var.subindex, var.data_type) for var in variables)
+    )
+
+
+class SnapshotCodec:
+    """
+    Packs the values of OD variables into a compact binary snapshot and unpacks them back.
+
+    A snapshot is a fixed header (magic, OD layout hash, and CRC32 of the values), then all
+    fixed-size values in one struct, then every variable-size value (strings and domains) with a
+    2 byte length, each in index order.
+    """
+
+    def __init__(self, variables: Iterable[ODVariable], seqlock: Optional[SeqLock] = None):
+        """
+        Parameters
+        ----------
+        variables: Iterable[ODVariable]
+            The variables in the snapshot, in index order.
+        seqlock: SeqLock | None
+            Optional lock to read and write all values consistently.
+        """
+
+        self.variables = list(variables)
+        self._seqlock = seqlock
+        self._layout_hash = od_layout_hash(self.variables)
+
+        fmt = "<"
+        self._fixed = []  # (position, encoder, decoder)
+        self._variable = []  # (position, var)
+        for pos, var in enumerate(self.variables):
+            data_type = ODVariable.STRUCT_TYPES.get(var.data_type)
+            if data_type is None:
+                self._variable.append((pos, var))
+                continue
+            var_fmt, encoder = _var_struct_fmt(var, data_type.size)
+            fmt += var_fmt
+            self._fixed.append((pos, encoder, _var_struct_decoder(var, var_fmt)))
+        self._struct = struct.Struct(fmt)
+
+    @property
+    def layout_hash(self) -> int:
+        """int: The hash of the OD layout, see :py:func:`od_layout_hash`."""
+
+        return self._layout_hash
+
+    def _read(self) -> list:
+        return [var.value for var in self.variables]
+
+    def pack(self) -> bytes:
+        """
+        Make a snapshot of the current values.
+
+        Returns
+        -------
+        bytes
+            The snapshot.
+        """
+
+        values = self._read() if self._seqlock is None else self._seqlock.read(self._read)
+
+        fixed = []
+        for pos, encoder, _ in self._fixed:
+            fixed.append(values[pos] if encoder is None else encoder(values[pos]))
+        payload = [self._struct.pack(*fixed)]
+
+        for pos, var in self._variable:
+            value = values[pos]
+            if value is None:
+                payload.append(_LENGTH.pack(_NONE_LENGTH))
+                continue
+            raw = var.encode_raw(value) if var.data_type == VISIBLE_STRING else bytes(value)
+            payload.append(_LENGTH.pack(len(raw)) + raw)
+
+        data = b"".join(payload)
+        return _HEADER.pack(_MAGIC, self._layout_hash, crc32(data)) + data
+
+    def unpack(self, data: Union[bytes, bytearray, memoryview]) -> list[Any]:
+        """
+        Unpack a snapshot.
+
+        Parameters
+        ----------
+        data: bytes | bytearray | memoryview
+            The snapshot.
+
+        Raises
+        ------
+        ValueError
+            The snapshot is invalid, corrupt, or for a different OD layout.
+
+        Returns
+        -------
+        list[Any]
+            The values, in the same order as :py:attr:`variables`.
+        """
+
+        data = bytes(data)
+        if len(data) < _HEADER.size + self._struct.size:
+            raise ValueError("snapshot is too short")
+        magic, layout_hash, crc = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a snapshot")
+        if layout_hash != self._layout_hash:
+            raise ValueError("snapshot is for a different OD layout")
+        if crc32(data[_HEADER.size :]) != crc:
+            raise ValueError("snapshot CRC does not match")
+
+        values: list[Any] = [None] * len(self.variables)
+        for (pos, _, decoder), value in zip(
+            self._fixed, self._struct.unpack_from(data, _HEADER.size)
+        ):
+            values[pos] = value if decoder is None else decoder(value)
+
+        offset = _HEADER.size + self._struct.size
+        for pos, var in self._variable:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            if length == _NONE_LENGTH:
+                continue
+            raw = data[offset : offset + length]
+            offset += length
+            values[pos] = var.decode_raw(raw) if var.data_type == VISIBLE_STRING else raw
+
+        return values
@@ -0,0 +1,149 @@
+"""Compiled telemetry record packer"""
+
+import struct
+from typing import Any, Callable, Iterable, Optional, Union
+from zlib import crc32
+
+from canopen.objectdictionary import ODVariable
+
+from .pdo import _var_struct_decoder, _var_struct_fmt
+from .seqlock import SeqLock
+
+_CRC = struct.Struct("<I")
+
+
+class TelemetryPacker:
+    """
+    An ordered list of OD variables compiled into a single struct layout, for fixed-layout binary
+    telemetry records like beacons and housekeeping frames. Like a PDO mapping, but with no limit
+    on length.
+
+    Use :py:meth:`Node.telemetry_packer` on a card to get one that uses the node's SDO read
+    callbacks. Ground tools can make one straight from an OD to unpack records.
+    """
+
+    def __init__(
+        self,
+        variables: Iterable[Union[ODVariable, tuple[ODVariable, int]]],
+        crc: bool = False,
+        get_read_cb: Optional[Callable[[ODVariable], Optional[Callable[[], Any]]]] = None,
+        seqlock: Optional[SeqLock] = None,
+    ):
+        """
+        Parameters
+        ----------
+        variables: Iterable[ODVariable | tuple[ODVariable, int]]
+            The variables in the order they are packed. Variables that do not have a fixed size
+            (strings and domains) must be given as a ``(variable, size in bytes)`` tuple; they are
+            truncated or null padded to fit.
+        crc: bool
+            Append a little-endian CRC32 of the record.
+        get_read_cb: Callable[[ODVariable], Callable[[], Any] | None] | None
+            Optional function to look up the SDO read callback for a variable, if there is one.
+        seqlock: SeqLock | None
+            Optional lock to read the values of all variables consistently.
+
+        Raises
+        ------
+        ValueError
+            A variable without a fixed size was given without a size.
+        """
+
+        self.variables: list[ODVariable] = []
+        self._crc = crc
+        self._seqlock = seqlock
+
+        fmt = "<"
+        entries = []
+        decoders = []
+        for item in variables:
+            var, size = item if isinstance(item, tuple) else (item, None)
+            if size is None:
+                data_type = ODVariable.STRUCT_TYPES.get(var.data_type)
+                if data_type is None:
+                    raise ValueError(f"size must be given for {var.name}, it has no fixed size")
+                size = data_type.size
+
+            var_fmt, encoder = _var_struct_fmt(var, size)
+            fmt += var_fmt
+            self.variables.append(var)
+            read_cb = None if get_read_cb is None else get_read_cb(var)
+            entries.append((var, read_cb, encoder))
+            decoders.append(_var_struct_decoder(var, var_fmt))
+
+        self._struct = struct.Struct(fmt)
+        self._entries = tuple(entries)
+        self._decoders = tuple(decoders)
+
+    @property
+    def size(self) -> int:
+        """int: The size of a packed record in bytes, including the CRC."""
+
+        return self._struct.size + (_CRC.size if self._crc else 0)
+
+    def _values(self) -> list:
+        """Get the current values of all variables, ready to pack."""
+
+        # call the read callbacks first, so only the OD values are read under the seqlock
+        cb_values = [None if read_cb is None else read_cb() for _, read_cb, _ in self._entries]
+
+        def read() -> list:
+            return [
+                var.value if value is None else value
+                for (var, _, _), value in zip(self._entries, cb_values)
+            ]
+
+        values = read() if self._seqlock is None else self._seqlock.read(read)
+        return [
+            value if encoder is None else encoder(value)
+            for (_, _, encoder), value in zip(self._entries, values)
+        ]
+
+    def pack(self) -> bytes:
+        """
+        Pack the current values of all variables into a record. The SDO read callbacks, if any,
+        are used in place of the OD value, like for an SDO read.
+
+        Returns
+        -------
+        bytes
+            The record.
+        """
+
+        data = self._struct.pack(*self._values())
+        if self._crc:
+            data += _CRC.pack(crc32(data))
+        return data
+
+    def unpack(self, data: Union[bytes, bytearray, memoryview]) -> list[Any]:
+        """
+        Unpack a record back into values.
+
+        Parameters
+        ----------
+        data: bytes | bytearray | memoryview
+            The record, must be :py:attr:`size` bytes.
+
+        Raises
+        ------
+        ValueError
+            The record is the wrong length or its CRC does not match.
+
+        Returns
+        -------
+        list[Any]
+            The values, in the same order as :py:attr:`variables`.
+        """
+
+        if len(data) != self.size:
+            raise ValueError(f"record is {len(data)} bytes, expected {self.size}")
+
+        if self._crc:
+            (crc,) = _CRC.unpack_from(data, self._struct.size)
+            if crc != crc32(data[: self._struct.size]):
+                raise ValueError("record CRC does not match")
+
+        return [
+            value if decoder is None else decoder(value)
+            for decoder, value in zip(self._decoders, self._struct.unpack_from(data))
+        ]
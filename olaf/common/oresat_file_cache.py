@@ -24,6 +24,7 @@ class OreSatFileCache:
         self._dir = abspath(dir_path) + "/"
         self._data = []
         self._lock = Lock()
+        self._version = 0
 
         if isfile(abspath(self._dir)):
             raise FileExistsError("Cannot create new directory with an existing file name.")
@@ -78,6 +79,7 @@ class OreSatFileCache:
             if not overwrite:
                 self._data.append(oresat_file)
                 self._data = sorted(self._data)
+            self._version += 1
 
     def remove(self, file_name: str):
         """Remove a file from cache
@@ -93,6 +95,7 @@ class OreSatFileCache:
                 if f.name == file_name:
                     remove(self._dir + f.name)
                     self._data.remove(f)
+                    self._version += 1
 
     def peek(self) -> str:
         """Get the oldest file name
@@ -140,6 +143,7 @@ class OreSatFileCache:
                 else:
                     shutil.move(self._dir + oldest_file.name, dest)
                     self._data.remove(oldest_file)
+                    self._version += 1
             else:
                 dest = ""
 
@@ -182,6 +186,7 @@ class OreSatFileCache:
                     else:
                         shutil.move(self._dir + f.name, dest)
                         self._data.remove(f)
+                        self._version += 1
         if not dest:
             raise FileNotFoundError(f"file {file_name} not in cache")
 
@@ -218,6 +223,13 @@ class OreSatFileCache:
             shutil.rmtree(self._dir, ignore_errors=True)
             Path(self._dir).mkdir(parents=True, exist_ok=True)
             self._data = []
+            self._version += 1
+
+    @property
+    def version(self) -> int:
+        """int: Incremented every time a file is added to or removed from the cache."""
+
+        return self._version
 
     @property
     def dir(self) -> str:
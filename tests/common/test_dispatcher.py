@@ -0,0 +1,82 @@
+"""Test the sharded CAN message dispatcher."""
+
+import unittest
+from threading import Event
+from time import monotonic, sleep
+
+from olaf.canopen.dispatcher import ShardedDispatcher
+
+
+def _wait_for(check, timeout: float = 1.0):
+    start = monotonic()
+    while not check() and monotonic() - start < timeout:
+        sleep(0.005)
+
+
+class TestShardedDispatcher(unittest.TestCase):
+    """Test the sharded CAN message dispatcher."""
+
+    def test_order(self):
+        """Messages of each COB-ID are handled in order."""
+
+        dispatcher = ShardedDispatcher(workers=2)
+        received: dict[int, list[bytes]] = {0x181: [], 0x182: [], 0x80: []}
+
+        def on_msg(cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
+            received[cob_id].append(data)
+
+        handler = dispatcher.wrap(on_msg)
+        sync = dispatcher.wrap(on_msg, priority=True)
+        for i in range(100):
+            handler(0x181, bytearray([i]), 0.0)
+            handler(0x182, bytearray([i]), 0.0)
+            sync(0x80, bytearray([i]), 0.0)
+        dispatcher.stop()
+
+        for cob_id, datas in received.items():
+            self.assertListEqual(datas, [bytes([i]) for i in range(100)], hex(cob_id))
+        stats = dispatcher.stats
+        self.assertListEqual(list(stats), ["priority", "shard0", "shard1"])
+        self.assertEqual(stats["priority"]["dispatched"], 100)
+        self.assertEqual(stats["shard0"]["dispatched"] + stats["shard1"]["dispatched"], 200)
+
+    def test_slow_handler(self):
+        """A slow handler does not delay other shards or the priority lane; drops are counted."""
+
+        dispatcher = ShardedDispatcher(workers=2, queue_size=2)
+        started = Event()
+        release = Event()
+        fast = []
+
+        def on_slow(cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
+            started.set()
+            release.wait(1)
+
+        def on_fast(cob_id: int, data: bytes, timestamp: float):  # pylint: disable=W0613
+            fast.append(cob_id)
+
+        slow = dispatcher.wrap(on_slow)
+        slow(0x180, b"", 0.0)  # shard 0
+        self.assertTrue(started.wait(1))
+        for _ in range(4):
+            slow(0x180, b"", 0.0)
+        dispatcher.wrap(on_fast)(0x181, b"", 0.0)  # shard 1
+        dispatcher.wrap(on_fast, priority=True)(0x80, b"", 0.0)
+        _wait_for(lambda: len(fast) == 2)
+        self.assertCountEqual(fast, [0x181, 0x80])
+
+        stats = dispatcher.stats["shard0"]
+        self.assertEqual(stats["depth"], 2)
+        self.assertEqual(stats["max_depth"], 2)
+        self.assertEqual(stats["dropped"], 2)  # one being handled, two queued
+
+        release.set()
+        dispatcher.stop()
+        self.assertEqual(dispatcher.stats["shard0"]["dispatched"], 3)
+        self.assertEqual(dispatcher.stats["shard0"]["depth"], 0)
+
+    def test_invalid(self):
+        """There must be at least one worker."""
+
+        with self.assertRaises(ValueError):
+            ShardedDispatcher(workers=0)
@@ -0,0 +1,83 @@
+"""Test the rtnetlink link monitor."""
+
+import os
+import struct
+import subprocess
+import unittest
+from time import monotonic, sleep
+
+from olaf.canopen.link_monitor import LinkMonitor, LinkState, parse_link_messages
+
+
+def _attr(attr_type: int, payload: bytes) -> bytes:
+    length = 4 + len(payload)
+    return struct.pack("=HH", length, attr_type) + payload + bytes(-length % 4)
+
+
+def _link_msg(msg_type: int, ifname: str, flags: int, can_state=None) -> bytes:
+    attrs = _attr(3, ifname.encode() + b"\x00")  # IFLA_IFNAME
+    if can_state is not None:
+        info_data = _attr(4, struct.pack("=I", can_state))  # IFLA_CAN_STATE
+        attrs += _attr(18 | 0x8000, _attr(1, b"can\x00") + _attr(2 | 0x8000, info_data))
+    body = struct.pack("=BxHiII", 0, 280, 5, flags, 0) + attrs
+    return struct.pack("=IHHII", 16 + len(body), msg_type, 0, 0, 0) + body
+
+
+def _can_make_vcan() -> bool:
+    if os.geteuid() != 0:
+        return False
+    out = subprocess.run(
+        "ip link add dev olaftest0 type vcan", shell=True, check=False, capture_output=True
+    )
+    return out.returncode == 0
+
+
+class TestLinkMonitor(unittest.TestCase):
+    """Test the rtnetlink link monitor."""
+
+    def test_parse(self):
+        """Link messages for the interface are parsed, in order, and others are ignored."""
+
+        data = (
+            _link_msg(16, "can0", 0x1, 0)
+            + _link_msg(16, "can1", 0x0)
+            + _link_msg(16, "can0", 0x1, 3)  # bus-off
+            + _link_msg(16, "can0", 0x0, 0)
+            + _link_msg(17, "can0", 0x0)
+        )
+        self.assertListEqual(
+            parse_link_messages(data, "can0"),
+            [
+                LinkState(True, True, False),
+                LinkState(True, True, True),
+                LinkState(True, False, False),
+                LinkState(False, False),
+            ],
+        )
+        self.assertListEqual(parse_link_messages(data, "can1"), [LinkState(True, False)])
+
+        # truncated and done messages
+        self.assertListEqual(parse_link_messages(data[:10], "can0"), [])
+        done = struct.pack("=IHHII", 16, 3, 0, 0, 0)
+        self.assertListEqual(parse_link_messages(done + data, "can0"), [])
+
+    @unittest.skipUnless(_can_make_vcan(), "needs root and the vcan module")
+    def test_vcan(self):
+        """Toggling a vcan link is seen right away."""
+
+        states = []
+        monitor = LinkMonitor("olaftest0", states.append)
+        try:
+            self.assertTrue(monitor.start())
+            for cmd, state in [("up", LinkState(True, True)), ("down", LinkState(True, False))]:
+                subprocess.run(f"ip link set olaftest0 {cmd}", shell=True, check=True)
+                start = monotonic()
+                while state not in states and monotonic() - start < 1:
+                    sleep(0.01)
+                self.assertIn(state, states)
+            subprocess.run("ip link del olaftest0", shell=True, check=True)
+            sleep(0.1)
+            self.assertEqual(states[-1], LinkState(False, False))
+        finally:
+            monitor.stop()
+            subprocess.run("ip link del olaftest0", shell=True, check=False, capture_output=True)
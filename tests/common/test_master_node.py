@@ -0,0 +1,53 @@
+"""Test the MasterNode class."""
+
+import struct
+import unittest
+
+from oresat_configs import Mission, OreSatConfig
+
+from olaf import MasterNode, logger
+
+from .test_node import MockNetwork
+
+logger.disable("olaf")
+
+
+class TestMasterNode(unittest.TestCase):
+    """Test the MasterNode class."""
+
+    def setUp(self):
+        self.od_db = OreSatConfig(Mission.default()).od_db
+        self.network = MockNetwork()
+        self.node = MasterNode(self.network, self.od_db["c3"], self.od_db)
+        self.node._setup_node()
+        self.network.sent.clear()
+
+    def tearDown(self):
+        self.node._destroy_node()
+        self.node.stop()
+
+    def test_send_mpdo(self):
+        """DAM MPDOs are addressed to the remote node and sent on the master's TPDO."""
+
+        gps = self.od_db["gps"]
+        self.node.send_mpdo(1, "gps", "skytraq", "gps_week", 1000)
+        cob_id = self.od_db["c3"][0x1800][1].value
+        frame = bytes([0x80 | gps.node_id]) + struct.pack("<HBI", 0x4002, 0x03, 1000)
+        self.assertListEqual(self.network.sent, [(cob_id, frame)])
+
+        with self.assertRaises(ValueError):
+            self.node.send_mpdo(1, "gps", "versions", "sw_version", "1.0.0")
+
+    def test_sam_mpdo(self):
+        """SAM MPDOs from a remote node are decoded into its OD."""
+
+        gps = self.od_db["gps"]
+        values = []
+        self.node.enable_sam_mpdo("gps", 7, lambda *args: values.append(args))
+        cob_id = gps[0x1806][1].value
+        callback = [cb for cob, cb in self.network._subscriptions if cob == cob_id][-1]
+
+        callback(cob_id, bytes([gps.node_id]) + struct.pack("<HBI", 0x4002, 0x03, 999), 0.0)
+        callback(cob_id, bytes([0x10]) + struct.pack("<HBI", 0x4002, 0x03, 5), 0.0)  # not gps
+        self.assertEqual(gps["skytraq"]["gps_week"].value, 999)
+        self.assertListEqual(values, [("gps", 0x4002, 0x03, 999)])
@@ -0,0 +1,74 @@
+"""Test the node metrics."""
+
+import unittest
+
+from olaf.canopen.metrics import MetricsRegistry, RollingPercentiles
+
+
+class TestMetrics(unittest.TestCase):
+    """Test the node metrics."""
+
+    def test_histogram(self):
+        """Observations are counted into the right buckets and named by kind and key."""
+
+        metrics = MetricsRegistry()
+        metrics.observe("tpdo", 1, 0.00002)
+        metrics.observe("tpdo", 1, 0.0003)
+        metrics.observe("tpdo", 1, 1.0)
+        metrics.observe("rx", 0x181, 0.001)
+        metrics.observe("sdo_read", (0x3003, 2), 0.001)
+        metrics.observe("sync", None, 0.001)
+
+        data = metrics.to_dict()
+        self.assertListEqual(list(data), ["rx_0x181", "sdo_read_0x3003_0x02", "sync", "tpdo_1"])
+        tpdo = data["tpdo_1"]
+        self.assertEqual(tpdo["count"], 3)
+        self.assertAlmostEqual(tpdo["max_us"], 1_000_000)
+        self.assertEqual(tpdo["buckets"]["le_50us"], 1)
+        self.assertEqual(tpdo["buckets"]["le_500us"], 1)
+        self.assertEqual(tpdo["buckets"]["overflow"], 1)
+        self.assertEqual(data["rx_0x181"]["buckets"]["le_1000us"], 1)
+
+        metrics.clear()
+        self.assertDictEqual(metrics.to_dict(), {})
+
+    def test_registry_percentiles(self):
+        """Rolling percentiles are kept apart from the histograms and named like them."""
+
+        metrics = MetricsRegistry()
+        metrics.observe_percentiles("tpdo", 3, 0.001)
+        metrics.observe_percentiles("tpdo", 3, 0.002)
+        metrics.observe_percentiles("tpdo", 1, 0.001)
+        self.assertIs(metrics.percentiles("tpdo", 3), metrics.percentiles("tpdo", 3))
+        self.assertDictEqual(metrics.to_dict(), {})
+
+        data = metrics.percentiles_to_dict()
+        self.assertListEqual(list(data), ["tpdo_1", "tpdo_3"])
+        self.assertEqual(data["tpdo_3"]["count"], 2)
+        self.assertAlmostEqual(data["tpdo_3"]["max_us"], 2000)
+
+        metrics.clear()
+        self.assertDictEqual(metrics.percentiles_to_dict(), {})
+
+    def test_rolling_percentiles(self):
+        """Percentiles are over the latest observations only."""
+
+        latency = RollingPercentiles(window=100)
+        self.assertDictEqual(
+            latency.to_dict(), {"count": 0, "p50_us": 0.0, "p99_us": 0.0, "max_us": 0.0}
+        )
+
+        for i in range(1, 101):
+            latency.observe(i / 1_000_000)
+        data = latency.to_dict()
+        self.assertEqual(data["count"], 100)
+        self.assertAlmostEqual(data["p50_us"], 50)
+        self.assertAlmostEqual(data["p99_us"], 99)
+        self.assertAlmostEqual(data["max_us"], 100)
+
+        # the old observations leave the window
+        for _ in range(100):
+            latency.observe(0.000001)
+        data = latency.to_dict()
+        self.assertEqual(data["count"], 200)
+        self.assertAlmostEqual(data["max_us"], 1)
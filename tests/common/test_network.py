@@ -0,0 +1,106 @@
+"""Test the CanNetwork class."""
+
+import unittest
+from time import monotonic, sleep
+
+import can
+
+from olaf import CanNetwork, CanNetworkState
+from olaf.canopen.link_monitor import LinkState
+
+
+class TestCanNetwork(unittest.TestCase):
+    """Test the CanNetwork class."""
+
+    def test_send_message_fd(self):
+        """CAN FD networks send FD frames, padded to a valid FD length."""
+
+        network = CanNetwork("virtual", "test_fd", fd=True)
+        network._init()
+        bus = can.Bus(interface="virtual", channel="test_fd")
+        try:
+            network.send_message(0x181, bytes(range(10)))
+            msg = bus.recv(1)
+            self.assertTrue(msg.is_fd)
+            self.assertTrue(msg.bitrate_switch)
+            self.assertEqual(msg.data, bytes(range(10)) + b"\x00\x00")
+
+            network.send_message(0x181, b"\x01\x02")
+            self.assertEqual(bus.recv(1).data, b"\x01\x02")
+        finally:
+            bus.shutdown()
+            network._del()
+
+    def test_send_message_classic(self):
+        """Classic networks send classic frames."""
+
+        network = CanNetwork("virtual", "test_classic")
+        network._init()
+        bus = can.Bus(interface="virtual", channel="test_classic")
+        try:
+            network.send_message(0x181, b"\x01\x02")
+            msg = bus.recv(1)
+            self.assertFalse(msg.is_fd)
+            self.assertEqual(msg.data, b"\x01\x02")
+        finally:
+            bus.shutdown()
+            network._del()
+
+    def test_link_changes(self):
+        """Link changes call the link callbacks; the state is only moved by monitor()."""
+
+        network = CanNetwork("virtual", "test_link")
+        wakes = []
+        network.add_link_callback(lambda: wakes.append(network.status))
+        try:
+            network.monitor()
+            self.assertEqual(network.status, CanNetworkState.NETWORK_UP)
+            if not network._link_monitor.is_running:
+                self.skipTest("rtnetlink is not available")
+
+            network._on_link(LinkState(True, True, True))  # bus-off
+            self.assertEqual(network.status, CanNetworkState.NETWORK_UP)  # only in monitor()
+            network.monitor()
+            self.assertEqual(network.status, CanNetworkState.NETWORK_DOWN)
+            network._on_link(LinkState(True, False))  # the restart, left to the period
+            self.assertEqual(len(wakes), 1)
+            network._on_link(LinkState(True, True))
+            network.monitor()
+            self.assertEqual(network.status, CanNetworkState.NETWORK_UP)
+
+            network._on_link(LinkState(False, False))
+            network.monitor()
+            self.assertEqual(network.status, CanNetworkState.NETWORK_NO_BUS)
+            network._on_link(LinkState(True, True))
+            network.monitor()
+            self.assertEqual(network.status, CanNetworkState.NETWORK_DOWN)
+            network.monitor()
+            self.assertEqual(network.status, CanNetworkState.NETWORK_UP)
+            self.assertEqual(len(wakes), 4)
+        finally:
+            network._link_monitor.stop()
+            network._del()
+
+    def test_dispatch_workers(self):
+        """With dispatch workers, handlers are called from the workers and stats are kept."""
+
+        network = CanNetwork("virtual", "test_dispatch", dispatch_workers=2)
+        self.assertListEqual(list(network.dispatch_stats), ["priority", "shard0", "shard1"])
+        received = []
+        network.subscribe(0x181, lambda cob_id, data, timestamp: received.append(data))
+        network.subscribe(0x80, lambda cob_id, data, timestamp: received.append(data), True)
+        network._init()
+        bus = can.Bus(interface="virtual", channel="test_dispatch")
+        try:
+            bus.send(can.Message(arbitration_id=0x181, data=b"\x01", is_extended_id=False))
+            bus.send(can.Message(arbitration_id=0x80, data=b"", is_extended_id=False))
+            start = monotonic()
+            while len(received) < 2 and monotonic() - start < 2:
+                sleep(0.01)
+            self.assertCountEqual(received, [b"\x01", b""])
+            self.assertEqual(network.dispatch_stats["priority"]["dispatched"], 1)
+        finally:
+            bus.shutdown()
+            network._del()
+
+        self.assertDictEqual(CanNetwork("virtual", "test_no_dispatch").dispatch_stats, {})
@@ -0,0 +1,718 @@
+"""Test the Node class."""
+
+import asyncio
+import os
+import struct
+import tempfile
+import unittest
+from threading import Thread
+from time import monotonic, sleep, time
+
+from canopen.sdo import SdoRecord
+from oresat_configs import Mission, OreSatConfig
+
+from olaf import CanNetwork, CanNetworkState, Node, logger
+from olaf.canopen.param_store import ParamStore
+
+logger.disable("olaf")
+
+
+class MockNetwork(CanNetwork):
+    """Mock CAN network that records all sent messages."""
+
+    def __init__(self, fd: bool = False):
+        super().__init__("virtual", "vcan0", fd=fd)
+        self.sent: list[tuple[int, bytes]] = []
+
+    def monitor(self):
+        if self._state != CanNetworkState.NETWORK_UP:
+            self._init()
+            self._state = CanNetworkState.NETWORK_UP
+
+    def send_message(self, cob_id: int, data: bytes, raise_error: bool = True) -> bool:
+        self.sent.append((cob_id, bytes(data)))
+        return True
+
+
+class TestNode(unittest.TestCase):
+    """Test the Node class."""
+
+    def setUp(self):
+        self.od = OreSatConfig(Mission.default()).od_db["gps"]
+        self.network = MockNetwork()
+        self.node = Node(self.network, self.od)
+        self.node._setup_node()
+        self.network.sent.clear()
+
+    def tearDown(self):
+        self.node._destroy_node()
+        self.node.stop()
+
+    def test_send_tpdo(self):
+        """TPDOs are packed from the compiled mapping."""
+
+        self.node.od_write("skytraq", "fix_mode", 2)
+        self.node.od_write("skytraq", "number_of_sv", 9)
+        self.node.od_write("status", None, 1)
+        self.node.od_write("time_syncd", None, True)
+
+        self.node.send_tpdo(7)  # status, number_of_sv, fix_mode, time_syncd
+        cob_id = self.od[0x1806][1].value
+        self.assertListEqual(self.network.sent, [(cob_id, bytes([1, 9, 2, 1]))])
+
+        self.network.sent.clear()
+        self.node.od_write("skytraq", "ecef_x", -1000)
+        self.node.od_write("skytraq", "ecef_y", 2000)
+        self.node.send_tpdo(4)
+        self.assertEqual(self.network.sent[0][1], struct.pack("<ll", -1000, 2000))
+
+    def test_send_tpdo_read_cb(self):
+        """TPDOs use the SDO read callbacks of mapped objects."""
+
+        self.node.send_tpdo(7)
+        self.node.add_sdo_callbacks("skytraq", "number_of_sv", lambda: 12, None)
+        self.network.sent.clear()
+
+        self.node.send_tpdo(7)
+        self.assertEqual(self.network.sent[0][1][1], 12)
+
+    def test_send_tpdo_remap(self):
+        """Writing to the mapping parameters recompiles the mapping."""
+
+        self.node.send_tpdo(7)
+        self.node.od_write(0x1A06, 0, 1)
+        self.network.sent.clear()
+
+        self.node.send_tpdo(7)
+        self.assertEqual(len(self.network.sent[0][1]), 1)
+
+        self.node.od_write(0x1A06, 0, 3)
+        self.node.od_write(0x1A06, 2, 0x30030520)  # system uptime
+        self.node.od_write(0x1A06, 3, 0x30030420)  # system unix_time
+        self.network.sent.clear()
+        self.node.send_tpdo(7)
+        self.assertEqual(len(self.network.sent), 1)
+        self.assertEqual(self.network.sent[0][0], 0x80 + self.od.node_id)  # too long, emcy sent
+
+    def test_on_rpdo(self):
+        """RPDOs are unpacked straight into the OD and call the SDO write callbacks."""
+
+        values = []
+        self.node.add_sdo_callbacks("scet", None, None, values.append)
+        cob_id = self.od[0x1400][1].value
+
+        self.node._on_pdo(cob_id, struct.pack("<Q", 123456789), 0.0)
+        self.assertEqual(self.node.od_read("scet", None), 123456789)
+        self.assertListEqual(values, [123456789])
+
+        # too short
+        self.node._on_pdo(cob_id, b"\x01\x02", 0.0)
+        self.assertEqual(self.node.od_read("scet", None), 123456789)
+        self.assertEqual(self.network.sent[-1][0], 0x80 + self.od.node_id)
+
+    def test_on_rpdo_pre_operational(self):
+        """RPDOs are ignored while PRE-OPERATIONAL."""
+
+        cob_id = self.od[0x1400][1].value
+        self.node.set_operational(False)
+        self.node._on_pdo(cob_id, struct.pack("<Q", 123456789), 0.0)
+        self.assertNotEqual(self.node.od_read("scet", None), 123456789)
+
+        self.node.set_operational(True)
+        self.node._on_pdo(cob_id, struct.pack("<Q", 123456789), 0.0)
+        self.assertEqual(self.node.od_read("scet", None), 123456789)
+
+    def test_one_heartbeat(self):
+        """Only the run loop sends the heartbeat, canopen's heartbeat service is never started."""
+
+        self.node.set_operational(False)
+        self.node._setup_node()  # network reset while PRE-OPERATIONAL
+        self.assertEqual(self.node._node.nmt.state, "PRE-OPERATIONAL")
+        self.assertIsNone(self.node._node.nmt._send_task)
+
+        self.node._node.sdo.download(0x1017, 0, struct.pack("<H", 500))
+        self.assertEqual(self.node.od_read(0x1017, None), 500)
+        self.assertIsNone(self.node._node.nmt._send_task)
+
+    def test_on_sync(self):
+        """Only the TPDOs due on each SYNC are sent."""
+
+        cob_id = self.od[0x1806][1].value
+        for _ in range(4):
+            self.node._on_sync(0x80, b"", 0.0)
+        self.assertEqual(self.network.sent, [])
+
+        self.node.od_write(0x1806, "transmission_type", 2)
+        for _ in range(4):
+            self.node._on_sync(0x80, b"", 0.0)
+        self.assertListEqual([i[0] for i in self.network.sent], [cob_id, cob_id])
+
+        self.node.od_write(0x1806, "transmission_type", 0xFE)
+        self.network.sent.clear()
+        for _ in range(4):
+            self.node._on_sync(0x80, b"", 0.0)
+        self.assertEqual(self.network.sent, [])
+
+    def test_sync_latency(self):
+        """The time from receiving a SYNC to sending each SYNC-based TPDO is recorded."""
+
+        self.node.od_write(0x1806, "transmission_type", 1)
+        self.node._on_sync(0x80, b"", 0.0)  # no receive time, nothing recorded
+        self.assertDictEqual(self.node.sync_latency, {})
+
+        self.node.set_operational(False)
+        self.node._on_sync(0x80, b"", time() - 0.001)  # not sent, nothing recorded
+        self.assertDictEqual(self.node.sync_latency, {})
+        self.node.set_operational(True)
+
+        for _ in range(3):
+            self.node._on_sync(0x80, b"", time() - 0.001)
+        latency = self.node.sync_latency["tpdo_7"]
+        self.assertEqual(latency["count"], 3)
+        self.assertGreaterEqual(latency["p50_us"], 1000)
+        self.assertGreaterEqual(latency["max_us"], latency["p99_us"])
+        self.assertGreaterEqual(latency["p99_us"], latency["p50_us"])
+
+    def test_tpdo_on_change(self):
+        """Change-of-state TPDOs are sent on writes, rate-limited by the inhibit time."""
+
+        cob_id = self.od[0x1806][1].value
+        self.node.od_write(0x1806, "event_timer", 0)
+        self.node.od_write(0x1806, "inhibit_time", 2000)  # 200 ms
+        self.node.enable_tpdo_on_change(7)
+
+        thread = Thread(target=self.node.run)
+        thread.start()
+        sleep(0.05)
+        self.network.sent.clear()
+
+        self.node.od_write("skytraq", "fix_mode", 1)
+        sleep(0.05)
+        self.node.od_write("skytraq", "fix_mode", 2)
+        self.node.od_write("skytraq", "number_of_sv", 5)
+        self.node.od_write("skytraq", "gps_week", 5)  # not mapped
+        sleep(0.05)
+        tpdos = [data for cob, data in self.network.sent if cob == cob_id]
+        self.assertEqual(len(tpdos), 1)
+
+        sleep(0.2)
+        tpdos = [data for cob, data in self.network.sent if cob == cob_id]
+        self.assertEqual(len(tpdos), 2)
+        self.assertEqual(tpdos[1][1:3], bytes([5, 2]))
+
+        self.node.stop()
+        thread.join()
+
+    def test_tpdo_on_change_not_sent(self):
+        """A TPDO that was not sent does not hold off the next one by the inhibit time."""
+
+        self.node.od_write(0x1806, "event_timer", 0)
+        self.node.od_write(0x1806, "inhibit_time", 2000)  # 200 ms
+        self.node.enable_tpdo_on_change(7)
+
+        self.node.set_operational(False)
+        self.assertFalse(self.node.send_tpdo(7))
+        self.node.set_operational(True)
+
+        fix_mode = self.node.od_get_obj("skytraq", "fix_mode")
+        self.node.od_write("skytraq", "fix_mode", 3 if fix_mode.value != 3 else 2)
+        self.assertLessEqual(self.node._cos_due[7], monotonic())
+
+    def test_tpdo_on_change_same_value(self):
+        """Writing the value an object already has does not send change-of-state TPDOs."""
+
+        cob_id = self.od[0x1806][1].value
+        self.node.od_write(0x1806, "event_timer", 0)
+        self.node.od_write(0x1806, "inhibit_time", 0)
+        self.node.enable_tpdo_on_change(7)
+
+        thread = Thread(target=self.node.run)
+        thread.start()
+        sleep(0.05)
+        self.network.sent.clear()
+
+        fix_mode = self.node.od_get_obj("skytraq", "fix_mode")
+        value = 3 if fix_mode.value != 3 else 2
+        for _ in range(5):
+            self.node.od_write("skytraq", "fix_mode", value)
+            sleep(0.01)
+        for _ in range(5):
+            self.node._on_sdo_write(fix_mode.index, fix_mode.subindex, fix_mode, bytes([value]))
+            sleep(0.01)
+        sleep(0.05)
+        tpdos = [data for cob, data in self.network.sent if cob == cob_id]
+        self.assertEqual(len(tpdos), 1)
+
+        self.node.stop()
+        thread.join()
+
+    def test_sdo_callbacks(self):
+        """SDO callbacks can be added by names or ints and are dispatched by ints."""
+
+        values = []
+        self.node.add_sdo_callbacks("system", "ram_percent", lambda: 55, None)
+        self.node.add_sdo_callbacks(0x3003, 0x4, lambda: 123, values.append)
+        self.node.add_sdo_callbacks("flight_mode", None, None, values.append)
+
+        ram = self.od["system"]["ram_percent"]
+        self.assertEqual(self.node._on_sdo_read(ram.index, ram.subindex, ram), 55)
+        system = SdoRecord(self.node._node.sdo, self.od["system"])
+        self.assertEqual(system["unix_time"].raw, 123)
+
+        system["unix_time"].raw = 7
+        self.node._node.sdo["flight_mode"].raw = False
+        self.assertListEqual(values, [7, False])
+
+    def test_sdo_read_cache(self):
+        """Cached SDO read callbacks are reused until they expire or their key changes."""
+
+        calls = []
+        key = [0]
+
+        def read_cb():
+            calls.append(None)
+            return len(calls)
+
+        self.node.add_sdo_callbacks("system", "ram_percent", read_cb, None, cache_ttl=10)
+        self.node.add_sdo_callbacks(
+            "system", "storage_percent", read_cb, None, cache_key=lambda: key[0]
+        )
+        sdo = SdoRecord(self.node._node.sdo, self.od["system"])
+
+        self.assertEqual(sdo["ram_percent"].raw, 1)
+        self.assertEqual(sdo["ram_percent"].raw, 1)
+        self.node.clear_sdo_cache("system", "ram_percent")
+        self.assertEqual(sdo["ram_percent"].raw, 2)
+
+        self.assertEqual(sdo["storage_percent"].raw, 3)
+        self.assertEqual(sdo["storage_percent"].raw, 3)
+        key[0] += 1
+        self.assertEqual(sdo["storage_percent"].raw, 4)
+
+        ram = self.od["system"]["ram_percent"]
+        stats = self.node.sdo_cache_stats[ram.index, ram.subindex]
+        self.assertDictEqual(stats, {"hits": 1, "misses": 2})
+
+    def test_run_async(self):
+        """The node can run on an asyncio event loop with async SDO write callbacks."""
+
+        values = []
+
+        async def write_cb(value):
+            values.append(value)
+
+        async def main():
+            self.node.add_sdo_callbacks("flight_mode", None, None, write_cb)
+            task = asyncio.create_task(self.node.run_async())
+            await asyncio.sleep(0.05)
+            self.node._node.sdo["flight_mode"].raw = False
+            await asyncio.sleep(0.05)
+            self.node.stop()
+            return await task
+
+        self.od[0x1017].value = 20
+        asyncio.run(main())
+        heartbeats = [i for i in self.network.sent if i[0] == 0x700 + self.od.node_id]
+        self.assertGreaterEqual(len(heartbeats), 4)
+        self.assertListEqual(values, [False])
+
+        with self.assertRaises(TypeError):
+            self.node.add_sdo_callbacks("flight_mode", None, write_cb, None)
+
+    def test_accessor(self):
+        """Bound accessors validate, and handle bit fields and enums."""
+
+        accessor = self.node.accessor("skytraq", "gps_week")
+        self.assertIs(accessor, self.node.accessor("skytraq", "gps_week"))
+        self.assertIs(accessor, self.node.accessor(0x4002, 0x03))
+        self.assertIs(accessor, self.node.accessor("skytraq.gps_week"))
+        self.assertIs(self.node.od_get_obj("0x4002.0x03"), accessor.var)
+        accessor.write(1000)
+        self.assertEqual(accessor.read(), 1000)
+        self.assertEqual(self.node.od_read("skytraq", "gps_week"), 1000)
+        with self.assertRaises(ValueError):
+            accessor.write(1024)
+        with self.assertRaises(TypeError):
+            accessor.write("1234")
+        with self.assertRaises(TypeError):
+            accessor.write(True)
+
+        with self.assertRaises(TypeError):
+            self.node.accessor("skytraq")  # a record
+
+        # multi-bit fields
+        self.node.od_write(0x1018, "revision_number", 0x0001_0002)
+        self.assertEqual(self.node.od_read_bitfield(0x1018, "revision_number", "major"), 1)
+        self.assertEqual(self.node.od_read_bitfield(0x1018, "revision_number", "minor"), 2)
+        self.node.od_write_bitfield(0x1018, "revision_number", "minor", 0xABC)
+        self.assertEqual(self.node.od_read(0x1018, "revision_number"), 0x0001_0ABC)
+
+        self.node.od_write_enum("satellite_id", None, "oresat1")
+        self.assertEqual(self.node.od_read("satellite_id", None), 3)
+        self.assertEqual(self.node.od_read_enum("satellite_id", None), "oresat1")
+
+    def test_od_many(self):
+        """Groups of values are validated and written all or nothing."""
+
+        self.node.od_write_many(
+            {("skytraq", "fix_mode"): 3, ("skytraq", "number_of_sv"): 7, "flight_mode": False}
+        )
+        values = self.node.od_read_many([("skytraq", "fix_mode"), (0x4002, 2), "flight_mode"])
+        self.assertDictEqual(
+            values, {("skytraq", "fix_mode"): 3, (0x4002, 2): 7, "flight_mode": False}
+        )
+
+        with self.assertRaises(TypeError):
+            self.node.od_write_many({("skytraq", "fix_mode"): 2, ("skytraq", "number_of_sv"): "8"})
+        self.assertEqual(self.node.od_read("skytraq", "fix_mode"), 3)
+
+    def test_od_snapshot(self):
+        """Snapshots have every value stored in the OD."""
+
+        self.node.od_write_many({("skytraq", "fix_mode"): 2, 0x1017: 500})
+        snapshot = self.node.od_snapshot()
+        self.assertEqual(snapshot[0x4002, 1], 2)
+        self.assertEqual(snapshot[0x1017, 0], 500)
+        self.assertEqual(len(snapshot), len(self.node.od_snapshot()))
+
+    def test_subscribe_changes(self):
+        """Change subscriptions are coalesced and fire for all write paths."""
+
+        changes = []
+        handle = self.node.subscribe_changes(["skytraq", "scet"], changes.append, coalesce_ms=50)
+
+        thread = Thread(target=self.node.run)
+        thread.start()
+        sleep(0.02)
+
+        self.node.od_write("skytraq", "fix_mode", 1)
+        self.node.od_write("skytraq", "fix_mode", 2)
+        SdoRecord(self.node._node.sdo, self.od["skytraq"])["number_of_sv"].raw = 6
+        self.node._on_pdo(self.od[0x1400][1].value, struct.pack("<Q", 42), 0.0)
+        self.node.od_write("flight_mode", None, False)  # not subscribed
+        self.assertListEqual(changes, [])  # not on the writing thread
+        sleep(0.1)
+        self.assertListEqual(changes, [{(0x4002, 1): 2, (0x4002, 2): 6, (0x2010, 0): 42}])
+
+        self.node.unsubscribe_changes(handle)
+        self.node.od_write("skytraq", "fix_mode", 3)
+        sleep(0.1)
+        self.assertEqual(len(changes), 1)
+
+        self.node.stop()
+        thread.join()
+
+    def test_subscribe_changes_same_value(self):
+        """Writing the value an object already has does not notify change subscriptions."""
+
+        changes = []
+        self.node.subscribe_changes([("skytraq", "fix_mode")], changes.append)
+        fix_mode = self.node.od_get_obj("skytraq", "fix_mode")
+        value = 3 if fix_mode.value != 3 else 2
+
+        thread = Thread(target=self.node.run)
+        thread.start()
+        sleep(0.02)
+
+        for _ in range(3):
+            self.node.od_write("skytraq", "fix_mode", value)
+            sleep(0.02)
+        self.node._on_sdo_write(fix_mode.index, fix_mode.subindex, fix_mode, bytes([value]))
+        self.node.od_write_many({("skytraq", "fix_mode"): value})
+        sleep(0.05)
+        self.assertListEqual(changes, [{(0x4002, 1): value}])
+
+        self.node.stop()
+        thread.join()
+
+    def test_telemetry_packer(self):
+        """Telemetry packers can be made by keys and use the SDO read callbacks."""
+
+        self.node.add_sdo_callbacks("skytraq", "number_of_sv", lambda: 11, None)
+        self.node.od_write("skytraq", "fix_mode", 3)
+        packer = self.node.telemetry_packer([("skytraq", "fix_mode"), (0x4002, 2), "flight_mode"])
+        self.assertListEqual(packer.unpack(packer.pack()), [3, 11, self.od["flight_mode"].value])
+
+    def test_send_tpdo_fd(self):
+        """CAN FD networks can send PDOs up to 64 bytes."""
+
+        self.node._destroy_node()
+        self.network = MockNetwork(fd=True)
+        self.node = Node(self.network, self.od)
+        self.node._setup_node()
+
+        self.node.od_write(0x1A06, 0, 3)
+        self.node.od_write(0x1A06, 2, 0x30030520)  # system uptime
+        self.node.od_write(0x1A06, 3, 0x30030420)  # system unix_time
+        self.network.sent.clear()
+        self.node.send_tpdo(7)
+        self.assertEqual(self.network.sent[0][0], self.od[0x1806][1].value)
+        self.assertEqual(len(self.network.sent[0][1]), 9)
+
+    def test_mpdo(self):
+        """TPDOs can send a scan list as SAM MPDOs and DAM MPDOs are written into the OD."""
+
+        cob_id = self.od[0x1806][1].value
+        self.node.add_sdo_callbacks("skytraq", "number_of_sv", lambda: 4, None)
+        self.node.od_write("skytraq", "gps_week", 1000)
+        self.node.set_mpdo_scan_list(7, [("skytraq", "gps_week"), ("skytraq", "number_of_sv")])
+        for _ in range(3):
+            self.node.send_tpdo(7)
+
+        node_id = self.od.node_id
+        self.assertListEqual(
+            self.network.sent,
+            [
+                (cob_id, bytes([node_id]) + struct.pack("<HBI", 0x4002, 0x03, 1000)),
+                (cob_id, bytes([node_id]) + struct.pack("<HBI", 0x4002, 0x02, 4)),
+                (cob_id, bytes([node_id]) + struct.pack("<HBI", 0x4002, 0x03, 1000)),
+            ],
+        )
+
+        with self.assertRaises(ValueError):
+            self.node.set_mpdo_scan_list(7, [("skytraq", "ecef_x"), ("versions", "sw_version")])
+        self.node.set_mpdo_scan_list(7, [])
+        self.network.sent.clear()
+        self.node.send_tpdo(7)
+        self.assertEqual(len(self.network.sent[0][1]), 4)  # back to the mapping
+
+        values = []
+        self.node.add_sdo_callbacks("system", "reset", None, values.append)
+        self.node.enable_dam_mpdo(0x181)
+        self.node._on_dam_mpdo(
+            0x181, bytes([0x80 | node_id]) + struct.pack("<HBI", 0x3003, 1, 3), 0
+        )
+        self.node._on_dam_mpdo(0x181, bytes([0x80]) + struct.pack("<HBI", 0x3003, 1, 2), 0)
+        self.node._on_dam_mpdo(0x181, bytes([0x80 | 0x10]) + struct.pack("<HBI", 0x3003, 1, 1), 0)
+        self.assertEqual(self.node.od_read("system", "reset"), 2)
+        self.assertListEqual(values, [3, 2])
+
+        # ignored while PRE-OPERATIONAL
+        self.node.set_operational(False)
+        self.node._on_dam_mpdo(0x181, bytes([0x80]) + struct.pack("<HBI", 0x3003, 1, 1), 0)
+        self.assertEqual(self.node.od_read("system", "reset"), 2)
+        self.node.set_operational(True)
+
+        # read-only objects are rejected like SDO writes to them are
+        self.node.od_write("skytraq", "fix_mode", 2)
+        self.node._on_dam_mpdo(0x181, bytes([0x80]) + struct.pack("<HBI", 0x4002, 1, 3), 0)
+        self.assertEqual(self.node.od_read("skytraq", "fix_mode"), 2)
+
+    def test_dam_mpdo_slow(self):
+        """DAM MPDOs to objects with slow write callbacks are handled on the SDO worker."""
+
+        values = []
+
+        def write_cb(value):
+            sleep(0.2)
+            values.append(value)
+
+        self.node.add_sdo_callbacks("system", "reset", None, write_cb, slow=True)
+        self.node.enable_dam_mpdo(0x181)
+
+        start = monotonic()
+        self.node._on_dam_mpdo(0x181, bytes([0x80]) + struct.pack("<HBI", 0x3003, 1, 3), 0)
+        self.assertLess(monotonic() - start, 0.1)
+        self.assertListEqual(values, [])
+
+        sleep(0.3)
+        self.assertListEqual(values, [3])
+
+    def test_emcy(self):
+        """EMCYs honor the inhibit time, collapse repeats, and are kept in the error history."""
+
+        emcy_cob_id = 0x80 + self.od.node_id
+        self.node.od_write(0x1015, None, 1000)  # 100 ms
+        self.node.clear_emcy_history()
+        sleep(0.1)  # past the inhibit time of the EMCY sent on setup
+
+        self.node.send_emcy(0x1000, b"\x01")
+        self.node.send_emcy(0x2000)
+        self.node.send_emcy(0x2000)
+        self.node.send_emcy(0x2000)
+        self.node.send_emcy(0x3000, queue=True)
+        emcys = [data for cob_id, data in self.network.sent if cob_id == emcy_cob_id]
+        self.assertListEqual(emcys, [b"\x00\x10\x00\x01\x00\x00\x00\x00"])
+        self.assertListEqual(self.node.emcy_history, [(0x3000, 1), (0x2000, 3), (0x1000, 1)])
+
+        thread = Thread(target=self.node.run)
+        thread.start()
+        sleep(0.05)
+        emcys = [data[:2] for cob_id, data in self.network.sent if cob_id == emcy_cob_id]
+        self.assertEqual(len(emcys), 1)
+        sleep(0.2)
+        emcys = [data[:2] for cob_id, data in self.network.sent if cob_id == emcy_cob_id]
+        self.assertListEqual(emcys, [b"\x00\x10", b"\x00\x20", b"\x00\x30"])
+        self.node.stop()
+        thread.join()
+
+        self.node.clear_emcy_history()
+        self.assertListEqual(self.node.emcy_history, [])
+
+        for i in range(10):
+            self.node._add_emcy_history(0x1000 + i)
+        self.assertEqual(len(self.node.emcy_history), 8)
+        self.assertEqual(self.node.emcy_history[0], (0x1009, 1))
+
+    def test_emcy_history_count(self):
+        """0x1003 subindex 0 has the number of errors stored and writing 0 to it clears them."""
+
+        self.node.clear_emcy_history()
+        self.assertEqual(self.node.od_read(0x1003, 0), 0)
+        self.node._add_emcy_history(0x1000)
+        self.node._add_emcy_history(0x1000)  # repeats are counted in the entry
+        self.node._add_emcy_history(0x2000)
+        self.assertEqual(self.node.od_read(0x1003, 0), 2)
+
+        self.node.od_write(0x1003, 0, 5)  # only 0 is allowed, reverted
+        self.assertEqual(self.node.od_read(0x1003, 0), 2)
+        self.assertEqual(len(self.node.emcy_history), 2)
+
+        self.node.od_write(0x1003, 0, 0)
+        self.assertEqual(self.node.od_read(0x1003, 0), 0)
+        self.assertListEqual(self.node.emcy_history, [])
+
+    def test_store_parameters(self):
+        """Parameters can be stored and restored to defaults."""
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "params.bin")
+            self.node._param_store = ParamStore(path, self.od, self.node._od_seqlock)
+
+            self.node.od_write(0x1017, None, 250)
+            self.node.store_parameters()
+            od = OreSatConfig(Mission.default()).od_db["gps"]
+            self.assertTrue(ParamStore(path, od).load())
+            self.assertEqual(od[0x1017].value, 250)
+
+            self.node.restore_default_parameters()
+            self.assertFalse(os.path.isfile(path))
+
+    def test_snapshot(self):
+        """Snapshots restore all values and can be saved to the fread cache."""
+
+        self.node.od_write(0x1017, None, 250)
+        self.node.od_write("skytraq", "fix_mode", 2)
+        data = self.node.snapshot()
+
+        self.node.od_write(0x1017, None, 1000)
+        self.node.od_write("skytraq", "fix_mode", 0)
+        self.node.restore(data)
+        self.assertEqual(self.node.od_read(0x1017, None), 250)
+        self.assertEqual(self.node.od_read("skytraq", "fix_mode"), 2)
+        self.assertEqual(self.node._scheduler._periods[0], 0.25)  # heartbeat timer updated
+
+        file_name = self.node.save_snapshot()
+        try:
+            with open(os.path.join(self.node.fread_cache.dir, file_name), "rb") as f:
+                self.assertEqual(f.read(), self.node.snapshot())
+        finally:
+            self.node.fread_cache.remove(file_name)
+
+    def test_slow_sdo_callbacks(self):
+        """SDO transfers for slow callbacks are handled off the receive thread, in order."""
+
+        responses = []
+        self.node._node.sdo.send_response = lambda data: responses.append(bytes(data))
+        sdo_request = self.node._node.sdo.on_request
+        rx_cob_id = 0x600 + self.od.node_id
+
+        def write_cb(value):
+            sleep(0.2)
+
+        self.node.add_sdo_callbacks("flight_mode", None, None, write_cb, slow=True)
+        flight_mode = self.od["flight_mode"]
+
+        start = monotonic()
+        sdo_request(rx_cob_id, struct.pack("<BHBL", 0x2F, flight_mode.index, 0, 0), 0.0)
+        sdo_request(rx_cob_id, struct.pack("<BHBL", 0x40, 0x1017, 0, 0), 0.0)  # queued behind
+        self.assertLess(monotonic() - start, 0.1)
+        self.assertListEqual(responses, [])
+
+        sleep(0.3)
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(responses[0][0], 0x60)  # download response
+        self.assertEqual(responses[1][0] & 0xE0, 0x40)  # upload response
+
+        # not slow, handled right away
+        responses.clear()
+        sdo_request(rx_cob_id, struct.pack("<BHBL", 0x40, 0x1017, 0, 0), 0.0)
+        self.assertEqual(len(responses), 1)
+
+        # adding a read callback keeps the write callback's slow flag
+        self.node.add_sdo_callbacks("flight_mode", None, lambda: True, None)
+        responses.clear()
+        sdo_request(rx_cob_id, struct.pack("<BHBL", 0x2F, flight_mode.index, 0, 0), 0.0)
+        self.assertListEqual(responses, [])
+        sleep(0.3)
+        self.assertEqual(len(responses), 1)
+
+        self.node.add_sdo_callbacks("flight_mode", None, None, None, slow=False)
+        self.node.add_sdo_callbacks("flight_mode", None, None, write_cb)
+        responses.clear()
+        sdo_request(rx_cob_id, struct.pack("<BHBL", 0x40, flight_mode.index, 0, 0), 0.0)
+        self.assertEqual(len(responses), 1)
+
+    def test_slow_sdo_not_initiate(self):
+        """Only initiate requests decide if a transfer is deferred, not block frames."""
+
+        responses = []
+        self.node._node.sdo.send_response = lambda data: responses.append(bytes(data))
+        sdo_request = self.node._node.sdo.on_request
+        rx_cob_id = 0x600 + self.od.node_id
+
+        self.node.add_sdo_callbacks("flight_mode", None, None, lambda value: sleep(0.2), slow=True)
+        flight_mode = self.od["flight_mode"]
+
+        # block download segment 0x41 (seqno 65), block download end, block upload start and ack
+        for command in [0x41, 0xC1, 0xA3, 0xA2]:
+            responses.clear()
+            sdo_request(rx_cob_id, struct.pack("<BHBL", command, flight_mode.index, 0, 0), 0.0)
+            self.assertFalse(self.node._sdo_deferring)
+            self.assertEqual(self.node._sdo_queued, 0)
+            self.assertEqual(len(responses), 1)  # handled right away
+
+        # the initiate requests are deferred
+        for command in [0x2F, 0x40, 0xA4, 0xC2]:
+            sdo_request(rx_cob_id, struct.pack("<BHBL", command, flight_mode.index, 0, 0), 0.0)
+            self.assertTrue(self.node._sdo_deferring)
+            sdo_request(rx_cob_id, struct.pack("<BHBL", 0x80, flight_mode.index, 0, 0), 0.0)
+        sleep(0.5)
+
+    def test_link_change(self):
+        """A link change seen by the link monitor has the run loop monitor the network now."""
+
+        monitors = []
+        self.network.monitor = lambda: monitors.append(monotonic())
+        self.node._start_timers()
+        self.node._next_monitor = monotonic() + 60
+        self.node._run_once()
+        self.assertListEqual(monitors, [])
+
+        self.node._on_link_change()
+        self.node._run_once()
+        self.node._run_once()
+        self.assertEqual(len(monitors), 1)
+
+    def test_operational(self):
+        """The node sends a boot-up message and heartbeats with its NMT state."""
+
+        heartbeat_cob_id = 0x700 + self.od.node_id
+        self.od[0x1017].value = 50
+        self.node.set_operational(False)
+        self.assertFalse(self.node.is_operational)
+
+        thread = Thread(target=self.node.run)
+        thread.start()
+        sleep(0.02)
+        self.node.send_tpdo(1)  # not sent when PRE-OPERATIONAL
+        self.node.set_operational(True)
+        sleep(0.1)
+        self.node.stop()
+        thread.join()
+
+        self.assertEqual(self.network.sent[0], (heartbeat_cob_id, b"\x00"))  # boot-up
+        self.assertEqual(self.network.sent[1], (heartbeat_cob_id, b"\x7f"))  # PRE-OPERATIONAL
+        operational = self.network.sent.index((heartbeat_cob_id, b"\x05"))
+        before = {cob_id for cob_id, _ in self.network.sent[:operational]}
+        self.assertSetEqual(before, {heartbeat_cob_id})  # no PDOs until OPERATIONAL
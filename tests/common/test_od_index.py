@@ -0,0 +1,53 @@
+"""Test the OD lookup index."""
+
+import unittest
+
+from oresat_configs import Mission, OreSatConfig
+
+from olaf.canopen.od_index import OdIndex
+
+
+class TestOdIndex(unittest.TestCase):
+    """Test the OD lookup index."""
+
+    def setUp(self):
+        self.od = OreSatConfig(Mission.default()).od_db["gps"]
+        self.index = OdIndex(self.od)
+
+    def test_get(self):
+        """Every form of an index and subindex gets the same object."""
+
+        var = self.od[0x4002][1]  # skytraq fix_mode
+        for key in [
+            (0x4002, 1),
+            ("skytraq", 1),
+            (0x4002, "fix_mode"),
+            ("skytraq", "fix_mode"),
+            ("0x4002", "0x01"),
+            ("16386", "1"),
+            "skytraq.fix_mode",
+            "0x4002.0x01",
+            "0x4002.1",
+        ]:
+            self.assertIs(self.index[key], var, key)
+        self.assertIs(self.index.get("skytraq", "fix_mode"), var)
+
+        record = self.od[0x4002]
+        for key in [0x4002, "skytraq", "0x4002", "16386", (0x4002, None)]:
+            self.assertIs(self.index[key], record, key)
+
+        var = self.od[0x4001]  # time_syncd
+        for key in [0x4001, "time_syncd", "0x4001", (0x4001, None)]:
+            self.assertIs(self.index[key], var, key)
+
+    def test_missing(self):
+        """Unknown keys raise a KeyError."""
+
+        for key in [0x10, "apples", "0x4001.0x01", (0x4002, 0x7F), ("skytraq", "apples"), "0xZZ"]:
+            self.assertNotIn(key, self.index)
+            with self.assertRaises(KeyError):
+                self.index[key]  # pylint: disable=W0104
+
+        with self.assertRaises(KeyError) as e:
+            self.index.get(0x4002, 0x7F)
+        self.assertEqual(e.exception.args[0], "no object at index 0x4002 subindex 0x7F")
@@ -0,0 +1,56 @@
+"""Test the ParamStore class."""
+
+import os
+import tempfile
+import unittest
+
+from oresat_configs import Mission, OreSatConfig
+
+from olaf.canopen.param_store import ParamStore
+
+
+class TestParamStore(unittest.TestCase):
+    """Test the ParamStore class."""
+
+    def setUp(self):
+        self.config = OreSatConfig(Mission.default())
+        self.od = self.config.od_db["gps"]
+        self.dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.dir.name, "params.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_store_load(self):
+        """Stored values are loaded into a fresh OD."""
+
+        store = ParamStore(self.path, self.od)
+        self.assertFalse(store.load())  # no file yet
+
+        self.od[0x1017].value = 250
+        self.od["flight_mode"].value = not self.od["flight_mode"].default
+        store.store()
+        self.od[0x1017].value = 500
+        store.store()  # only the changed page is written
+        store.close()
+
+        od = OreSatConfig(Mission.default()).od_db["gps"]
+        self.assertTrue(ParamStore(self.path, od).load())
+        self.assertEqual(od[0x1017].value, 500)
+        self.assertEqual(od["flight_mode"].value, not od["flight_mode"].default)
+
+        store.clear()
+        self.assertFalse(os.path.isfile(self.path))
+
+    def test_invalid(self):
+        """Corrupt files and files for other OD layouts are not loaded."""
+
+        ParamStore(self.path, self.od).store()
+        self.assertFalse(ParamStore(self.path, self.config.od_db["c3"]).load())
+
+        with open(self.path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            value = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([value[0] ^ 0xFF]))
+        self.assertFalse(ParamStore(self.path, self.od).load())
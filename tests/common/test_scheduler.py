@@ -0,0 +1,48 @@
+"""Test the deadline scheduler."""
+
+import unittest
+from time import monotonic
+
+from olaf.canopen.scheduler import DeadlineScheduler
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    """Test the deadline scheduler."""
+
+    def test_pop_due(self):
+        """Jobs are due at their deadlines and rescheduled by their periods."""
+
+        scheduler = DeadlineScheduler()
+        self.assertIsNone(scheduler.next_deadline())
+
+        start = monotonic()
+        scheduler.set_period("a", 0.03, start)
+        scheduler.set_period("b", 0.05, start + 0.01)
+        self.assertEqual(scheduler.next_deadline(), start)
+
+        self.assertListEqual(scheduler.pop_due(start), ["a"])
+        self.assertListEqual(scheduler.pop_due(start + 0.011), ["b"])
+        self.assertListEqual(scheduler.pop_due(start + 0.02), [])
+        self.assertListEqual(scheduler.pop_due(start + 0.031), ["a"])
+        self.assertAlmostEqual(scheduler.next_deadline(), start + 0.06)
+
+        # missed deadlines are skipped
+        self.assertListEqual(sorted(scheduler.pop_due(start + 1)), ["a", "b"])
+        self.assertListEqual(scheduler.pop_due(start + 1), [])
+
+        stats = scheduler.stats
+        self.assertEqual(stats["a"].count, 3)
+        self.assertAlmostEqual(stats["a"].max, 1 - 0.06)
+
+    def test_set_period(self):
+        """Jobs can be changed and removed."""
+
+        scheduler = DeadlineScheduler()
+        start = monotonic()
+        scheduler.set_period("a", 0.01, start)
+        scheduler.set_period("a", 0.5)
+        self.assertGreater(scheduler.next_deadline(), start + 0.4)
+
+        scheduler.set_period("a", 0)
+        self.assertIsNone(scheduler.next_deadline())
+        self.assertListEqual(scheduler.pop_due(start + 10), [])
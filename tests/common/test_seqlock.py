@@ -0,0 +1,93 @@
+"""Test the SeqLock class."""
+
+import unittest
+from threading import Event, Thread
+from time import monotonic, sleep
+
+from olaf.canopen.seqlock import SeqLock
+
+
+class TestSeqLock(unittest.TestCase):
+    """Test the SeqLock class."""
+
+    def test_read_retry(self):
+        """Reads that overlap a write are retried."""
+
+        lock = SeqLock()
+        calls = []
+
+        def read():
+            calls.append(None)
+            if len(calls) == 1:
+                with lock.write():  # a write during the first read
+                    pass
+            return len(calls)
+
+        self.assertEqual(lock.read(read), 2)
+        self.assertEqual(lock.sequence, 2)
+
+    def test_nested_write(self):
+        """A writer can nest writes and read inside its own write."""
+
+        lock = SeqLock()
+        with lock.write():
+            with lock.write():
+                self.assertEqual(lock.sequence, 1)
+                self.assertEqual(lock.read(lambda: 5), 5)
+        self.assertEqual(lock.sequence, 2)
+
+    def test_consistent(self):
+        """Readers never see a partly written group."""
+
+        lock = SeqLock()
+        values = [0, 0]
+        torn = []
+
+        def write():
+            for i in range(20_000):
+                with lock.write():
+                    values[0] = i
+                    values[1] = i
+
+        thread = Thread(target=write)
+        thread.start()
+        while thread.is_alive():
+            a, b = lock.read(lambda: (values[0], values[1]))
+            if a != b:
+                torn.append((a, b))
+        thread.join()
+        self.assertListEqual(torn, [])
+
+    def test_slow_reader(self):
+        """A slow reader never delays a writer, and still gets a consistent read."""
+
+        lock = SeqLock(retries=2)
+        values = [0, 0]
+        started = Event()
+
+        def slow_read():
+            started.set()
+            a = values[0]
+            sleep(0.1)
+            return a, values[1]
+
+        result = []
+        thread = Thread(target=lambda: result.append(lock.read(slow_read)))
+        with lock.write():  # the reader arrives during a write
+            thread.start()
+            sleep(0.01)
+        self.assertTrue(started.wait(1))
+
+        # keep writing while the reader retries
+        max_write = 0.0
+        for i in range(1, 6):
+            start = monotonic()
+            with lock.write():
+                values[0] = i
+                values[1] = i
+            max_write = max(max_write, monotonic() - start)
+            sleep(0.03)
+        thread.join()
+
+        self.assertLess(max_write, 0.01)
+        self.assertEqual(result[0], (5, 5))
@@ -0,0 +1,48 @@
+"""Test the SnapshotCodec class."""
+
+import unittest
+
+from canopen.objectdictionary import ODArray, ODRecord
+from oresat_configs import Mission, OreSatConfig
+
+from olaf.canopen.snapshot import SnapshotCodec
+
+
+def _od_vars(od) -> list:
+    return [
+        var
+        for obj in od.values()
+        for var in (obj.values() if isinstance(obj, (ODRecord, ODArray)) else [obj])
+    ]
+
+
+class TestSnapshotCodec(unittest.TestCase):
+    """Test the SnapshotCodec class."""
+
+    def setUp(self):
+        self.config = OreSatConfig(Mission.default())
+        self.od = self.config.od_db["gps"]
+
+    def test_pack_unpack(self):
+        """Snapshots unpack back to the same values, including strings and domains."""
+
+        self.od["versions"]["sw_version"].value = "1.2.3"
+        self.od["skytraq"]["ecef_x"].value = -12345
+        codec = SnapshotCodec(_od_vars(self.od))
+
+        data = codec.pack()
+        values = codec.unpack(data)
+        self.assertListEqual(values, [var.value for var in codec.variables])
+        self.assertLess(len(data), 1024)
+
+    def test_invalid(self):
+        """Snapshots from other OD layouts or that are corrupt are not unpacked."""
+
+        data = SnapshotCodec(_od_vars(self.od)).pack()
+
+        with self.assertRaises(ValueError):
+            SnapshotCodec(_od_vars(self.config.od_db["c3"])).unpack(data)
+        with self.assertRaises(ValueError):
+            SnapshotCodec(_od_vars(self.od)).unpack(data[:-1] + bytes([data[-1] ^ 0xFF]))
+        with self.assertRaises(ValueError):
+            SnapshotCodec(_od_vars(self.od)).unpack(b"\x00" * len(data))
@@ -0,0 +1,59 @@
+"""Test the TelemetryPacker class."""
+
+import struct
+import unittest
+from zlib import crc32
+
+from oresat_configs import Mission, OreSatConfig
+
+from olaf import TelemetryPacker
+
+
+class TestTelemetryPacker(unittest.TestCase):
+    """Test the TelemetryPacker class."""
+
+    def setUp(self):
+        self.od = OreSatConfig(Mission.default()).od_db["gps"]
+
+    def test_pack_unpack(self):
+        """Records pack in one struct layout and unpack back to the same values."""
+
+        skytraq = self.od["skytraq"]
+        skytraq["ecef_x"].value = -1000
+        skytraq["fix_mode"].value = 2
+        self.od["time_syncd"].value = True
+        self.od["versions"]["sw_version"].value = "1.2.3"
+
+        packer = TelemetryPacker(
+            [
+                skytraq["ecef_x"],
+                skytraq["fix_mode"],
+                self.od["time_syncd"],
+                (self.od["versions"]["sw_version"], 8),
+            ]
+        )
+        self.assertEqual(packer.size, 4 + 1 + 1 + 8)
+
+        data = packer.pack()
+        self.assertEqual(data, struct.pack("<lB?8s", -1000, 2, True, b"1.2.3"))
+        self.assertListEqual(packer.unpack(data), [-1000, 2, True, "1.2.3"])
+
+        with self.assertRaises(ValueError):
+            packer.unpack(data[:-1])
+
+        with self.assertRaises(ValueError):
+            TelemetryPacker([self.od["versions"]["sw_version"]])  # no size
+
+    def test_crc(self):
+        """Records can have a CRC32 that is checked on unpack."""
+
+        self.od["skytraq"]["gps_week"].value = 1000
+        packer = TelemetryPacker([self.od["skytraq"]["gps_week"]], crc=True)
+
+        data = packer.pack()
+        self.assertEqual(packer.size, 6)
+        self.assertEqual(data[2:], struct.pack("<I", crc32(data[:2])))
+        self.assertListEqual(packer.unpack(data), [1000])
+
+        with self.assertRaises(ValueError):
+            packer.unpack(b"\x00" + data[1:])
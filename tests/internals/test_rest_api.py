@@ -41,6 +41,9 @@ class TestRestApi(unittest.TestCase):
         self.assertNotIn("error", self.client.get("/od/0x1000").json)  # 0x1000 is manditory
         self.assertNotIn("error", self.client.get("/od/4096").json)  # aka 0x1000
         self.assertNotIn("error", self.client.get("/od/0x1018/0x1").json)  # 0x1018 is manditory
+        res = self.client.get("/od/skytraq.fix_mode").json
+        self.assertEqual(res, self.client.get("/od/0x4002/0x1").json)
+        self.assertEqual(res, self.client.get("/od/skytraq/fix_mode").json)
 
         # invalid
         self.assertIn("error", self.client.get("/od/0x1000/0x1").json)  # 0x1000 is manditory
@@ -67,3 +70,25 @@ class TestRestApi(unittest.TestCase):
         self.assertIn("error", res.json)
         res = self.client.put("/od/0x1018/apples", json={"value": 0})
         self.assertIn("error", res.json)
+
+    def test_metrics(self):
+        """Test getting the node metrics."""
+
+        app.node.send_tpdo(1, False)
+        res = self.client.get("/metrics")
+        self.assertIn("tpdo_1", res.json["latency"])
+        self.assertIn("timers", res.json)
+        self.assertIn("sdo_cache", res.json)
+        self.assertIn("sync_latency", res.json)
+        self.assertIn("dispatch", res.json)
+
+    def test_od_all(self):
+        """Test getting all objects, with and without values."""
+
+        res = self.client.get("/od-all")
+        self.assertNotIn("value", res.json["16385"])  # 0x4001 time_syncd
+
+        app.node.od_write("time_syncd", None, True)
+        res = self.client.get("/od-all?values=true")
+        self.assertIs(res.json["16385"]["value"], True)
+        self.assertIn("value", res.json["16386"]["subindexes"]["1"])  # 0x4002 skytraq fix_mode